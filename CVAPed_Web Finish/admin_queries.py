@@ -0,0 +1,348 @@
+"""
+Admin Queries - Paginated listings for the admin pages
+Every page costs a fixed number of queries, so the cost is O(page size), not O(collection)
+
+The user listing filters and sorts on stored, indexed fields (createdAt and
+last_active, which every user write keeps current). Backfill them on users
+written before that with:
+    python admin_queries.py --backfill
+"""
+
+import json
+import base64
+import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Progress and trial collections joined per user for the listing
+THERAPY_COLLECTIONS = [
+    ('articulation', 'articulation_progress', 'articulation_trials'),
+    ('language', 'language_progress', 'language_trials'),
+    ('fluency', 'fluency_progress', 'fluency_trials')
+]
+
+USER_SORT_FIELDS = {
+    'last_active': 'last_active',
+    'created_at': 'createdAt',
+    'role': 'role',
+    'therapy_type': 'therapyType',
+    'name': 'lastName',
+    'email': 'email'
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_db = None
+
+
+def init_admin_queries(database):
+    """Initialize the admin query module with the database connection"""
+    global _db
+    _db = database
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE):
+    """Clamp a 'limit' query argument to 1..MAX_PAGE_SIZE"""
+    try:
+        limit = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 date')
+
+
+def encode_cursor(sort_value, doc_id):
+    """Opaque cursor pointing just past (sort_value, _id) in the listing's sort order"""
+    if isinstance(sort_value, datetime.datetime):
+        value = {'t': 'date', 'v': sort_value.isoformat()}
+    else:
+        value = {'t': 'raw', 'v': sort_value}
+    payload = json.dumps({'s': value, 'id': str(doc_id)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        value = payload['s']
+        sort_value = datetime.datetime.fromisoformat(value['v']) if value['t'] == 'date' else value['v']
+        return sort_value, ObjectId(payload['id'])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError('Invalid cursor')
+
+
+def keyset_filter(sort_field, sort_order, sort_value, last_id):
+    """
+    Filter for the documents after (sort_value, last_id) in (sort_field, _id) order
+
+    Missing and null values sort lowest, as in MongoDB, so they come last in
+    descending order and first in ascending order.
+    """
+    op = '$gt' if sort_order == 1 else '$lt'
+    same_value = {sort_field: sort_value, '_id': {op: last_id}}
+    if sort_value is None:
+        if sort_order == 1:
+            return {'$or': [same_value, {sort_field: {'$ne': None}}]}
+        return same_value
+    branches = [{sort_field: {op: sort_value}}, same_value]
+    if sort_order == -1:
+        branches.append({sort_field: None})
+    return {'$or': branches}
+
+
+def fetch_trials_page(collection, query, sort_field, projection, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of trials, newest first, with a stable (sort_field, _id) keyset cursor
+
+    Returns:
+        Tuple of (trials, next_cursor); next_cursor is None on the last page
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        query = {'$and': [query, keyset_filter(sort_field, -1, sort_value, last_id)]}
+
+    trials = list(
+        collection.find(query, projection)
+        .sort([(sort_field, -1), ('_id', -1)])
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(trials) > limit:
+        trials = trials[:limit]
+        last = trials[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last['_id'])
+
+    return trials, next_cursor
+
+
+def hydrate_users(trials):
+    """Load name and email for every user referenced by a page of trials with one $in query"""
+    user_ids = set()
+    for trial in trials:
+        try:
+            user_ids.add(ObjectId(trial.get('user_id')))
+        except (InvalidId, TypeError):
+            continue
+
+    if not user_ids:
+        return {}
+
+    users = _db['users'].find(
+        {'_id': {'$in': list(user_ids)}},
+        {'firstName': 1, 'lastName': 1, 'email': 1}
+    )
+    return {str(user['_id']): user for user in users}
+
+
+def _therapy_lookups():
+    """$lookup stages that count sessions and detect progress for the current page only"""
+    stages = []
+    for therapy, progress_collection, trials_collection in THERAPY_COLLECTIONS:
+        stages.append({'$lookup': {
+            'from': progress_collection,
+            'localField': 'uid',
+            'foreignField': 'user_id',
+            'pipeline': [{'$limit': 1}, {'$project': {'_id': 1}}],
+            'as': f'{therapy}_progress'
+        }})
+        stages.append({'$lookup': {
+            'from': trials_collection,
+            'localField': 'uid',
+            'foreignField': 'user_id',
+            'pipeline': [{'$count': 'n'}],
+            'as': f'{therapy}_sessions'
+        }})
+    return stages
+
+
+def users_match(filters):
+    """$match on the stored, indexed user fields"""
+    match = {}
+    if filters.get('role'):
+        match['role'] = filters['role']
+    if filters.get('therapy_type'):
+        match['therapyType'] = filters['therapy_type']
+
+    active_range = {}
+    if filters.get('active_after'):
+        active_range['$gte'] = filters['active_after']
+    if filters.get('active_before'):
+        active_range['$lt'] = filters['active_before']
+    if active_range:
+        match['last_active'] = active_range
+    return match
+
+
+def users_page_pipeline(match, sort_field, sort_order, limit, skip=0):
+    """
+    Build the aggregation for one page of the admin user listing
+
+    The $match and $sort run on indexed fields, so only the page (plus one
+    document to detect a next page) is read; date fallbacks for old documents
+    and the $lookups run only for the documents on the page.
+    """
+    pipeline = [
+        {'$match': match},
+        {'$sort': {sort_field: sort_order, '_id': sort_order}}
+    ]
+    if skip:
+        pipeline.append({'$skip': skip})
+
+    return pipeline + [
+        {'$limit': limit + 1},
+        {'$project': {
+            'uid': {'$toString': '$_id'},
+            'email': 1,
+            'firstName': 1,
+            'lastName': 1,
+            'role': 1,
+            'therapyType': 1,
+            'patientType': 1,
+            'gender': 1,
+            'age': 1,
+            'createdAt': 1,
+            'last_active': 1,
+            'created_at': {'$ifNull': ['$createdAt', '$created_at']},
+            'last_active_at': {'$ifNull': ['$last_active', '$updated_at', '$updatedAt', '$createdAt', '$created_at']}
+        }}
+    ] + _therapy_lookups() + [
+        {'$addFields': {
+            'total_sessions': {'$add': [
+                {'$ifNull': [{'$first': f'${therapy}_sessions.n'}, 0]}
+                for therapy, _, _ in THERAPY_COLLECTIONS
+            ]},
+            'active_therapies': {'$add': [
+                {'$size': f'${therapy}_progress'}
+                for therapy, _, _ in THERAPY_COLLECTIONS
+            ]}
+        }}
+    ]
+
+
+def list_users_page(args, now):
+    """
+    Return one page of users for the admin listing
+
+    Args:
+        args: Query arguments (cursor or page, limit, role, therapy_type,
+              active_after, active_before, sort, order); 'cursor' is the
+              next_cursor of the previous page and avoids $skip
+        now: Fallback timestamp for users without dates
+
+    Raises:
+        ValueError: When a query argument is invalid
+    """
+    limit = parse_page_size(args.get('limit'))
+    try:
+        page = max(1, int(args.get('page', 1)))
+    except (TypeError, ValueError):
+        raise ValueError('page must be an integer')
+
+    sort_key = args.get('sort', 'last_active')
+    if sort_key not in USER_SORT_FIELDS:
+        raise ValueError(f"sort must be one of: {', '.join(USER_SORT_FIELDS)}")
+    sort_order = 1 if args.get('order', 'desc') == 'asc' else -1
+
+    filters = {
+        'role': args.get('role'),
+        'therapy_type': args.get('therapy_type') or args.get('therapyType')
+    }
+    if args.get('active_after'):
+        filters['active_after'] = _parse_date(args['active_after'], 'active_after')
+    if args.get('active_before'):
+        filters['active_before'] = _parse_date(args['active_before'], 'active_before')
+
+    sort_field = USER_SORT_FIELDS[sort_key]
+    match = users_match(filters)
+    total = _db['users'].count_documents(match) if match else _db['users'].estimated_document_count()
+
+    skip = 0
+    page_match = match
+    if args.get('cursor'):
+        sort_value, last_id = decode_cursor(args['cursor'])
+        page_match = {'$and': [match, keyset_filter(sort_field, sort_order, sort_value, last_id)]}
+    else:
+        skip = (page - 1) * limit
+
+    users = list(_db['users'].aggregate(users_page_pipeline(page_match, sort_field, sort_order, limit, skip)))
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        last = users[-1]
+        next_cursor = encode_cursor(last.get(sort_field), ObjectId(last['uid']))
+
+    user_list = []
+    for user in users:
+        created_at = user.get('created_at') or now
+        last_active = user.get('last_active_at') or created_at
+        user_list.append({
+            'id': user['uid'],
+            'email': user.get('email', ''),
+            'firstName': user.get('firstName', ''),
+            'lastName': user.get('lastName', ''),
+            'role': user.get('role', 'patient'),
+            'therapyType': user.get('therapyType', 'N/A'),
+            'patientType': user.get('patientType', 'N/A'),
+            'gender': user.get('gender', 'N/A'),
+            'age': user.get('age', 'N/A'),
+            'created_at': created_at,
+            'total_sessions': user.get('total_sessions', 0),
+            'active_therapies': user.get('active_therapies', 0),
+            'last_active': last_active
+        })
+
+    return {
+        'users': user_list,
+        'total_count': total,
+        'page': page,
+        'limit': limit,
+        'total_pages': (total + limit - 1) // limit,
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor
+    }
+
+
+def backfill_user_activity():
+    """
+    Store createdAt and last_active on users written before the listing sorted on them
+
+    Returns:
+        Number of users updated
+    """
+    result = _db['users'].update_many(
+        {'$or': [{'createdAt': {'$exists': False}}, {'last_active': {'$exists': False}}]},
+        [{'$set': {
+            'createdAt': {'$ifNull': ['$createdAt', '$created_at']},
+            'last_active': {'$ifNull': ['$last_active', '$updated_at', '$updatedAt', '$createdAt', '$created_at']}
+        }}]
+    )
+    return result.modified_count
+
+
+if __name__ == '__main__':
+    import os
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description='Maintain the stored fields the admin listings sort on')
+    parser.add_argument('--backfill', action='store_true', help='Store createdAt/last_active on older users')
+    args = parser.parse_args()
+
+    load_dotenv()
+    init_admin_queries(MongoClient(os.getenv('MONGO_URI'))[os.getenv('MONGO_DB_NAME', 'CVACare')])
+
+    if args.backfill:
+        print(f'Updated {backfill_user_activity()} user(s)')
+    else:
+        parser.print_help()
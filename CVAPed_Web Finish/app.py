@@ -1,16 +1,23 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, abort
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
-from pymongo import MongoClient
+from werkzeug.exceptions import HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from bson import ObjectId
 import jwt
 import datetime
 from functools import wraps
 import os
+import logging
+import threading
 from dotenv import load_dotenv
 import firebase_admin
-from firebase_admin import credentials, auth
+from firebase_admin import credentials
 
+# Structured logging and Prometheus metrics
+from structured_logging import configure_logging
+from metrics import init_metrics, AUDIO_DECODE_SECONDS
 # Import fluency CRUD blueprint
 from fluency_crud import fluency_bp, init_fluency_crud
 # Import language CRUD blueprint
@@ -19,31 +26,89 @@ from language_crud import language_bp, init_language_crud
 from receptive_crud import receptive_bp, init_receptive_crud
 # Import articulation CRUD blueprint
 from articulation_crud import articulation_bp, init_articulation_crud
+# Speech recognition backends (Azure or local simulator)
+import speech_service
+# Daily session rollups for the admin dashboard
+from stats_rollup import init_stats_rollup, record_trials, get_admin_stats as compute_admin_stats
+# Per-user phoneme accuracy index
+from phoneme_stats import init_phoneme_stats, compact_phonemes, record_phoneme_trials, get_phoneme_stats
+# Atomic progress updates
+from progress_updates import articulation_item_update, language_exercise_update, fluency_exercise_update
+# Buffered bulk writer for trial logs
+from trial_writer import TrialLogWriter, TrialLogUnavailable
+# Declarative index management
+from db_indexes import start_background_sync as sync_indexes_in_background
+# Paginated admin listings
+from admin_queries import init_admin_queries, list_users_page, parse_page_size, fetch_trials_page, hydrate_users
+# Background cascade deletion of users
+from deletion_jobs import DeletionJobs, job_summary
+# Streaming trial exports
+from trial_export import init_trial_export, parse_export_args, stream_export
+# Cached exercise catalog and ETag helpers
+from exercise_catalog import ExerciseCatalog, bump_catalog_version
+from http_cache import cached_json, documents_etag, conditional_documents
+# Fast JSON provider (ObjectId / datetime / NumPy aware)
+from json_provider import init_json_provider
+# Fork-safe MongoDB client and pool metrics
+from database import init_database, get_database, pool_metrics
+# Startup timing and warm-up
+from startup import startup_timer, warm_up, is_ready, mark_ready
+# Bounded off-thread bcrypt hashing
+from password_hasher import PasswordHasher, PasswordHasherBusy
+# Cached Firebase ID token verification
+from firebase_tokens import FirebaseTokenVerifier, InvalidFirebaseToken
+# Size- and duration-capped audio uploads
+from audio_io import AudioUploadLimits, AudioRejected, parse_upload, save_upload, check_wav_duration, decode_to_wav, remove_quietly
+# Silence trimming before recognition
+from audio_vad import VoiceActivityDetector
+# Incremental fluency scoring for continuous recognition
+from fluency_metrics import FluencyAccumulator
+# Compiled keyword matching for expressive language scoring
+from keyword_matcher import compile_keywords
 
 # Load environment variables from .env file
 load_dotenv()
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # Helper function for timezone-aware UTC datetime
 def utc_now():
     """Returns current UTC time as timezone-aware datetime"""
     return datetime.datetime.now(datetime.timezone.utc)
 
-# Initialize Firebase Admin SDK
-cred = credentials.Certificate('cvaped-fa8b2-firebase-adminsdk-fbsvc-92b2666b41.json')
-firebase_admin.initialize_app(cred)
+# Firebase Admin SDK is initialized on first use (only Firebase sign-in needs it)
+FIREBASE_CREDENTIALS = os.getenv('FIREBASE_CREDENTIALS', 'cvaped-fa8b2-firebase-adminsdk-fbsvc-92b2666b41.json')
+_firebase_app = None
+_firebase_lock = threading.Lock()
+
+def get_firebase_app():
+    """Initialize Firebase Admin on first use and return the app"""
+    global _firebase_app
+    if _firebase_app is None:
+        with _firebase_lock:
+            if _firebase_app is None:
+                with startup_timer.phase('firebase'):
+                    _firebase_app = firebase_admin.initialize_app(credentials.Certificate(FIREBASE_CREDENTIALS))
+    return _firebase_app
+
+firebase_verifier = FirebaseTokenVerifier.from_env(get_firebase_app)
 
 app = Flask(__name__)
+init_json_provider(app)
+init_metrics(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'fallback-secret-key')
+# Request bodies larger than the biggest audio route allows are refused before they are read
+audio_limits = AudioUploadLimits.from_env()
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', audio_limits.max_content_length))
+# Leading/trailing silence is trimmed (and silent recordings rejected) before any recognition call
+vad = VoiceActivityDetector.from_env()
 CORS(app)
 bcrypt = Bcrypt(app)
+password_hasher = PasswordHasher.from_env(bcrypt)
 
-# MongoDB connection
-MONGO_URI = os.getenv('MONGO_URI')
-if not MONGO_URI:
-    raise ValueError("MONGO_URI environment variable is not set")
-
-client = MongoClient(MONGO_URI)
-db = client['CVACare']
+# MongoDB connection (client is created lazily in each worker process, after fork)
+init_database(os.getenv('MONGO_URI'))
+db = get_database()
 users_collection = db['users']
 articulation_progress_collection = db['articulation_progress']
 articulation_trials_collection = db['articulation_trials']
@@ -51,21 +116,51 @@ articulation_exercises_collection = db['articulation_exercises']
 language_progress_collection = db['language_progress']
 language_trials_collection = db['language_trials']
 
-# Register fluency CRUD blueprint
-app.register_blueprint(fluency_bp)
-init_fluency_crud(db)
+# Trial logs are buffered and written in bulk; rollups are updated per flushed batch
+TRIAL_COLLECTION_THERAPIES = {
+    'articulation_trials': 'articulation',
+    'language_trials': 'language',
+    'fluency_trials': 'fluency'
+}
 
-# Register language CRUD blueprint
-app.register_blueprint(language_bp)
-init_language_crud(db, app.config['SECRET_KEY'])
+def on_trials_flushed(collection_name, trials):
+    # Trials buffered in another worker can land after their user's deletion cascade;
+    # remove them rather than letting the rollup/phoneme upserts recreate the user's data
+    deleted = deletion_jobs.deleted_user_ids({str(t['user_id']) for t in trials if t.get('user_id')})
+    if deleted:
+        db[collection_name].delete_many({'_id': {'$in': [t['_id'] for t in trials if str(t.get('user_id')) in deleted]}})
+        trials = [t for t in trials if str(t.get('user_id')) not in deleted]
+        if not trials:
+            return
+    therapy = TRIAL_COLLECTION_THERAPIES.get(collection_name)
+    if therapy:
+        record_trials(therapy, trials)
+    if collection_name == 'articulation_trials':
+        record_phoneme_trials(trials)
 
-# Register receptive CRUD blueprint
-app.register_blueprint(receptive_bp)
-init_receptive_crud(db, app.config['SECRET_KEY'])
+trial_log = TrialLogWriter.from_env(db, on_flush=on_trials_flushed)
 
-# Register articulation CRUD blueprint
-app.register_blueprint(articulation_bp, url_prefix='/api/articulation/exercises')
-init_articulation_crud(db, app.config['SECRET_KEY'])
+# User deletions run as background jobs; this process's buffered trials are flushed first and
+# late trials from other workers are dropped by on_trials_flushed
+deletion_jobs = DeletionJobs.from_env(db, before_delete=lambda user_id: trial_log.flush())
+
+# Exercise catalog cached in-process; successful exercise CRUD writes bump its version (see below)
+exercise_catalog = ExerciseCatalog(db, check_interval=float(os.getenv('EXERCISE_CATALOG_CHECK_SECONDS', 30)))
+EXERCISE_CACHE_MAX_AGE = int(os.getenv('EXERCISE_CACHE_MAX_AGE', 300))
+EXERCISE_CRUD_BLUEPRINTS = {articulation_bp.name, language_bp.name, receptive_bp.name, fluency_bp.name}
+
+@app.after_request
+def bump_catalog_after_crud_write(response):
+    """Mark the exercise catalog changed after a successful CRUD write (standalone servers have no change stream)"""
+    if (request.blueprint in EXERCISE_CRUD_BLUEPRINTS
+            and request.method in ('POST', 'PUT', 'PATCH', 'DELETE')
+            and response.status_code < 400):
+        try:
+            bump_catalog_version(db)
+        except PyMongoError as e:
+            logger.warning("Could not bump the exercise catalog version: %s", e)
+        exercise_catalog.invalidate()
+    return response
 
 # Token required decorator
 def token_required(f):
@@ -114,8 +209,8 @@ def register():
         if users_collection.find_one({'email': email}):
             return jsonify({'message': 'User already exists'}), 409
         
-        # Hash password
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        # Hash password (bounded hashing pool, configured work factor)
+        hashed_password = password_hasher.hash(password)
         
         # Create base user document
         user = {
@@ -127,7 +222,8 @@ def register():
             'therapyType': therapy_type,
             'patientType': patient_type,
             'createdAt': datetime.datetime.utcnow(),
-            'updatedAt': datetime.datetime.utcnow()
+            'updatedAt': datetime.datetime.utcnow(),
+            'last_active': datetime.datetime.utcnow()
         }
         
         # Add therapy-specific fields
@@ -173,8 +269,11 @@ def register():
                 'gender': data['patientGender']
             }
         
-        # Insert user into database
-        result = users_collection.insert_one(user)
+        # Insert user into database (unique email index guards concurrent registrations)
+        try:
+            result = users_collection.insert_one(user)
+        except DuplicateKeyError:
+            return jsonify({'message': 'User already exists'}), 409
         
         # Generate token
         token = jwt.encode({
@@ -197,6 +296,8 @@ def register():
             }
         }), 201
         
+    except PasswordHasherBusy as e:
+        return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'message': 'Registration failed', 'error': str(e)}), 500
 
@@ -219,9 +320,17 @@ def login():
             return jsonify({'message': 'Invalid email or password'}), 401
         
         # Check password
-        if not bcrypt.check_password_hash(user['password'], password):
+        if not password_hasher.verify(user.get('password'), password):
             return jsonify({'message': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with a different work factor, without delaying the response
+        if password_hasher.needs_rehash(user['password']):
+            stored_hash = user['password']
+            password_hasher.rehash_in_background(password, lambda new_hash: users_collection.update_one(
+                {'_id': user['_id'], 'password': stored_hash},
+                {'$set': {'password': new_hash}}
+            ))
+        
         # Generate token
         token = jwt.encode({
             'user_id': str(user['_id']),
@@ -241,6 +350,8 @@ def login():
             }
         }), 200
         
+    except PasswordHasherBusy as e:
+        return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'message': 'Login failed', 'error': str(e)}), 500
 
@@ -255,16 +366,22 @@ def firebase_auth():
         
         firebase_token = data['firebaseToken']
         
-        # Verify Firebase token
+        # Verify Firebase token (cached until expiry, certificates prefetched)
         try:
-            decoded_token = auth.verify_id_token(firebase_token)
+            decoded_token = firebase_verifier.verify(firebase_token)
             firebase_uid = decoded_token['uid']
             firebase_email = decoded_token.get('email', '').lower()
-        except Exception as e:
+        except InvalidFirebaseToken as e:
             return jsonify({'message': 'Invalid Firebase token', 'error': str(e)}), 401
         
-        # Check if user exists by Firebase UID
-        user = users_collection.find_one({'providerId': firebase_uid})
+        email = data.get('email', firebase_email)
+        
+        # One indexed $or query finds the user by Firebase UID or an existing account with this email
+        match = [{'providerId': firebase_uid}]
+        if email:
+            match.append({'email': email})
+        candidates = list(users_collection.find({'$or': match}, limit=2))
+        user = next((u for u in candidates if u.get('providerId') == firebase_uid), None)
         
         if user:
             # Existing user - return user data
@@ -290,14 +407,13 @@ def firebase_auth():
             }), 200
         
         # New user - create account with incomplete profile
-        email = data.get('email', firebase_email)
         first_name = data.get('firstName', '')
         last_name = data.get('lastName', '')
         profile_picture = data.get('profilePicture', '')
         provider = data.get('provider', 'unknown')
         
         # Check if email already exists (from regular registration)
-        if users_collection.find_one({'email': email}):
+        if candidates:
             return jsonify({'message': 'Email already registered. Please login with password.'}), 409
         
         # Create new user with incomplete profile
@@ -311,10 +427,14 @@ def firebase_auth():
             'profilePicture': profile_picture,
             'isProfileComplete': False,
             'createdAt': datetime.datetime.utcnow(),
-            'updatedAt': datetime.datetime.utcnow()
+            'updatedAt': datetime.datetime.utcnow(),
+            'last_active': datetime.datetime.utcnow()
         }
         
-        result = users_collection.insert_one(new_user)
+        try:
+            result = users_collection.insert_one(new_user)
+        except DuplicateKeyError:
+            return jsonify({'message': 'Email already registered. Please login with password.'}), 409
         
         # Generate token
         token = jwt.encode({
@@ -363,7 +483,8 @@ def complete_profile(current_user):
             'therapyType': therapy_type,
             'patientType': patient_type,
             'isProfileComplete': True,
-            'updatedAt': datetime.datetime.utcnow()
+            'updatedAt': datetime.datetime.utcnow(),
+            'last_active': datetime.datetime.utcnow()
         }
         
         # Add therapy-specific fields
@@ -459,7 +580,8 @@ def update_user(current_user):
         
         # Prepare update data
         update_data = {
-            'updatedAt': datetime.datetime.utcnow()
+            'updatedAt': datetime.datetime.utcnow(),
+            'last_active': datetime.datetime.utcnow()
         }
         
         # Allow updating specific fields
@@ -511,75 +633,86 @@ def health():
 AZURE_SPEECH_KEY = os.getenv('AZURE_SPEECH_KEY')
 AZURE_SPEECH_REGION = os.getenv('AZURE_SPEECH_REGION', 'eastus')
 
-def assess_pronunciation_azure(audio_path, reference_text):
+# Speech backend: 'azure' (default) or 'simulator' for load testing without Azure quota
+SPEECH_BACKEND = os.getenv('SPEECH_BACKEND', 'azure')
+speech_service.init_speech_service(AZURE_SPEECH_KEY, AZURE_SPEECH_REGION, SPEECH_BACKEND)
+
+def cleanup_temp_file(path):
+    """Remove a temp audio file once the recognizer has released it"""
+    import time
+    # Wait a bit for file handle to be released, then clean up
+    time.sleep(0.1)
+    try:
+        if os.path.exists(path):
+            os.unlink(path)
+    except Exception as cleanup_error:
+        logger.warning("Could not delete temp file: %s", cleanup_error)
+
+@app.before_request
+def refuse_oversized_body():
     """
-    Use Azure Speech Services Pronunciation Assessment API
-    This is specifically designed for speech therapy and language learning!
+    413 for a body over MAX_CONTENT_LENGTH before a view's catch-all handler can turn it into a 500
+
+    A declared Content-Length is checked directly; a chunked JSON body is read
+    (up to the limit) here. Chunked uploads are checked by parse_upload.
+    """
+    if request.content_length is not None:
+        if request.content_length > app.config['MAX_CONTENT_LENGTH']:
+            abort(413)
+    elif request.is_json:
+        # get_data stops quietly at the limit; reading on past it raises RequestEntityTooLarge
+        request.get_data(cache=True)
+        request.stream.read(1)
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({'success': False, 'message': 'Request body is too large'}), 413
+
+def audio_rejected(error):
+    """JSON error for an upload refused by its size, duration or format checks"""
+    return jsonify({'success': False, 'message': str(error)}), error.status_code
+
+def wants_stream():
+    """True when the client asked for NDJSON partial results (?stream=true or Accept: application/x-ndjson)"""
+    return request.args.get('stream') == 'true' or request.accept_mimetypes.best == 'application/x-ndjson'
+
+def speech_unavailable(error):
+    """503 (busy, retry shortly) or 504 (deadline passed) for a recognition call that could not run"""
+    response = jsonify({'success': False, 'message': str(error)})
+    response.status_code = error.status_code
+    if error.status_code == 503:
+        response.headers['Retry-After'] = '1'
+    return response
+
+def stream_assessment(temp_wav_path, recognition_kwargs, on_segment, build_response):
+    """
+    Stream an assessment as NDJSON: one 'partial' line per recognized segment,
+    then a 'final' line with the same body the JSON endpoint returns.
+    The stream owns the temp file and removes it when recognition ends.
     """
     try:
-        import azure.cognitiveservices.speech as speechsdk
-        import json
-        
-        # Create speech config
-        speech_config = speechsdk.SpeechConfig(
-            subscription=AZURE_SPEECH_KEY,
-            region=AZURE_SPEECH_REGION
-        )
-        
-        # Create audio config from file
-        audio_config = speechsdk.audio.AudioConfig(filename=audio_path)
-        
-        # Configure pronunciation assessment
-        pronunciation_config = speechsdk.PronunciationAssessmentConfig(
-            reference_text=reference_text,
-            grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
-            granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
-            enable_miscue=True
-        )
-        
-        # Create speech recognizer
-        speech_recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config,
-            audio_config=audio_config
-        )
-        
-        # Apply pronunciation assessment config
-        pronunciation_config.apply_to(speech_recognizer)
-        
-        # Recognize speech
-        result = speech_recognizer.recognize_once()
-        
-        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            # Get pronunciation assessment results
-            pronunciation_result = speechsdk.PronunciationAssessmentResult(result)
-            
-            return {
-                'success': True,
-                'transcription': result.text,
-                'accuracy_score': pronunciation_result.accuracy_score / 100,  # 0-1 scale
-                'pronunciation_score': pronunciation_result.pronunciation_score / 100,
-                'completeness_score': pronunciation_result.completeness_score / 100,
-                'fluency_score': pronunciation_result.fluency_score / 100,
-                'phonemes': [
-                    {
-                        'phoneme': p.phoneme,
-                        'score': p.accuracy_score / 100
-                    }
-                    for p in pronunciation_result.phonemes
-                ] if hasattr(pronunciation_result, 'phonemes') else []
-            }
-        else:
-            return {
-                'success': False,
-                'error': f'Recognition failed: {result.reason}'
-            }
-            
-    except Exception as e:
-        print(f"Azure assessment error: {str(e)}")
-        return {
-            'success': False,
-            'error': str(e)
-        }
+        # Claims a recognition slot now, so a busy service answers 503 before streaming starts
+        events = speech_service.stream_recognition(temp_wav_path, **recognition_kwargs)
+    except Exception:
+        cleanup_temp_file(temp_wav_path)
+        raise
+    
+    def generate():
+        for kind, payload in events:
+            if kind == 'segment':
+                yield app.json.dumps({'type': 'partial', **on_segment(payload)}) + '\n'
+            else:
+                body, status = build_response(payload)
+                yield app.json.dumps({'type': 'final', 'status': status, **body}) + '\n'
+    
+    def close():
+        # Runs when the server closes the response, even if the client left before the first chunk
+        events.close()
+        cleanup_temp_file(temp_wav_path)
+    
+    response = Response(generate(), mimetype='application/x-ndjson')
+    response.call_on_close(close)
+    return response
 
 # Articulation Therapy Endpoints
 @app.route('/api/articulation/record', methods=['POST'])
@@ -590,6 +723,10 @@ def record_articulation(current_user):
         import tempfile
         import uuid
         
+        limit = audio_limits.for_route('articulation')
+        audio_limits.check_content_length('articulation', request.content_length)
+        parse_upload(request)
+        
         # Get form data
         if 'audio' not in request.files:
             return jsonify({'success': False, 'message': 'No audio file provided'}), 400
@@ -605,34 +742,33 @@ def record_articulation(current_user):
             return jsonify({'success': False, 'message': 'Target text is required'}), 400
         
         # Save audio file temporarily and convert to WAV format for Azure
-        import soundfile as sf
-        import librosa
-        
         temp_dir = tempfile.gettempdir()
         temp_webm = os.path.join(temp_dir, f'recording_{uuid.uuid4()}.webm')
         temp_wav = os.path.join(temp_dir, f'recording_{uuid.uuid4()}.wav')
         
-        # Save uploaded file first
-        audio_file.save(temp_webm)
+        # Save uploaded file first (streamed in chunks, size-capped)
+        save_upload(audio_file, temp_webm, limit)
         
-        # Convert to WAV format using librosa (Azure requires WAV)
+        # Convert to 16kHz 16-bit PCM WAV (Azure requires WAV), decoding at most the allowed duration
         try:
-            audio_data, sample_rate = librosa.load(temp_webm, sr=16000)  # Azure expects 16kHz
-            sf.write(temp_wav, audio_data, sample_rate, subtype='PCM_16')  # 16-bit PCM WAV
+            with AUDIO_DECODE_SECONDS.labels('articulation').time():
+                decode_to_wav(temp_webm, temp_wav, limit)
+            vad.trim_wav(temp_wav)
             temp_path = temp_wav
         except Exception as conv_error:
-            print(f"Audio conversion error: {str(conv_error)}")
+            if not isinstance(conv_error, AudioRejected):
+                logger.error("Audio conversion error: %s", conv_error)
             # Cleanup
-            if os.path.exists(temp_webm):
-                os.unlink(temp_webm)
+            remove_quietly(temp_webm)
+            remove_quietly(temp_wav)
             raise
         
         try:
-            print(f"Assessing pronunciation for target: '{target}'")
+            logger.debug("Assessing pronunciation", extra={'target': target})
             
             # Check if Azure is configured
-            if not AZURE_SPEECH_KEY or AZURE_SPEECH_KEY == 'YOUR_AZURE_SPEECH_KEY_HERE':
-                print("Azure not configured, using fallback simple matching")
+            if not speech_service.is_configured():
+                logger.warning("Azure not configured, using fallback simple matching")
                 # Simple fallback scoring
                 computed_score = 0.75  # Default moderate score
                 feedback = f"Azure Speech not configured. Please add AZURE_SPEECH_KEY to .env file."
@@ -650,7 +786,7 @@ def record_articulation(current_user):
                 }), 200
             
             # Use Azure Pronunciation Assessment
-            result = assess_pronunciation_azure(temp_path, target)
+            result = speech_service.assess_pronunciation(temp_path, target)
             
             if not result['success']:
                 return jsonify({
@@ -680,8 +816,15 @@ def record_articulation(current_user):
             else:
                 feedback = f"Try listening to the model again. Score: {int(computed_score*100)}%"
             
-            print(f"Azure Assessment - Target: '{target}' | Said: '{transcription}' | Score: {computed_score:.2f}")
-            print(f"Detailed: Accuracy={accuracy:.2f}, Pronunciation={pronunciation:.2f}, Completeness={completeness:.2f}, Fluency={fluency:.2f}")
+            logger.info("Azure pronunciation assessment", extra={
+                'target': target,
+                'transcription': transcription,
+                'computed_score': round(computed_score, 3),
+                'accuracy': round(accuracy, 3),
+                'pronunciation': round(pronunciation, 3),
+                'completeness': round(completeness, 3),
+                'fluency': round(fluency, 3)
+            })
             
             # Save trial data to database
             trial_data = {
@@ -700,9 +843,10 @@ def record_articulation(current_user):
                 },
                 'transcription': transcription,
                 'feedback': feedback,
+                'phonemes': compact_phonemes(result.get('phonemes')),  # [phoneme, score 0-100] pairs
                 'timestamp': datetime.datetime.utcnow()
             }
-            articulation_trials_collection.insert_one(trial_data)
+            trial_log.submit('articulation_trials', trial_data)
             
             return jsonify({
                 'success': True,
@@ -732,68 +876,61 @@ def record_articulation(current_user):
             except:
                 pass
         
+    except AudioRejected as e:
+        return audio_rejected(e)
+    except speech_service.SpeechUnavailable as e:
+        return speech_unavailable(e)
+    except TrialLogUnavailable as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print(f"Error processing recording: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error processing recording")
         return jsonify({'success': False, 'message': 'Failed to process recording', 'error': str(e)}), 500
 
+def phoneme_stats_response(user_id):
+    """Phoneme accuracy index for a user (weakest recent score first)"""
+    try:
+        min_count = max(1, int(request.args.get('min_count', 1)))
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'min_count and limit must be integers'}), 400
+    
+    phonemes = get_phoneme_stats(user_id, min_count=min_count, limit=limit)
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'phonemes': phonemes,
+        'practice': [p['phoneme'] for p in phonemes[:5]]
+    }), 200
+
+@app.route('/api/articulation/phonemes', methods=['GET'])
+@token_required
+def get_my_phoneme_stats(current_user):
+    """Current user's per-phoneme attempts, mean and recent (EWMA) accuracy"""
+    try:
+        return phoneme_stats_response(str(current_user['_id']))
+    except Exception as e:
+        logger.exception("Error getting phoneme stats")
+        return jsonify({'success': False, 'message': 'Failed to get phoneme stats', 'error': str(e)}), 500
+
 @app.route('/api/articulation/exercises/<sound_id>/<int:level>', methods=['GET'])
 @token_required
 def get_exercises(current_user, sound_id, level):
-    """Mock endpoint for getting exercise items"""
+    """Get exercise items for a sound and level (served from the cached catalog, with ETag)"""
     try:
-        # Mock exercise data (replace with MongoDB queries)
-        exercises_data = {
-            's': {
-                1: ['s', 'sss', 'hiss'],
-                2: ['sa', 'se', 'si'],
-                3: ['sun', 'sock', 'sip'],
-                4: ['See the sun.', 'Sit down.', 'Pass the salt.'],
-                5: ['Sam saw seven shiny shells.', 'The sun is very hot.', 'She sells sea shells.']
-            },
-            'r': {
-                1: ['r', 'rrr', 'ra'],
-                2: ['ra', 're', 'ri'],
-                3: ['rabbit', 'red', 'run'],
-                4: ['Run to the road.', 'Read the book.', 'Red balloon.'],
-                5: ['Rita rides the red rocket.', 'The rabbit raced around the yard.', 'Robert ran really fast.']
-            },
-            'l': {
-                1: ['l', 'la', 'lal'],
-                2: ['la', 'le', 'li'],
-                3: ['lion', 'leaf', 'lamp'],
-                4: ['Look at the lion.', 'Lift the box.', 'Light the lamp.'],
-                5: ['Lily loves lemons.', 'The little lamb likes leaves.', 'Lay the blanket down.']
-            },
-            'k': {
-                1: ['k', 'ka', 'ku'],
-                2: ['ka', 'ke', 'ki'],
-                3: ['kite', 'cat', 'car'],
-                4: ['Kick the ball.', 'Cook the rice.', 'Clean the cup.'],
-                5: ['Keep the kite flying high.', 'The cat climbed the kitchen counter.', 'Kara kept a key in her pocket.']
-            },
-            'th': {
-                1: ['th', 'thh', 'th-hold'],
-                2: ['tha', 'the', 'thi'],
-                3: ['think', 'this', 'thumb'],
-                4: ['Think about that.', 'This is the thumb.', 'They thank her.'],
-                5: ['Those three thieves thought they were free.', 'This is my thumb.', 'The therapist taught them slowly.']
-            }
-        }
+        items, etag = exercise_catalog.get_level(sound_id, level)
         
-        if sound_id not in exercises_data or level not in exercises_data[sound_id]:
+        if items is None:
             return jsonify({'success': False, 'message': 'Invalid sound or level'}), 404
         
-        items = exercises_data[sound_id][level]
-        
-        return jsonify({
+        return cached_json({
             'success': True,
             'sound_id': sound_id,
             'level': level,
             'items': items,
             'total_items': len(items)
-        }), 200
+        }, etag, max_age=EXERCISE_CACHE_MAX_AGE)
         
     except Exception as e:
         return jsonify({'success': False, 'message': 'Failed to get exercises', 'error': str(e)}), 500
@@ -813,38 +950,12 @@ def save_progress(current_user):
         average_score = data.get('average_score', 0)
         trial_details = data.get('trial_details', [])
         
-        # Find or create progress document
-        progress_doc = articulation_progress_collection.find_one({
-            'user_id': user_id,
-            'sound_id': sound_id
-        })
-        
-        if not progress_doc:
-            # Create new progress document
-            progress_doc = {
-                'user_id': user_id,
-                'sound_id': sound_id,
-                'levels': {},
-                'created_at': datetime.datetime.utcnow(),
-                'updated_at': datetime.datetime.utcnow()
-            }
-        
-        # Update level progress
-        level_key = str(level)
-        if level_key not in progress_doc.get('levels', {}):
-            progress_doc.setdefault('levels', {})[level_key] = {'items': {}}
-        
-        # Update item progress
-        item_key = str(item_index)
-        progress_doc['levels'][level_key]['items'][item_key] = {
-            'completed': completed,
-            'average_score': average_score,
-            'trial_details': trial_details,
-            'last_attempt': datetime.datetime.utcnow()
-        }
+        try:
+            level = int(level)
+            item_index = int(item_index)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'level and item_index must be integers'}), 400
         
-        # Check if level is complete (all items completed)
-        level_data = progress_doc['levels'][level_key]
         # Determine total items for this level (1 for level 1, 3 for level 2, 2 for others)
         if level == 1:
             total_items = 1
@@ -852,19 +963,23 @@ def save_progress(current_user):
             total_items = 3
         else:
             total_items = 2
-            
-        completed_items = sum(1 for item in level_data.get('items', {}).values() if item.get('completed', False))
-        level_data['is_complete'] = completed_items >= total_items
-        level_data['completed_items'] = completed_items
-        level_data['total_items'] = total_items
         
-        progress_doc['updated_at'] = datetime.datetime.utcnow()
+        now = datetime.datetime.utcnow()
+        item = {
+            'completed': completed,
+            'average_score': average_score,
+            'trial_details': trial_details,
+            'last_attempt': now
+        }
         
-        # Upsert progress document
-        articulation_progress_collection.update_one(
+        # Set the item and recompute the level's completion in one atomic upsert
+        level_key = str(level)
+        progress_doc = articulation_progress_collection.find_one_and_update(
             {'user_id': user_id, 'sound_id': sound_id},
-            {'$set': progress_doc},
-            upsert=True
+            articulation_item_update(level, item_index, item, total_items, now),
+            projection={'_id': 0, 'user_id': 1, 'sound_id': 1, f'levels.{level_key}': 1, 'updated_at': 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
         
         return jsonify({
@@ -874,9 +989,7 @@ def save_progress(current_user):
         }), 200
         
     except Exception as e:
-        import traceback
-        print(f"Error saving progress: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error saving progress")
         return jsonify({'success': False, 'message': 'Failed to save progress', 'error': str(e)}), 500
 
 @app.route('/api/articulation/progress/<sound_id>', methods=['GET'])
@@ -885,22 +998,27 @@ def get_progress(current_user, sound_id):
     """Get user's articulation progress for a specific sound"""
     try:
         user_id = str(current_user['_id'])
+        query = {'user_id': user_id, 'sound_id': sound_id}
+        scope = f'articulation:{user_id}:{sound_id}'
         
-        progress_doc = articulation_progress_collection.find_one({
-            'user_id': user_id,
-            'sound_id': sound_id
-        })
+        # Unchanged since the client's copy: answer 304 without loading the document
+        not_modified = conditional_documents(articulation_progress_collection, query, scope)
+        if not_modified:
+            return not_modified
+        
+        progress_doc = articulation_progress_collection.find_one(query)
+        etag = documents_etag(scope, [progress_doc] if progress_doc else [])
         
         if not progress_doc:
             # Return empty progress
-            return jsonify({
+            return cached_json({
                 'success': True,
                 'sound_id': sound_id,
                 'current_level': 1,
                 'current_item': 0,
                 'levels': {},
                 'has_progress': False
-            }), 200
+            }, etag, weak=True)
         
         # Determine current level and item
         current_level = 1
@@ -923,23 +1041,17 @@ def get_progress(current_user, sound_id):
                         break
                 break
         
-        # Remove MongoDB _id from response
-        if '_id' in progress_doc:
-            del progress_doc['_id']
-        
-        return jsonify({
+        return cached_json({
             'success': True,
             'sound_id': sound_id,
             'current_level': current_level,
             'current_item': current_item,
             'levels': progress_doc.get('levels', {}),
             'has_progress': True
-        }), 200
+        }, etag, weak=True)
         
     except Exception as e:
-        import traceback
-        print(f"Error getting progress: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error getting progress")
         return jsonify({'success': False, 'message': 'Failed to get progress', 'error': str(e)}), 500
 
 @app.route('/api/articulation/progress/all', methods=['GET'])
@@ -948,18 +1060,19 @@ def get_all_progress(current_user):
     """Get user's progress across all sounds"""
     try:
         user_id = str(current_user['_id'])
+        scope = f'articulation:{user_id}:all'
         
-        all_progress = list(articulation_progress_collection.find({'user_id': user_id}))
+        not_modified = conditional_documents(articulation_progress_collection, {'user_id': user_id}, scope)
+        if not_modified:
+            return not_modified
         
-        # Remove MongoDB _id from each document
-        for progress in all_progress:
-            if '_id' in progress:
-                del progress['_id']
+        all_progress = list(articulation_progress_collection.find({'user_id': user_id}))
+        etag = documents_etag(scope, all_progress)
         
-        return jsonify({
+        return cached_json({
             'success': True,
             'progress': all_progress
-        }), 200
+        }, etag, weak=True)
         
     except Exception as e:
         return jsonify({'success': False, 'message': 'Failed to get all progress', 'error': str(e)}), 500
@@ -969,9 +1082,9 @@ def get_all_progress(current_user):
 def assess_expressive_language(current_user):
     """Assess expressive language using Azure Speech-to-Text and Text Analytics"""
     try:
-        import azure.cognitiveservices.speech as speechsdk
-        import io
-        import wave
+        limit = audio_limits.for_route('language')
+        audio_limits.check_content_length('language', request.content_length)
+        parse_upload(request)
         
         # Get audio file
         audio_file = request.files.get('audio')
@@ -984,142 +1097,112 @@ def assess_expressive_language(current_user):
         expected_keywords_str = request.form.get('expected_keywords', '[]')
         min_words = int(request.form.get('min_words', 5))
         
-        import json
-        expected_keywords = json.loads(expected_keywords_str)
-        
-        # Azure Speech Config
-        speech_key = os.getenv('AZURE_SPEECH_KEY')
-        service_region = os.getenv('AZURE_SPEECH_REGION')
+        # Parsed and compiled once per exercise/keyword list, then cached
+        try:
+            matcher = compile_keywords(exercise_id, expected_keywords_str)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
-        if not speech_key or not service_region:
+        if not speech_service.is_configured():
             return jsonify({'success': False, 'message': 'Azure credentials not configured'}), 500
         
-        speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
-        speech_config.speech_recognition_language = "en-US"
-        
         # Save audio to temporary file
         import tempfile
-        audio_bytes = audio_file.read()
         
         # Create temporary file for WAV audio
         temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
         temp_wav_path = temp_wav.name
         temp_wav.close()
         
+        streaming = False
         try:
-            # Write the WAV audio directly (frontend now converts to WAV)
-            with open(temp_wav_path, 'wb') as f:
-                f.write(audio_bytes)
-            
-            print(f"Audio file saved: {temp_wav_path}, size: {len(audio_bytes)} bytes")
-            
-            # Create Azure audio config with the WAV file
-            audio_config = speechsdk.audio.AudioConfig(filename=temp_wav_path)
-            speech_recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+            # Stream the WAV upload to disk in chunks (frontend now converts to WAV)
+            with AUDIO_DECODE_SECONDS.labels('language').time():
+                size_bytes = save_upload(audio_file, temp_wav_path, limit)
+                check_wav_duration(temp_wav_path, limit)
+            vad.trim_wav(temp_wav_path)
             
-            # Perform speech recognition
-            result = speech_recognizer.recognize_once()
+            logger.debug("Audio file saved", extra={'path': temp_wav_path, 'size_bytes': size_bytes})
             
-            # Close/release the recognizer to free the file
-            del speech_recognizer
-            del audio_config
+            # Continuous recognition so long answers are not cut off at the first pause
+            recognition_kwargs = {'reference_text': ' '.join(matcher.keywords)}
+            build_response = lambda result: expressive_response(result, matcher, min_words)
             
-            import os as os_module
-            import time
-            
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                transcription = result.text
-                
-                # Basic text analysis (word count, keyword matching)
-                words = transcription.lower().split()
-                word_count = len(words)
-                
-                # Check for expected keywords
-                keywords_found = []
-                for keyword in expected_keywords:
-                    if keyword.lower() in transcription.lower():
-                        keywords_found.append(keyword)
-                
-                # Calculate score
-                keyword_score = len(keywords_found) / len(expected_keywords) if expected_keywords else 0
-                word_count_score = min(word_count / min_words, 1.0)
-                
-                # Overall score (weighted average)
-                overall_score = (keyword_score * 0.7) + (word_count_score * 0.3)
-                
-                # Generate feedback
-                if overall_score >= 0.9:
-                    feedback = "Excellent! Your response was complete and covered all expected points."
-                elif overall_score >= 0.7:
-                    feedback = "Good job! Your response was mostly complete."
-                elif overall_score >= 0.5:
-                    feedback = "Fair response. Try to include more details."
-                else:
-                    feedback = "Your response needs improvement. Try to include more relevant information."
+            if wants_stream():
+                segments = []
+                def partial(segment):
+                    segments.append(segment['text'])
+                    transcription = ' '.join(segments)
+                    return {'transcription': transcription, 'word_count': len(transcription.split())}
                 
-                # Wait a bit for file handle to be released, then clean up
-                time.sleep(0.1)
-                try:
-                    if os_module.path.exists(temp_wav_path):
-                        os_module.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                
-                return jsonify({
-                    'success': True,
-                    'transcription': transcription,
-                    'key_phrases': keywords_found,
-                    'word_count': word_count,
-                    'score': overall_score,
-                    'feedback': feedback
-                }), 200
+                streaming = True
+                return stream_assessment(temp_wav_path, recognition_kwargs, partial, build_response)
             
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                # Wait a bit for file handle to be released, then clean up
-                time.sleep(0.1)
-                try:
-                    if os_module.path.exists(temp_wav_path):
-                        os_module.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                    
-                return jsonify({
-                    'success': False,
-                    'message': 'No speech could be recognized. Please try speaking more clearly.'
-                }), 400
-            
-            else:
-                # Wait a bit for file handle to be released, then clean up
-                time.sleep(0.1)
-                try:
-                    if os_module.path.exists(temp_wav_path):
-                        os_module.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                    
-                return jsonify({
-                    'success': False,
-                    'message': 'Speech recognition failed. Please try again.'
-                }), 400
+            result = speech_service.recognize_continuous(temp_wav_path, **recognition_kwargs)
+            body, status = build_response(result)
+            return jsonify(body), status
                 
-        except Exception as e:
-            # Wait a bit for file handle to be released, then clean up
-            import os as os_module
-            import time
-            time.sleep(0.1)
-            try:
-                if os_module.path.exists(temp_wav_path):
-                    os_module.unlink(temp_wav_path)
-            except Exception as cleanup_error:
-                print(f"Warning: Could not delete temp file: {cleanup_error}")
-            raise e
+        finally:
+            if not streaming:
+                cleanup_temp_file(temp_wav_path)
             
+    except AudioRejected as e:
+        return audio_rejected(e)
+    except speech_service.SpeechUnavailable as e:
+        return speech_unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print(f"Error assessing expressive language: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error assessing expressive language")
         return jsonify({'success': False, 'message': 'Assessment failed', 'error': str(e)}), 500
 
+def expressive_response(result, matcher, min_words):
+    """Response body and status for an expressive language recognition result"""
+    if result['status'] == 'no_match':
+        return {
+            'success': False,
+            'message': 'No speech could be recognized. Please try speaking more clearly.'
+        }, 400
+    if result['status'] != 'recognized':
+        return {
+            'success': False,
+            'message': 'Speech recognition failed. Please try again.'
+        }, 400
+    
+    transcription = result['text']
+    
+    # Basic text analysis (word count, keyword matching)
+    word_count = len(transcription.split())
+    
+    # Whole-word (stemmed) keyword and phrase matches in one pass over the transcript
+    keywords_found = matcher.find(transcription)
+    
+    # Calculate score
+    keyword_score = len(keywords_found) / len(matcher.keywords) if matcher.keywords else 0
+    word_count_score = min(word_count / min_words, 1.0)
+    
+    # Overall score (weighted average)
+    overall_score = (keyword_score * 0.7) + (word_count_score * 0.3)
+    
+    # Generate feedback
+    if overall_score >= 0.9:
+        feedback = "Excellent! Your response was complete and covered all expected points."
+    elif overall_score >= 0.7:
+        feedback = "Good job! Your response was mostly complete."
+    elif overall_score >= 0.5:
+        feedback = "Fair response. Try to include more details."
+    else:
+        feedback = "Your response needs improvement. Try to include more relevant information."
+    
+    return {
+        'success': True,
+        'transcription': transcription,
+        'key_phrases': keywords_found,
+        'word_count': word_count,
+        'score': overall_score,
+        'feedback': feedback
+    }, 200
+
 # Language Therapy Progress Endpoints
 @app.route('/api/language/progress', methods=['POST'])
 @token_required
@@ -1137,45 +1220,12 @@ def save_language_progress(current_user):
         user_answer = data.get('user_answer')
         transcription = data.get('transcription')
         
-        # Find or create progress document
-        progress_doc = language_progress_collection.find_one({
-            'user_id': user_id,
-            'mode': mode
-        })
-        
-        if not progress_doc:
-            # Create new progress document
-            progress_doc = {
-                'user_id': user_id,
-                'mode': mode,
-                'exercises': {},
-                'created_at': datetime.datetime.utcnow(),
-                'updated_at': datetime.datetime.utcnow()
-            }
-        
-        # Update exercise progress
-        exercise_key = str(exercise_index)
-        progress_doc.setdefault('exercises', {})[exercise_key] = {
-            'exercise_id': exercise_id,
-            'completed': True,
-            'is_correct': is_correct,
-            'score': score,
-            'user_answer': user_answer,
-            'transcription': transcription,
-            'last_attempt': datetime.datetime.utcnow()
-        }
-        
-        # Calculate overall progress
-        exercises = progress_doc.get('exercises', {})
-        total_exercises = len(exercises)
-        completed_exercises = sum(1 for ex in exercises.values() if ex.get('completed', False))
-        correct_exercises = sum(1 for ex in exercises.values() if ex.get('is_correct', False))
+        try:
+            exercise_index = int(exercise_index)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'exercise_index must be an integer'}), 400
         
-        progress_doc['total_exercises'] = total_exercises
-        progress_doc['completed_exercises'] = completed_exercises
-        progress_doc['correct_exercises'] = correct_exercises
-        progress_doc['accuracy'] = (correct_exercises / completed_exercises) if completed_exercises > 0 else 0
-        progress_doc['updated_at'] = datetime.datetime.utcnow()
+        now = datetime.datetime.utcnow()
         
         # Save trial data
         trial_data = {
@@ -1187,31 +1237,41 @@ def save_language_progress(current_user):
             'score': score,
             'user_answer': user_answer,
             'transcription': transcription,
-            'timestamp': datetime.datetime.utcnow()
+            'timestamp': now
         }
-        language_trials_collection.insert_one(trial_data)
+        trial_log.submit('language_trials', trial_data)
         
-        # Upsert progress document
-        language_progress_collection.update_one(
+        # Set the exercise and recompute totals/accuracy in one atomic upsert
+        progress_doc = language_progress_collection.find_one_and_update(
             {'user_id': user_id, 'mode': mode},
-            {'$set': progress_doc},
-            upsert=True
+            language_exercise_update(exercise_index, {
+                'exercise_id': exercise_id,
+                'completed': True,
+                'is_correct': is_correct,
+                'score': score,
+                'user_answer': user_answer,
+                'transcription': transcription,
+                'last_attempt': now
+            }, now),
+            projection={'_id': 0, 'total_exercises': 1, 'completed_exercises': 1, 'accuracy': 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
         
         return jsonify({
             'success': True,
             'message': 'Progress saved successfully',
             'progress': {
-                'completed_exercises': completed_exercises,
-                'total_exercises': total_exercises,
+                'completed_exercises': progress_doc['completed_exercises'],
+                'total_exercises': progress_doc['total_exercises'],
                 'accuracy': progress_doc['accuracy']
             }
         }), 200
         
+    except TrialLogUnavailable as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
-        import traceback
-        print(f"Error saving language progress: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error saving language progress")
         return jsonify({'success': False, 'message': 'Failed to save progress', 'error': str(e)}), 500
 
 @app.route('/api/language/progress/<mode>', methods=['GET'])
@@ -1220,15 +1280,19 @@ def get_language_progress(current_user, mode):
     """Get user's language therapy progress for a specific mode"""
     try:
         user_id = str(current_user['_id'])
+        query = {'user_id': user_id, 'mode': mode}
+        scope = f'language:{user_id}:{mode}'
         
-        progress_doc = language_progress_collection.find_one({
-            'user_id': user_id,
-            'mode': mode
-        })
+        not_modified = conditional_documents(language_progress_collection, query, scope)
+        if not_modified:
+            return not_modified
+        
+        progress_doc = language_progress_collection.find_one(query)
+        etag = documents_etag(scope, [progress_doc] if progress_doc else [])
         
         if not progress_doc:
             # Return empty progress
-            return jsonify({
+            return cached_json({
                 'success': True,
                 'mode': mode,
                 'current_exercise': 0,
@@ -1237,7 +1301,7 @@ def get_language_progress(current_user, mode):
                 'completed_exercises': 0,
                 'total_exercises': 0,
                 'accuracy': 0
-            }), 200
+            }, etag, weak=True)
         
         # Determine current exercise (first incomplete)
         current_exercise = 0
@@ -1255,11 +1319,7 @@ def get_language_progress(current_user, mode):
         
         current_exercise = max_index + 1 if max_index >= 0 else 0
         
-        # Remove MongoDB _id from response
-        if '_id' in progress_doc:
-            del progress_doc['_id']
-        
-        return jsonify({
+        return cached_json({
             'success': True,
             'mode': mode,
             'current_exercise': current_exercise,
@@ -1268,12 +1328,10 @@ def get_language_progress(current_user, mode):
             'completed_exercises': progress_doc.get('completed_exercises', 0),
             'total_exercises': progress_doc.get('total_exercises', 0),
             'accuracy': progress_doc.get('accuracy', 0)
-        }), 200
+        }, etag, weak=True)
         
     except Exception as e:
-        import traceback
-        print(f"Error getting language progress: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error getting language progress")
         return jsonify({'success': False, 'message': 'Failed to get progress', 'error': str(e)}), 500
 
 @app.route('/api/language/progress/all', methods=['GET'])
@@ -1282,18 +1340,19 @@ def get_all_language_progress(current_user):
     """Get user's progress across all language therapy modes"""
     try:
         user_id = str(current_user['_id'])
+        scope = f'language:{user_id}:all'
         
-        all_progress = list(language_progress_collection.find({'user_id': user_id}))
+        not_modified = conditional_documents(language_progress_collection, {'user_id': user_id}, scope)
+        if not_modified:
+            return not_modified
         
-        # Remove MongoDB _id from each document
-        for progress in all_progress:
-            if '_id' in progress:
-                del progress['_id']
+        all_progress = list(language_progress_collection.find({'user_id': user_id}))
+        etag = documents_etag(scope, all_progress)
         
-        return jsonify({
+        return cached_json({
             'success': True,
             'progress': all_progress
-        }), 200
+        }, etag, weak=True)
         
     except Exception as e:
         return jsonify({'success': False, 'message': 'Failed to get all language progress', 'error': str(e)}), 500
@@ -1307,10 +1366,11 @@ fluency_trials_collection = db['fluency_trials']
 def assess_fluency(current_user):
     """Assess fluency using Azure Speech-to-Text with word-level timing"""
     try:
-        import azure.cognitiveservices.speech as speechsdk
         import tempfile
-        import os as os_module
-        import time
+        
+        limit = audio_limits.for_route('fluency')
+        audio_limits.check_content_length('fluency', request.content_length)
+        parse_upload(request)
         
         # Get audio file
         audio_file = request.files.get('audio')
@@ -1322,13 +1382,9 @@ def assess_fluency(current_user):
         expected_duration = float(request.form.get('expected_duration', 10))
         exercise_type = request.form.get('exercise_type', '')
         
-        # Azure Speech Config
-        speech_key = os.getenv('AZURE_SPEECH_KEY')
-        service_region = os.getenv('AZURE_SPEECH_REGION')
-        
-        if not speech_key or not service_region or speech_key == 'YOUR_AZURE_SPEECH_KEY_HERE':
+        if not speech_service.is_configured():
             # Return mock data if Azure is not configured
-            print("Warning: Azure not configured, returning mock fluency data")
+            logger.warning("Azure not configured, returning mock fluency data")
             return jsonify({
                 'success': True,
                 'transcription': target_text,
@@ -1343,196 +1399,83 @@ def assess_fluency(current_user):
                 'words': []
             }), 200
         
-        speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
-        speech_config.speech_recognition_language = "en-US"
-        speech_config.request_word_level_timestamps()  # Enable word timing
-        
-        # Save audio to temporary file (same simple approach as language therapy)
-        audio_bytes = audio_file.read()
-        
-        # Create temporary file for WAV audio
+        # Save audio to temporary file (same approach as language therapy)
         temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
         temp_wav_path = temp_wav.name
         temp_wav.close()
         
+        streaming = False
         try:
-            # Write the WAV audio directly (frontend already converts to WAV)
-            with open(temp_wav_path, 'wb') as f:
-                f.write(audio_bytes)
-            
-            print(f"Fluency assessment - Audio file: {temp_wav_path}, size: {len(audio_bytes)} bytes")
+            # Stream the WAV upload to disk in chunks (frontend already converts to WAV)
+            with AUDIO_DECODE_SECONDS.labels('fluency').time():
+                size_bytes = save_upload(audio_file, temp_wav_path, limit)
+                check_wav_duration(temp_wav_path, limit)
+            vad.trim_wav(temp_wav_path)
             
-            # Create Azure audio config
-            audio_config = speechsdk.audio.AudioConfig(filename=temp_wav_path)
-            speech_recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+            logger.debug("Fluency audio file saved", extra={'path': temp_wav_path, 'size_bytes': size_bytes})
             
-            # Perform speech recognition with detailed results
-            result = speech_recognizer.recognize_once_async().get()
+            # Continuous recognition with word timing; pauses and disfluencies
+            # are counted as each segment arrives
+            accumulator = FluencyAccumulator()
+            recognition_kwargs = {'word_timestamps': True, 'reference_text': target_text}
+            build_response = lambda result: fluency_response(result, accumulator, expected_duration)
             
-            # Release resources
-            del speech_recognizer
-            del audio_config
-            
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                transcription = result.text
-                
-                # Get detailed timing information
-                import json
-                words = []
-                pauses = []
-                disfluencies = 0
-                
-                try:
-                    detailed_result = json.loads(result.json)
-                    
-                    # Extract word timings
-                    if 'NBest' in detailed_result and len(detailed_result['NBest']) > 0:
-                        nbest = detailed_result['NBest'][0]
-                        if 'Words' in nbest:
-                            word_list = nbest['Words']
-                except Exception as json_error:
-                    print(f"Warning: Could not parse detailed results: {json_error}")
-                    # Fall back to simple word count from transcription
-                    word_list = []
-                
-                if word_list:
-                    prev_end_time = 0
-                    prev_word = None
-                    
-                    for i, word_info in enumerate(word_list):
-                        word = word_info.get('Word', '')
-                        offset = word_info.get('Offset', 0) / 10000000  # Convert to seconds
-                        duration = word_info.get('Duration', 0) / 10000000
-                        
-                        words.append({
-                            'word': word,
-                            'offset': offset,
-                            'duration': duration
-                        })
-                        
-                        # Detect pauses (silence > 300ms between words)
-                        if i > 0:
-                            pause_duration = offset - prev_end_time
-                            if pause_duration > 0.3:  # 300ms threshold
-                                pauses.append({
-                                    'position': i,
-                                    'duration': pause_duration
-                                })
-                        
-                        # Detect repetitions (same word repeated consecutively)
-                        if prev_word and word.lower() == prev_word.lower():
-                            disfluencies += 1
-                        
-                        # Detect prolongations (word duration > 1.5x expected)
-                        expected_word_duration = len(word) * 0.1  # Rough estimate
-                        if duration > expected_word_duration * 1.5:
-                            disfluencies += 1
-                        
-                        prev_end_time = offset + duration
-                        prev_word = word
-                
-                # Calculate metrics
-                total_words = len(words) if words else len(transcription.split())
-                total_duration = words[-1]['offset'] + words[-1]['duration'] if words else expected_duration
+            if wants_stream():
+                def partial(segment):
+                    accumulator.add_segment(segment)
+                    return accumulator.partial()
                 
-                # Speaking rate (WPM)
-                speaking_rate = int((total_words / total_duration) * 60) if total_duration > 0 else 0
-                
-                # Pause count
-                pause_count = len(pauses)
-                
-                # Calculate fluency score (0-100)
-                # Factors: speaking rate, pauses, disfluencies
-                
-                # Ideal speaking rate: 120-150 WPM
-                rate_score = 100
-                if speaking_rate < 80 or speaking_rate > 180:
-                    rate_score = max(0, 100 - abs(speaking_rate - 120))
-                
-                # Pause penalty: -5 points per excessive pause
-                pause_penalty = min(30, pause_count * 5)
-                
-                # Disfluency penalty: -10 points per disfluency
-                disfluency_penalty = min(40, disfluencies * 10)
-                
-                fluency_score = max(0, min(100, rate_score - pause_penalty - disfluency_penalty))
-                
-                # Generate feedback
-                if fluency_score >= 90:
-                    feedback = "Excellent fluency! Your speech was smooth and natural."
-                elif fluency_score >= 75:
-                    feedback = "Good fluency! Keep practicing to improve smoothness."
-                elif fluency_score >= 60:
-                    feedback = "Fair fluency. Try to reduce pauses and speak more steadily."
-                else:
-                    feedback = "Keep practicing. Focus on breathing and speaking slowly."
-                
-                print(f"Fluency Assessment Results:")
-                print(f"  Transcription: {transcription}")
-                print(f"  Words: {total_words}, Duration: {total_duration:.2f}s")
-                print(f"  Speaking Rate: {speaking_rate} WPM")
-                print(f"  Pauses: {pause_count}, Disfluencies: {disfluencies}")
-                print(f"  Fluency Score: {fluency_score}")
-                
-                # Clean up temp file
-                try:
-                    if os.path.exists(temp_wav_path):
-                        os.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                
-                return jsonify({
-                    'success': True,
-                    'transcription': transcription,
-                    'speaking_rate': speaking_rate,
-                    'fluency_score': fluency_score,
-                    'pause_count': pause_count,
-                    'disfluencies': disfluencies,
-                    'duration': round(total_duration, 1),
-                    'word_count': total_words,
-                    'feedback': feedback,
-                    'pauses': pauses[:5],  # Return first 5 pauses for analysis
-                    'words': words[:20]  # Return first 20 words for analysis
-                }), 200
+                streaming = True
+                return stream_assessment(temp_wav_path, recognition_kwargs, partial, build_response)
             
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                try:
-                    if os.path.exists(temp_wav_path):
-                        os.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                    
-                return jsonify({
-                    'success': False,
-                    'message': 'No speech could be recognized. Please try speaking more clearly.'
-                }), 400
-            
-            else:
-                try:
-                    if os.path.exists(temp_wav_path):
-                        os.unlink(temp_wav_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Could not delete temp file: {cleanup_error}")
-                    
-                return jsonify({
-                    'success': False,
-                    'message': 'Speech recognition failed. Please try again.'
-                }), 400
+            result = speech_service.recognize_continuous(
+                temp_wav_path, on_segment=accumulator.add_segment, **recognition_kwargs
+            )
+            body, status = build_response(result)
+            return jsonify(body), status
                 
-        except Exception as e:
-            try:
-                if os.path.exists(temp_wav_path):
-                    os.unlink(temp_wav_path)
-            except Exception as cleanup_error:
-                print(f"Warning: Could not delete temp file: {cleanup_error}")
-            raise e
+        finally:
+            if not streaming:
+                cleanup_temp_file(temp_wav_path)
             
+    except AudioRejected as e:
+        return audio_rejected(e)
+    except speech_service.SpeechUnavailable as e:
+        return speech_unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print(f"Error assessing fluency: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error assessing fluency")
         return jsonify({'success': False, 'message': 'Assessment failed', 'error': str(e)}), 500
 
+def fluency_response(result, accumulator, expected_duration):
+    """Response body and status for a fluency recognition result"""
+    if result['status'] == 'no_match':
+        return {
+            'success': False,
+            'message': 'No speech could be recognized. Please try speaking more clearly.'
+        }, 400
+    if result['status'] != 'recognized':
+        return {
+            'success': False,
+            'message': 'Speech recognition failed. Please try again.'
+        }, 400
+    
+    metrics = accumulator.result(expected_duration)
+    
+    logger.info("Fluency assessment", extra={
+        'transcription': metrics['transcription'],
+        'word_count': metrics['word_count'],
+        'duration': metrics['duration'],
+        'segments': result.get('segments', 1),
+        'speaking_rate': metrics['speaking_rate'],
+        'pause_count': metrics['pause_count'],
+        'disfluencies': metrics['disfluencies'],
+        'fluency_score': metrics['fluency_score']
+    })
+    
+    return {'success': True, **metrics}, 200
+
 @app.route('/api/fluency/progress', methods=['POST'])
 @token_required
 def save_fluency_progress(current_user):
@@ -1550,36 +1493,13 @@ def save_fluency_progress(current_user):
         disfluencies = data.get('disfluencies', 0)
         passed = data.get('passed', False)
         
-        # Find or create progress document
-        progress_doc = fluency_progress_collection.find_one({'user_id': user_id})
-        
-        if not progress_doc:
-            progress_doc = {
-                'user_id': user_id,
-                'levels': {},
-                'created_at': utc_now(),
-                'updated_at': utc_now()
-            }
-        
-        # Update level progress
-        level_key = str(level)
-        if level_key not in progress_doc.get('levels', {}):
-            progress_doc.setdefault('levels', {})[level_key] = {'exercises': {}}
-        
-        # Update exercise progress
-        exercise_key = str(exercise_index)
-        progress_doc['levels'][level_key]['exercises'][exercise_key] = {
-            'exercise_id': exercise_id,
-            'completed': True,
-            'speaking_rate': speaking_rate,
-            'fluency_score': fluency_score,
-            'pause_count': pause_count,
-            'disfluencies': disfluencies,
-            'passed': passed,
-            'last_attempt': utc_now()
-        }
+        try:
+            level = int(level)
+            exercise_index = int(exercise_index)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'level and exercise_index must be integers'}), 400
         
-        progress_doc['updated_at'] = utc_now()
+        now = utc_now()
         
         # Save trial data
         trial_data = {
@@ -1592,14 +1512,23 @@ def save_fluency_progress(current_user):
             'pause_count': pause_count,
             'disfluencies': disfluencies,
             'passed': passed,
-            'timestamp': utc_now()
+            'timestamp': now
         }
-        fluency_trials_collection.insert_one(trial_data)
+        trial_log.submit('fluency_trials', trial_data)
         
-        # Upsert progress document
+        # Set only the touched exercise (upserts the document on first save)
         fluency_progress_collection.update_one(
             {'user_id': user_id},
-            {'$set': progress_doc},
+            fluency_exercise_update(level, exercise_index, {
+                'exercise_id': exercise_id,
+                'completed': True,
+                'speaking_rate': speaking_rate,
+                'fluency_score': fluency_score,
+                'pause_count': pause_count,
+                'disfluencies': disfluencies,
+                'passed': passed,
+                'last_attempt': now
+            }, now),
             upsert=True
         )
         
@@ -1608,10 +1537,10 @@ def save_fluency_progress(current_user):
             'message': 'Fluency progress saved successfully'
         }), 200
         
+    except TrialLogUnavailable as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
-        import traceback
-        print(f"Error saving fluency progress: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error saving fluency progress")
         return jsonify({'success': False, 'message': 'Failed to save progress', 'error': str(e)}), 500
 
 @app.route('/api/fluency/progress', methods=['GET'])
@@ -1620,17 +1549,23 @@ def get_fluency_progress(current_user):
     """Get user's fluency therapy progress"""
     try:
         user_id = str(current_user['_id'])
+        scope = f'fluency:{user_id}'
+        
+        not_modified = conditional_documents(fluency_progress_collection, {'user_id': user_id}, scope)
+        if not_modified:
+            return not_modified
         
         progress_doc = fluency_progress_collection.find_one({'user_id': user_id})
+        etag = documents_etag(scope, [progress_doc] if progress_doc else [])
         
         if not progress_doc:
-            return jsonify({
+            return cached_json({
                 'success': True,
                 'current_level': 1,
                 'current_exercise': 0,
                 'levels': {},
                 'has_progress': False
-            }), 200
+            }, etag, weak=True)
         
         # Determine current level and exercise
         current_level = 1
@@ -1659,22 +1594,16 @@ def get_fluency_progress(current_user):
             if not level_complete:
                 break
         
-        # Remove MongoDB _id
-        if '_id' in progress_doc:
-            del progress_doc['_id']
-        
-        return jsonify({
+        return cached_json({
             'success': True,
             'current_level': current_level,
             'current_exercise': current_exercise,
             'levels': progress_doc.get('levels', {}),
             'has_progress': True
-        }), 200
+        }, etag, weak=True)
         
     except Exception as e:
-        import traceback
-        print(f"Error getting fluency progress: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error getting fluency progress")
         return jsonify({'success': False, 'message': 'Failed to get progress', 'error': str(e)}), 500
 
 # ========== ADMIN ENDPOINTS ==========
@@ -1688,194 +1617,94 @@ def get_admin_stats(current_user):
         if current_user.get('role') != 'admin':
             return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
         
-        # Total users count
-        total_users = users_collection.count_documents({})
-        
-        # Active users (users who have any progress)
-        active_users = len(set(
-            list(articulation_progress_collection.distinct('user_id')) +
-            list(language_progress_collection.distinct('user_id')) +
-            list(db['fluency_progress'].distinct('user_id'))
-        ))
-        
-        # Total therapy sessions (all trials combined)
-        articulation_sessions = articulation_trials_collection.count_documents({})
-        language_sessions = language_trials_collection.count_documents({})
-        fluency_sessions = db['fluency_trials'].count_documents({})
-        total_sessions = articulation_sessions + language_sessions + fluency_sessions
-        
-        # Therapy completions (users who completed at least one therapy)
-        articulation_completions = articulation_progress_collection.count_documents({'completed': True})
-        language_completions = language_progress_collection.count_documents({'all_levels_completed': True})
-        fluency_completions = db['fluency_progress'].count_documents({'levels.5.completed': True})
-        total_completions = articulation_completions + language_completions + fluency_completions
-        
-        # Average scores
-        articulation_avg = list(articulation_trials_collection.aggregate([
-            {'$group': {'_id': None, 'avg_score': {'$avg': '$accuracy_score'}}}
-        ]))
-        language_avg = list(language_trials_collection.aggregate([
-            {'$group': {'_id': None, 'avg_score': {'$avg': '$accuracy_score'}}}
-        ]))
-        fluency_avg = list(db['fluency_trials'].aggregate([
-            {'$group': {'_id': None, 'avg_score': {'$avg': '$fluency_score'}}}
-        ]))
-        
-        avg_score = 0
-        score_count = 0
-        if articulation_avg and articulation_avg[0].get('avg_score') is not None:
-            avg_score += articulation_avg[0]['avg_score']
-            score_count += 1
-        if language_avg and language_avg[0].get('avg_score') is not None:
-            avg_score += language_avg[0]['avg_score']
-            score_count += 1
-        if fluency_avg and fluency_avg[0].get('avg_score') is not None:
-            avg_score += fluency_avg[0]['avg_score']
-            score_count += 1
-        
-        average_score = round(avg_score / score_count, 1) if score_count > 0 else 0
-        
-        # Therapy type distribution
-        speech_users = users_collection.count_documents({'therapyType': 'speech'})
-        physical_users = users_collection.count_documents({'therapyType': 'physical'})
-        
-        # Recent activity (last 10 completions)
-        recent_trials = list(db['fluency_trials'].find({}).sort('created_at', -1).limit(10))
-        recent_activity = []
-        for trial in recent_trials:
-            try:
-                user = users_collection.find_one({'_id': ObjectId(trial['user_id'])})
-                if user:
-                    timestamp = trial.get('created_at', utc_now())
-                    # Ensure timestamp is datetime object
-                    if isinstance(timestamp, str):
-                        timestamp = datetime.datetime.fromisoformat(timestamp)
-                    
-                    recent_activity.append({
-                        'user_name': f"{user.get('firstName', 'Unknown')} {user.get('lastName', 'User')}",
-                        'therapy_type': 'Fluency Therapy',
-                        'score': trial.get('fluency_score', 0),
-                        'timestamp': timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp),
-                        'status': 'completed' if trial.get('fluency_score', 0) >= 70 else 'practicing'
-                    })
-            except Exception as e:
-                print(f"Error processing trial: {str(e)}")
-                continue
-        
-        # Session trends (last 7 days)
-        seven_days_ago = utc_now() - datetime.timedelta(days=7)
-        daily_sessions = {}
-        
-        for i in range(7):
-            day = seven_days_ago + datetime.timedelta(days=i)
-            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + datetime.timedelta(days=1)
-            
-            count = (
-                articulation_trials_collection.count_documents({
-                    'created_at': {'$gte': day_start, '$lt': day_end}
-                }) +
-                language_trials_collection.count_documents({
-                    'created_at': {'$gte': day_start, '$lt': day_end}
-                }) +
-                db['fluency_trials'].count_documents({
-                    'created_at': {'$gte': day_start, '$lt': day_end}
-                })
-            )
-            
-            daily_sessions[day.strftime('%Y-%m-%d')] = count
+        # One aggregation over users, progress and the daily rollups
+        dashboard = compute_admin_stats(now=utc_now())
         
         return jsonify({
             'success': True,
-            'stats': {
-                'total_users': total_users,
-                'active_users': active_users,
-                'total_sessions': total_sessions,
-                'total_completions': total_completions,
-                'average_score': average_score,
-                'speech_users': speech_users,
-                'physical_users': physical_users,
-                'articulation_sessions': articulation_sessions,
-                'language_sessions': language_sessions,
-                'fluency_sessions': fluency_sessions,
-                'articulation_avg': round(articulation_avg[0]['avg_score'], 1) if articulation_avg and articulation_avg[0].get('avg_score') is not None else 0,
-                'language_avg': round(language_avg[0]['avg_score'], 1) if language_avg and language_avg[0].get('avg_score') is not None else 0,
-                'fluency_avg': round(fluency_avg[0]['avg_score'], 1) if fluency_avg and fluency_avg[0].get('avg_score') is not None else 0
-            },
-            'therapy_distribution': {
-                'speech': speech_users,
-                'physical': physical_users
-            },
-            'recent_activity': recent_activity,
-            'session_trends': daily_sessions
+            **dashboard
         }), 200
         
     except Exception as e:
-        import traceback
-        print(f"Error getting admin stats: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error getting admin stats")
         return jsonify({'success': False, 'message': 'Failed to get admin stats', 'error': str(e)}), 500
 
+@app.route('/api/admin/trial-log/stats', methods=['GET'])
+@token_required
+def get_trial_log_stats(current_user):
+    """Trial log writer buffer depth and flush latency (admin only)"""
+    if current_user.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
+    
+    return jsonify({
+        'success': True,
+        'stats': trial_log.stats()
+    }), 200
+
+@app.route('/api/admin/auth/hasher-stats', methods=['GET'])
+@token_required
+def get_password_hasher_stats(current_user):
+    """Password hashing queue depth and latency for this worker (admin only)"""
+    if current_user.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
+    
+    return jsonify({
+        'success': True,
+        'stats': password_hasher.stats()
+    }), 200
+
+@app.route('/api/admin/auth/firebase-stats', methods=['GET'])
+@token_required
+def get_firebase_verifier_stats(current_user):
+    """Firebase token cache hits and signing-certificate freshness for this worker (admin only)"""
+    if current_user.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
+    
+    return jsonify({
+        'success': True,
+        'stats': firebase_verifier.stats()
+    }), 200
+
+@app.route('/api/admin/db/pool-stats', methods=['GET'])
+@token_required
+def get_db_pool_stats(current_user):
+    """MongoDB connection pool checkouts and checkout-wait latency for this worker (admin only)"""
+    if current_user.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
+    
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'stats': pool_metrics.stats()
+    }), 200
+
 @app.route('/api/admin/users', methods=['GET'])
 @token_required
 def get_all_users(current_user):
-    """Get all users for admin management"""
+    """
+    Get a page of users for admin management
+    
+    Query params: cursor (next_cursor of the previous page) or page, limit, role,
+    therapy_type, active_after, active_before,
+    sort (last_active, created_at, role, therapy_type, name, email), order (asc, desc)
+    """
     try:
         # Check if user is admin
         if current_user.get('role') != 'admin':
             return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
         
-        # Get all users
-        users = list(users_collection.find({}))
-        
-        user_list = []
-        for user in users:
-            # Get user's progress across therapies
-            articulation_prog = articulation_progress_collection.find_one({'user_id': str(user['_id'])})
-            language_prog = language_progress_collection.find_one({'user_id': str(user['_id'])})
-            fluency_prog = db['fluency_progress'].find_one({'user_id': str(user['_id'])})
-            
-            # Count sessions
-            articulation_count = articulation_trials_collection.count_documents({'user_id': str(user['_id'])})
-            language_count = language_trials_collection.count_documents({'user_id': str(user['_id'])})
-            fluency_count = db['fluency_trials'].count_documents({'user_id': str(user['_id'])})
-            total_sessions = articulation_count + language_count + fluency_count
-            
-            # Calculate overall progress
-            progress_count = 0
-            if articulation_prog:
-                progress_count += 1
-            if language_prog:
-                progress_count += 1
-            if fluency_prog:
-                progress_count += 1
-            
-            user_list.append({
-                'id': str(user['_id']),
-                'email': user.get('email', ''),
-                'firstName': user.get('firstName', ''),
-                'lastName': user.get('lastName', ''),
-                'role': user.get('role', 'patient'),
-                'therapyType': user.get('therapyType', 'N/A'),
-                'patientType': user.get('patientType', 'N/A'),
-                'gender': user.get('gender', 'N/A'),
-                'age': user.get('age', 'N/A'),
-                'created_at': user.get('created_at', utc_now()).isoformat(),
-                'total_sessions': total_sessions,
-                'active_therapies': progress_count,
-                'last_active': user.get('updated_at', user.get('created_at', utc_now())).isoformat()
-            })
+        try:
+            page = list_users_page(request.args, now=utc_now())
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
         return jsonify({
             'success': True,
-            'users': user_list,
-            'total_count': len(user_list)
+            **page
         }), 200
         
     except Exception as e:
-        import traceback
-        print(f"Error getting users: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error getting users")
         return jsonify({'success': False, 'message': 'Failed to get users', 'error': str(e)}), 500
 
 @app.route('/api/admin/users/<user_id>', methods=['PUT'])
@@ -1901,6 +1730,7 @@ def admin_update_user(current_user, user_id):
             return jsonify({'message': 'No valid fields to update'}), 400
         
         update_fields['updated_at'] = utc_now()
+        update_fields['last_active'] = update_fields['updated_at']
         
         # Update user
         result = users_collection.update_one(
@@ -1917,15 +1747,26 @@ def admin_update_user(current_user, user_id):
         }), 200
         
     except Exception as e:
-        import traceback
-        print(f"Error updating user: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error updating user")
         return jsonify({'success': False, 'message': 'Failed to update user', 'error': str(e)}), 500
 
+@app.route('/api/admin/users/<user_id>/phonemes', methods=['GET'])
+@token_required
+def admin_get_user_phoneme_stats(current_user, user_id):
+    """A patient's per-phoneme accuracy index (admin only)"""
+    try:
+        if current_user.get('role') != 'admin':
+            return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
+        
+        return phoneme_stats_response(user_id)
+    except Exception as e:
+        logger.exception("Error getting phoneme stats")
+        return jsonify({'success': False, 'message': 'Failed to get phoneme stats', 'error': str(e)}), 500
+
 @app.route('/api/admin/users/<user_id>', methods=['DELETE'])
 @token_required
 def admin_delete_user(current_user, user_id):
-    """Delete user (admin only)"""
+    """Queue deletion of a user and all their data (admin only); returns 202 with a job to poll"""
     try:
         # Check if user is admin
         if current_user.get('role') != 'admin':
@@ -1935,70 +1776,113 @@ def admin_delete_user(current_user, user_id):
         if str(current_user['_id']) == user_id:
             return jsonify({'message': 'Cannot delete your own account'}), 400
         
-        # Delete user and all their data
-        users_collection.delete_one({'_id': ObjectId(user_id)})
-        articulation_progress_collection.delete_many({'user_id': user_id})
-        articulation_trials_collection.delete_many({'user_id': user_id})
-        language_progress_collection.delete_many({'user_id': user_id})
-        language_trials_collection.delete_many({'user_id': user_id})
-        db['fluency_progress'].delete_many({'user_id': user_id})
-        db['fluency_trials'].delete_many({'user_id': user_id})
+        # The cascade runs in the background (transaction where supported, resumable steps otherwise)
+        job = deletion_jobs.enqueue(user_id, requested_by=str(current_user['_id']))
+        status_url = f"/api/admin/jobs/deletions/{job['_id']}"
         
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'message': 'User and all associated data deleted successfully'
-        }), 200
+            'message': 'User deletion started',
+            'job': job_summary(job),
+            'status_url': status_url
+        })
+        response.status_code = 202
+        response.headers['Location'] = status_url
+        return response
         
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        import traceback
-        print(f"Error deleting user: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error deleting user")
         return jsonify({'success': False, 'message': 'Failed to delete user', 'error': str(e)}), 500
 
+@app.route('/api/admin/jobs/deletions/<job_id>', methods=['GET'])
+@token_required
+def get_deletion_job(current_user, job_id):
+    """Status and per-collection progress of a user deletion job (admin only)"""
+    if current_user.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
+    
+    try:
+        job = deletion_jobs.get(job_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    
+    return jsonify({'success': True, 'job': job_summary(job)}), 200
+
+def format_trial_timestamp(value):
+    """Trial timestamp, falling back to now for legacy documents"""
+    return value or utc_now()
+
+def paginated_therapy_data(collection, query, sort_field, projection, build_row):
+    """
+    Fetch one page of trials (newest first) and attach user name/email with one $in query
+    
+    Query params: limit (default 50, max 200) and cursor (next_cursor from the previous page)
+    """
+    limit = parse_page_size(request.args.get('limit'))
+    trials, next_cursor = fetch_trials_page(
+        collection, query, sort_field, projection,
+        cursor=request.args.get('cursor'), limit=limit
+    )
+    users = hydrate_users(trials)
+    
+    therapy_data = []
+    for trial in trials:
+        user = users.get(str(trial.get('user_id')))
+        if user:
+            row = build_row(trial)
+            row['id'] = str(trial['_id'])
+            row['user_name'] = f"{user.get('firstName', 'Unknown')} {user.get('lastName', 'User')}"
+            row['user_email'] = user.get('email', 'N/A')
+            therapy_data.append(row)
+    
+    return therapy_data, next_cursor
+
 @app.route('/api/admin/therapies/articulation', methods=['GET'])
 @token_required
 def get_articulation_therapy_data(current_user):
-    """Get all articulation therapy data (admin only)"""
+    """Get a page of articulation therapy data (admin only)"""
     try:
         # Check if user is admin
         if current_user.get('role') != 'admin':
             return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
         
-        # Get all articulation trials with user info
-        trials = list(articulation_trials_collection.find({}).sort('created_at', -1))
-        
-        therapy_data = []
-        for trial in trials:
-            user = users_collection.find_one({'_id': ObjectId(trial['user_id'])})
-            if user:
-                therapy_data.append({
-                    'id': str(trial['_id']),
-                    'user_name': f"{user.get('firstName', 'Unknown')} {user.get('lastName', 'User')}",
-                    'user_email': user.get('email', 'N/A'),
-                    'sound': trial.get('sound', 'N/A'),
-                    'word': trial.get('word', 'N/A'),
-                    'score': trial.get('score', 0),
-                    'is_correct': trial.get('is_correct', False),
-                    'transcription': trial.get('transcription', ''),
-                    'created_at': trial.get('created_at', datetime.datetime.utcnow()).isoformat() if trial.get('created_at') else datetime.datetime.utcnow().isoformat()
-                })
+        therapy_data, next_cursor = paginated_therapy_data(
+            articulation_trials_collection, {}, 'timestamp',
+            {'user_id': 1, 'sound': 1, 'sound_id': 1, 'word': 1, 'target': 1, 'score': 1,
+             'scores.computed_score': 1, 'is_correct': 1, 'transcription': 1, 'timestamp': 1},
+            lambda trial: {
+                'sound': trial.get('sound', trial.get('sound_id', 'N/A')),
+                'word': trial.get('word', trial.get('target', 'N/A')),
+                'score': trial.get('score', trial.get('scores', {}).get('computed_score', 0)),
+                'is_correct': trial.get('is_correct', False),
+                'transcription': trial.get('transcription', ''),
+                'created_at': format_trial_timestamp(trial.get('timestamp'))
+            }
+        )
         
         return jsonify({
             'success': True,
             'data': therapy_data,
-            'total': len(therapy_data)
+            'total': len(therapy_data),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         }), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        import traceback
-        print(f"Error fetching articulation data: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error fetching articulation data")
         return jsonify({'success': False, 'message': 'Failed to fetch data', 'error': str(e)}), 500
 
 @app.route('/api/admin/therapies/language/<mode>', methods=['GET'])
 @token_required
 def get_language_therapy_data(current_user, mode):
-    """Get all language therapy data for a specific mode (admin only)"""
+    """Get a page of language therapy data for a specific mode (admin only)"""
     try:
         # Check if user is admin
         if current_user.get('role') != 'admin':
@@ -2008,128 +1892,245 @@ def get_language_therapy_data(current_user, mode):
         if mode not in ['receptive', 'expressive']:
             return jsonify({'message': 'Invalid mode. Must be receptive or expressive'}), 400
         
-        # Get all language trials for this mode with user info
-        trials = list(language_trials_collection.find({'mode': mode}).sort('timestamp', -1))
-        
-        therapy_data = []
-        for trial in trials:
-            user = users_collection.find_one({'_id': ObjectId(trial['user_id'])})
-            if user:
-                therapy_data.append({
-                    'id': str(trial['_id']),
-                    'user_name': f"{user.get('firstName', 'Unknown')} {user.get('lastName', 'User')}",
-                    'user_email': user.get('email', 'N/A'),
-                    'mode': trial.get('mode', mode),
-                    'exercise_id': trial.get('exercise_id', 'N/A'),
-                    'exercise_index': trial.get('exercise_index', 0),
-                    'score': trial.get('score', 0),
-                    'is_correct': trial.get('is_correct', False),
-                    'user_answer': trial.get('user_answer', ''),
-                    'transcription': trial.get('transcription', ''),
-                    'created_at': trial.get('timestamp', datetime.datetime.utcnow()).isoformat() if trial.get('timestamp') else datetime.datetime.utcnow().isoformat()
-                })
+        therapy_data, next_cursor = paginated_therapy_data(
+            language_trials_collection, {'mode': mode}, 'timestamp',
+            {'user_id': 1, 'mode': 1, 'exercise_id': 1, 'exercise_index': 1, 'score': 1,
+             'is_correct': 1, 'user_answer': 1, 'transcription': 1, 'timestamp': 1},
+            lambda trial: {
+                'mode': trial.get('mode', mode),
+                'exercise_id': trial.get('exercise_id', 'N/A'),
+                'exercise_index': trial.get('exercise_index', 0),
+                'score': trial.get('score', 0),
+                'is_correct': trial.get('is_correct', False),
+                'user_answer': trial.get('user_answer', ''),
+                'transcription': trial.get('transcription', ''),
+                'created_at': format_trial_timestamp(trial.get('timestamp'))
+            }
+        )
         
         return jsonify({
             'success': True,
             'mode': mode,
             'data': therapy_data,
-            'total': len(therapy_data)
+            'total': len(therapy_data),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         }), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        import traceback
-        print(f"Error fetching language data: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error fetching language data")
         return jsonify({'success': False, 'message': 'Failed to fetch data', 'error': str(e)}), 500
 
 @app.route('/api/admin/therapies/fluency', methods=['GET'])
 @token_required
 def get_fluency_therapy_data(current_user):
-    """Get all fluency therapy data (admin only)"""
+    """Get a page of fluency therapy data (admin only)"""
     try:
         # Check if user is admin
         if current_user.get('role') != 'admin':
             return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
         
-        # Get all fluency trials with user info
-        trials = list(db['fluency_trials'].find({}).sort('created_at', -1))
-        
-        therapy_data = []
-        for trial in trials:
-            user = users_collection.find_one({'_id': ObjectId(trial['user_id'])})
-            if user:
-                therapy_data.append({
-                    'id': str(trial['_id']),
-                    'user_name': f"{user.get('firstName', 'Unknown')} {user.get('lastName', 'User')}",
-                    'user_email': user.get('email', 'N/A'),
-                    'exercise_type': trial.get('exercise_type', 'N/A'),
-                    'fluency_score': trial.get('fluency_score', 0),
-                    'transcription': trial.get('transcription', ''),
-                    'word_count': trial.get('word_count', 0),
-                    'filler_count': trial.get('filler_count', 0),
-                    'created_at': trial.get('created_at', datetime.datetime.utcnow()).isoformat() if trial.get('created_at') else datetime.datetime.utcnow().isoformat()
-                })
+        therapy_data, next_cursor = paginated_therapy_data(
+            fluency_trials_collection, {}, 'timestamp',
+            {'user_id': 1, 'exercise_type': 1, 'exercise_id': 1, 'fluency_score': 1, 'transcription': 1,
+             'word_count': 1, 'filler_count': 1, 'disfluencies': 1, 'timestamp': 1},
+            lambda trial: {
+                'exercise_type': trial.get('exercise_type', trial.get('exercise_id', 'N/A')),
+                'fluency_score': trial.get('fluency_score', 0),
+                'transcription': trial.get('transcription', ''),
+                'word_count': trial.get('word_count', 0),
+                'filler_count': trial.get('filler_count', trial.get('disfluencies', 0)),
+                'created_at': format_trial_timestamp(trial.get('timestamp'))
+            }
+        )
         
         return jsonify({
             'success': True,
             'data': therapy_data,
-            'total': len(therapy_data)
+            'total': len(therapy_data),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         }), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        import traceback
-        print(f"Error fetching fluency data: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error fetching fluency data")
         return jsonify({'success': False, 'message': 'Failed to fetch data', 'error': str(e)}), 500
 
 @app.route('/api/admin/therapies/physical', methods=['GET'])
 @token_required
 def get_physical_therapy_data(current_user):
-    """Get all physical therapy data (admin only)"""
+    """Get a page of physical therapy data (admin only)"""
     try:
         # Check if user is admin
         if current_user.get('role') != 'admin':
             return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
         
-        # Check if physical therapy collection exists
-        if 'physical_trials' in db.list_collection_names():
-            trials = list(db['physical_trials'].find({}).sort('created_at', -1))
-            
-            therapy_data = []
-            for trial in trials:
-                user = users_collection.find_one({'_id': ObjectId(trial['user_id'])})
-                if user:
-                    therapy_data.append({
-                        'id': str(trial['_id']),
-                        'user_name': f"{user.get('firstName', 'Unknown')} {user.get('lastName', 'User')}",
-                        'user_email': user.get('email', 'N/A'),
-                        'exercise_type': trial.get('exercise_type', 'N/A'),
-                        'score': trial.get('score', 0),
-                        'duration': trial.get('duration', 0),
-                        'created_at': trial.get('created_at', datetime.datetime.utcnow()).isoformat() if trial.get('created_at') else datetime.datetime.utcnow().isoformat()
-                    })
-            
-            return jsonify({
-                'success': True,
-                'data': therapy_data,
-                'total': len(therapy_data)
-            }), 200
-        else:
+        therapy_data, next_cursor = paginated_therapy_data(
+            db['physical_trials'], {}, 'created_at',
+            {'user_id': 1, 'exercise_type': 1, 'score': 1, 'duration': 1, 'created_at': 1},
+            lambda trial: {
+                'exercise_type': trial.get('exercise_type', 'N/A'),
+                'score': trial.get('score', 0),
+                'duration': trial.get('duration', 0),
+                'created_at': format_trial_timestamp(trial.get('created_at'))
+            }
+        )
+        
+        response = {
+            'success': True,
+            'data': therapy_data,
+            'total': len(therapy_data),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+        if not therapy_data and not request.args.get('cursor'):
             # No physical therapy data yet
-            return jsonify({
-                'success': True,
-                'data': [],
-                'total': 0,
-                'message': 'No physical therapy data available'
-            }), 200
+            response['message'] = 'No physical therapy data available'
+        
+        return jsonify(response), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        import traceback
-        print(f"Error fetching physical therapy data: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error fetching physical therapy data")
         return jsonify({'success': False, 'message': 'Failed to fetch data', 'error': str(e)}), 500
 
+@app.route('/api/admin/export/<therapy>', methods=['GET'])
+@token_required
+def export_therapy_trials(current_user, therapy):
+    """
+    Stream every trial of a therapy as NDJSON or CSV (admin only)
+    
+    Query params: format, fields, from, to, user_id, mode, batch_size, users (see trial_export)
+    """
+    if current_user.get('role') != 'admin':
+        return jsonify({'message': 'Unauthorized. Admin access required.'}), 403
+    
+    try:
+        spec = parse_export_args(therapy, request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return Response(
+        stream_export(spec, app.json.dumps),
+        mimetype=spec.mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{spec.filename}"',
+            'Cache-Control': 'no-store'
+        }
+    )
+
+def _register_blueprints():
+    """Register the CRUD blueprints (no I/O: the database handle connects lazily)"""
+    with startup_timer.phase('blueprints'):
+        # Register fluency CRUD blueprint
+        app.register_blueprint(fluency_bp)
+        init_fluency_crud(db)
+        
+        # Register language CRUD blueprint
+        app.register_blueprint(language_bp)
+        init_language_crud(db, app.config['SECRET_KEY'])
+        
+        # Register receptive CRUD blueprint
+        app.register_blueprint(receptive_bp)
+        init_receptive_crud(db, app.config['SECRET_KEY'])
+        
+        # Register articulation CRUD blueprint
+        app.register_blueprint(articulation_bp, url_prefix='/api/articulation/exercises')
+        init_articulation_crud(db, app.config['SECRET_KEY'])
+
+def _init_subsystems():
+    """Hand the database handle to the helper modules (no I/O)"""
+    with startup_timer.phase('subsystems'):
+        # Admin dashboard rollups and listings
+        init_stats_rollup(db)
+        init_admin_queries(db)
+        init_phoneme_stats(db)
+        init_trial_export(db)
+
+_services_pid = None
+_services_lock = threading.Lock()
+
+def _warm_up_in_background():
+    warm_up(startup_timer)
+    startup_timer.log_report()
+
+def start_background_services():
+    """
+    Start this process's background threads once (deletion jobs, Firebase certs, index sync, warm-up)
+
+    Called from gunicorn's post_worker_init, from create_app and, as a
+    fallback, before the first request a process serves, but never at import,
+    so a preloading gunicorn master starts no threads and opens no connections.
+    Every entry point (`flask --app app run`, a bare `gunicorn app:app`) thus
+    warms up and eventually turns /api/ready green.
+    """
+    global _services_pid
+    if _services_pid == os.getpid():
+        return
+    with _services_lock:
+        if _services_pid == os.getpid():
+            return
+        with startup_timer.phase('background services'):
+            # Resume user deletions left unfinished by a previous process
+            deletion_jobs.start()
+            
+            # Fetch Firebase signing certificates before the first social sign-in
+            firebase_verifier.start()
+            
+            # Create any missing indexes without blocking startup (disable with SYNC_INDEXES_ON_STARTUP=false)
+            if os.getenv('SYNC_INDEXES_ON_STARTUP', 'true').lower() == 'true':
+                sync_indexes_in_background(db)
+            
+            # Preload audio/speech modules off the request path (disable with WARM_UP_ON_START=false)
+            if os.getenv('WARM_UP_ON_START', 'true').lower() == 'true':
+                threading.Thread(target=_warm_up_in_background, name='warm-up', daemon=True).start()
+            else:
+                mark_ready()
+        _services_pid = os.getpid()
+
+@app.before_request
+def ensure_background_services():
+    start_background_services()
+
+def create_app(warm=None):
+    """
+    Application factory for single-process runs (`flask run`, `python app.py`)
+
+    The module-level `app` already has every route and blueprint, so
+    `gunicorn app:app` and `flask --app app` serve the full API and warm up
+    in the background on their first request; this starts the background
+    services up front and, with warm, waits for the warm-up to finish.
+    gunicorn.conf.py does the same per worker in post_worker_init.
+    
+    Args:
+        warm: Wait for the audio/speech warm-up now (default: WARM_UP_ON_START, true)
+    """
+    start_background_services()
+    
+    if warm is None:
+        warm = os.getenv('WARM_UP_ON_START', 'true').lower() == 'true'
+    if warm:
+        warm_up(startup_timer)
+        startup_timer.log_report()
+    
+    return app
+
+_register_blueprints()
+_init_subsystems()
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 503 until this worker has finished warming up"""
+    if not is_ready():
+        return jsonify({'status': 'starting', 'startup': startup_timer.report()}), 503
+    return jsonify({'status': 'ready', 'startup': startup_timer.report()}), 200
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
-    app.run(debug=debug, port=port)
+    create_app().run(debug=debug, port=port)
@@ -0,0 +1,188 @@
+"""
+Audio IO - Size- and duration-capped handling of uploaded recordings
+Uploads are copied from the request stream to a temp file in fixed-size
+chunks, counting bytes as they go, so a recording is never held in memory
+as a whole and an oversized one is rejected (413) as soon as it crosses its
+route's limit; a chunked upload, which declares no Content-Length, is
+refused the same way once it runs past MAX_CONTENT_LENGTH. Durations are checked from the WAV header (a WAV upload whose
+header cannot be read is refused with 415), or by decoding at most
+`max_seconds` of compressed audio.
+
+Environment variables (per therapy: ARTICULATION, LANGUAGE, FLUENCY):
+    AUDIO_MAX_MB_<THERAPY>        Max upload size in MB (defaults: 5 / 15 / 25)
+    AUDIO_MAX_SECONDS_<THERAPY>   Max recording length in seconds (defaults: 15 / 90 / 180)
+"""
+
+import os
+import wave
+from collections import namedtuple
+
+from werkzeug.exceptions import RequestEntityTooLarge
+
+CHUNK_SIZE = 64 * 1024
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+UploadLimit = namedtuple('UploadLimit', ['max_bytes', 'max_seconds'])
+
+DEFAULT_LIMITS = {
+    'articulation': (5, 15),
+    'language': (15, 90),
+    'fluency': (25, 180)
+}
+
+
+class AudioRejected(Exception):
+    """An upload was refused; status_code is the HTTP status to return"""
+    status_code = 400
+
+
+class UploadTooLarge(AudioRejected):
+    """The upload exceeded its route's size limit"""
+    status_code = 413
+
+
+class AudioTooLong(AudioRejected):
+    """The recording exceeded its route's duration limit"""
+    status_code = 413
+
+
+class UnsupportedAudio(AudioRejected):
+    """The upload is not a readable PCM WAV file"""
+    status_code = 415
+
+    def __init__(self, message='Recording is not a readable WAV file. Please record again.'):
+        super().__init__(message)
+
+
+class AudioUploadLimits:
+    """
+    Per-therapy upload size and duration limits
+    """
+
+    def __init__(self, limits):
+        self.limits = limits
+
+    @classmethod
+    def from_env(cls):
+        limits = {}
+        for therapy, (max_mb, max_seconds) in DEFAULT_LIMITS.items():
+            suffix = therapy.upper()
+            limits[therapy] = UploadLimit(
+                max_bytes=int(float(os.getenv(f'AUDIO_MAX_MB_{suffix}', max_mb)) * 1024 * 1024),
+                max_seconds=float(os.getenv(f'AUDIO_MAX_SECONDS_{suffix}', max_seconds))
+            )
+        return cls(limits)
+
+    def for_route(self, therapy):
+        return self.limits[therapy]
+
+    @property
+    def max_content_length(self):
+        """Largest request body any audio route accepts (used as Flask's MAX_CONTENT_LENGTH)"""
+        return max(limit.max_bytes for limit in self.limits.values()) + FORM_OVERHEAD_BYTES
+
+    def check_content_length(self, therapy, content_length):
+        """
+        Reject a request from its Content-Length alone, before the body is read
+
+        Raises:
+            UploadTooLarge: When the declared body is larger than the route allows
+        """
+        limit = self.limits[therapy]
+        if content_length is not None and content_length > limit.max_bytes + FORM_OVERHEAD_BYTES:
+            raise UploadTooLarge(too_large_message(limit))
+
+
+def too_large_message(limit):
+    return f'Recording is too large (limit {round(limit.max_bytes / (1024 * 1024), 1):g} MB)'
+
+
+def parse_upload(request):
+    """
+    Parse the multipart body now, so an oversized upload surfaces as UploadTooLarge
+
+    Raises:
+        UploadTooLarge: The body ran past MAX_CONTENT_LENGTH while it was read
+    """
+    try:
+        return request.files, request.form
+    except RequestEntityTooLarge as e:
+        raise UploadTooLarge('Request body is too large') from e
+
+
+def save_upload(file_storage, dest_path, limit, chunk_size=CHUNK_SIZE):
+    """
+    Copy an uploaded file to dest_path in chunks, enforcing the size limit while reading
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        UploadTooLarge: As soon as more than limit.max_bytes have been read (dest_path is removed)
+    """
+    written = 0
+    try:
+        with open(dest_path, 'wb') as out:
+            while True:
+                chunk = file_storage.stream.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > limit.max_bytes:
+                    raise UploadTooLarge(too_large_message(limit))
+                out.write(chunk)
+    except Exception:
+        remove_quietly(dest_path)
+        raise
+    return written
+
+
+def check_wav_duration(path, limit):
+    """
+    Validate a WAV file's length from its header (no samples are read)
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        UnsupportedAudio: When the file is not a readable PCM WAV
+        AudioTooLong: When the recording is longer than limit.max_seconds
+    """
+    try:
+        with wave.open(path, 'rb') as wav:
+            duration = wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, ZeroDivisionError):
+        raise UnsupportedAudio()
+    if duration > limit.max_seconds:
+        raise AudioTooLong(f'Recording is too long ({duration:.0f}s, limit {limit.max_seconds:.0f}s)')
+    return duration
+
+
+def decode_to_wav(src_path, dest_path, limit, sample_rate=16000):
+    """
+    Decode compressed audio (e.g. WebM) to 16-bit PCM WAV, decoding at most limit.max_seconds
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        AudioTooLong: When the recording is longer than limit.max_seconds
+    """
+    import soundfile as sf
+    import librosa
+
+    # Decode slightly past the limit: any sample beyond it means the recording is too long
+    audio_data, sample_rate = librosa.load(src_path, sr=sample_rate, duration=limit.max_seconds + 0.25)
+    duration = len(audio_data) / float(sample_rate)
+    if duration > limit.max_seconds:
+        raise AudioTooLong(f'Recording is too long (limit {limit.max_seconds:.0f}s)')
+    sf.write(dest_path, audio_data, sample_rate, subtype='PCM_16')
+    return duration
+
+
+def remove_quietly(path):
+    try:
+        if path and os.path.exists(path):
+            os.unlink(path)
+    except OSError:
+        pass
@@ -0,0 +1,186 @@
+"""
+Audio VAD - Energy / zero-crossing voice activity trimming before recognition
+Patients often leave seconds of silence around an attempt. Each WAV is cut
+into short frames, frames are classified as speech by their energy (or, for
+quiet fricatives such as /s/ and /f/, by energy plus zero-crossing rate),
+and leading/trailing silence outside the speech region (plus padding) is
+removed in place before the file is sent for recognition. Recordings with
+no speech at all can be rejected before any recognition call is made, and
+files that are not readable PCM WAV are refused (415).
+
+Environment variables:
+    VAD_ENABLED          'false' disables trimming (default: true)
+    VAD_REJECT_SILENCE   'false' sends silent recordings on anyway (default: true)
+    VAD_PAD_MS           Audio kept before/after detected speech (default: 250)
+"""
+
+import os
+import wave
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from audio_io import AudioRejected, UnsupportedAudio
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 20
+MIN_SPEECH_MS = 40              # an isolated plosive ('k') is a 30-80 ms burst
+ABSOLUTE_FLOOR_DB = -50.0       # frames quieter than this are never speech
+NOISE_MARGIN_DB = 12.0          # speech must be this far above the noise floor...
+DYNAMIC_RANGE_DB = 30.0         # ...and within this range of the loudest frame
+SUSTAINED_SPEECH_DB = -35.0     # level that counts as speech when no frame stands out (a held 'sss')
+FRICATIVE_MARGIN_DB = 8.0       # high-ZCR frames may be this much below the energy threshold
+FRICATIVE_ZCR = 0.25
+
+VadResult = namedtuple('VadResult', ['duration', 'speech_start', 'speech_end', 'trimmed_seconds'])
+
+
+class SilentRecording(AudioRejected):
+    """No speech was detected in the recording"""
+    status_code = 422
+
+
+def frame_features(samples, frame_length):
+    """
+    Per-frame level (dBFS) and zero-crossing rate of mono float samples in [-1, 1]
+
+    Returns:
+        (level_db, zcr) arrays with one value per whole frame
+    """
+    n_frames = len(samples) // frame_length
+    frames = samples[:n_frames * frame_length].reshape(n_frames, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    level_db = 20.0 * np.log10(rms + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_length - 1)
+    return level_db, zcr
+
+
+def speech_frames(level_db, zcr):
+    """Boolean mask of frames classified as speech"""
+    if len(level_db) == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = np.percentile(level_db, 10)
+    peak = level_db.max()
+    if peak - noise_floor < NOISE_MARGIN_DB:
+        # Nothing stands out from the background: steady noise, or one sustained
+        # sound filling the clip; only a loud one is speech
+        return level_db >= max(ABSOLUTE_FLOOR_DB, SUSTAINED_SPEECH_DB)
+
+    # Never below the noise margin (noise is not speech), and at most DYNAMIC_RANGE_DB under the peak;
+    # both terms are <= peak, so the loudest frames always qualify
+    threshold = max(ABSOLUTE_FLOOR_DB, noise_floor + NOISE_MARGIN_DB, peak - DYNAMIC_RANGE_DB)
+
+    voiced = level_db >= threshold
+    fricative = (level_db >= threshold - FRICATIVE_MARGIN_DB) & (level_db >= ABSOLUTE_FLOOR_DB) & (zcr >= FRICATIVE_ZCR)
+    return voiced | fricative
+
+
+def find_speech(samples, sample_rate, pad_ms=250):
+    """
+    Sample range [start, end) holding the speech in `samples` (mono floats), padded
+
+    Returns:
+        (start, end), or None when there is no speech
+    """
+    frame_length = max(2, int(sample_rate * FRAME_MS / 1000))
+    level_db, zcr = frame_features(samples, frame_length)
+    mask = speech_frames(level_db, zcr)
+
+    if np.count_nonzero(mask) * FRAME_MS < MIN_SPEECH_MS:
+        return None
+
+    indices = np.flatnonzero(mask)
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, int(indices[0]) * frame_length - pad)
+    end = min(len(samples), (int(indices[-1]) + 1) * frame_length + pad)
+    return start, end
+
+
+def pcm_to_mono(raw, sample_width, channels):
+    """
+    Little-endian PCM frames (8/16/24/32-bit) as mono float32 samples in [-1, 1]
+
+    Raises:
+        UnsupportedAudio: For any other sample width
+    """
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype='<i2') / np.float32(32768.0)
+    elif sample_width == 3:
+        triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        samples = np.where(values >= 1 << 23, values - (1 << 24), values) / np.float32(1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype='<i4') / np.float32(1 << 31)
+    else:
+        raise UnsupportedAudio()
+    return samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+
+class VoiceActivityDetector:
+    """
+    Trims leading and trailing silence from PCM WAV files in place
+    """
+
+    def __init__(self, enabled=True, reject_silence=True, pad_ms=250):
+        self.enabled = enabled
+        self.reject_silence = reject_silence
+        self.pad_ms = pad_ms
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.getenv('VAD_ENABLED', 'true').lower() != 'false',
+            reject_silence=os.getenv('VAD_REJECT_SILENCE', 'true').lower() != 'false',
+            pad_ms=int(os.getenv('VAD_PAD_MS', 250))
+        )
+
+    def trim_wav(self, path):
+        """
+        Trim silence around the speech in a PCM WAV file (rewritten in place)
+
+        Returns:
+            VadResult, or None when disabled
+
+        Raises:
+            UnsupportedAudio: When the file is not a readable PCM WAV
+            SilentRecording: When no speech is found and reject_silence is set
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            with wave.open(path, 'rb') as wav:
+                params = wav.getparams()
+                raw = wav.readframes(params.nframes)
+        except (wave.Error, EOFError):
+            raise UnsupportedAudio()
+
+        frame_bytes = params.sampwidth * params.nchannels
+        n_frames = len(raw) // frame_bytes
+        raw = raw[:n_frames * frame_bytes]
+        mono = pcm_to_mono(raw, params.sampwidth, params.nchannels)
+        duration = n_frames / float(params.framerate)
+        speech = find_speech(mono, params.framerate, self.pad_ms) if n_frames else None
+
+        if speech is None:
+            if self.reject_silence:
+                raise SilentRecording('No speech was detected in the recording. Please try again and speak clearly into the microphone.')
+            return VadResult(duration, 0.0, duration, 0.0)
+
+        start, end = speech
+        trimmed_seconds = (n_frames - (end - start)) / float(params.framerate)
+        if start > 0 or end < n_frames:
+            with wave.open(path, 'wb') as wav:
+                wav.setnchannels(params.nchannels)
+                wav.setsampwidth(params.sampwidth)
+                wav.setframerate(params.framerate)
+                wav.writeframes(raw[start * frame_bytes:end * frame_bytes])
+
+        result = VadResult(duration, start / float(params.framerate), end / float(params.framerate), trimmed_seconds)
+        logger.debug("Trimmed silence", extra={'duration': round(duration, 2), 'trimmed_seconds': round(trimmed_seconds, 2)})
+        return result
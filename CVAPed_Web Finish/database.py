@@ -0,0 +1,256 @@
+"""
+Database - Fork-safe MongoDB client with configurable pooling
+The MongoClient is created lazily on first use in each process, so a client
+built before a pre-fork server (gunicorn) forks is never shared with the
+workers. Modules keep holding `db` / collection handles as before; the
+handles resolve to the current process's client on every use.
+
+Environment variables (unset values keep the driver default):
+    MONGO_URI                          Connection string (required)
+    MONGO_DB_NAME                      Database name (default: CVACare)
+    MONGO_MAX_POOL_SIZE                Max connections per server (default: 100)
+    MONGO_MIN_POOL_SIZE                Connections kept open when idle (default: 0)
+    MONGO_MAX_IDLE_TIME_MS             Close pooled connections idle this long
+    MONGO_WAIT_QUEUE_TIMEOUT_MS        Max wait for a free pooled connection
+    MONGO_SERVER_SELECTION_TIMEOUT_MS  Max wait for a usable server (default: 10000)
+    MONGO_CONNECT_TIMEOUT_MS           TCP connect timeout
+    MONGO_SOCKET_TIMEOUT_MS            Per-operation socket timeout
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+from pymongo import MongoClient, monitoring
+
+logger = logging.getLogger(__name__)
+
+POOL_OPTIONS = {
+    'maxPoolSize': ('MONGO_MAX_POOL_SIZE', 100),
+    'minPoolSize': ('MONGO_MIN_POOL_SIZE', 0),
+    'maxIdleTimeMS': ('MONGO_MAX_IDLE_TIME_MS', None),
+    'waitQueueTimeoutMS': ('MONGO_WAIT_QUEUE_TIMEOUT_MS', None),
+    'serverSelectionTimeoutMS': ('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000),
+    'connectTimeoutMS': ('MONGO_CONNECT_TIMEOUT_MS', None),
+    'socketTimeoutMS': ('MONGO_SOCKET_TIMEOUT_MS', None)
+}
+
+
+def client_options_from_env():
+    """MongoClient pool/timeout keyword arguments from the environment"""
+    options = {}
+    for option, (env_name, default) in POOL_OPTIONS.items():
+        value = os.getenv(env_name)
+        if value is not None and value != '':
+            options[option] = int(value)
+        elif default is not None:
+            options[option] = default
+    return options
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener that tracks checkouts and how long they waited for a connection
+    """
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self._local = threading.local()
+        self._init_counters()
+
+    def _init_counters(self):
+        self._counters = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'checked_out': 0,
+            'checkouts': 0,
+            'checkout_failures': 0,
+            'pool_cleared': 0
+        }
+        self._waits.clear()
+
+    def reset(self):
+        with self._lock:
+            self._init_counters()
+
+    def stats(self):
+        """Counters plus checkout-wait percentiles (ms) over the recent window"""
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = dict(self._counters)
+
+        def pct(p):
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p / 100.0 * len(waits)))] * 1000, 3)
+
+        return {
+            **counters,
+            'checkout_wait_ms': {
+                'p50': pct(50),
+                'p95': pct(95),
+                'p99': pct(99),
+                'max': round(waits[-1] * 1000, 3) if waits else 0.0
+            }
+        }
+
+    # ============ Listener Callbacks ============
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        wait = time.perf_counter() - started if started is not None else 0.0
+        with self._lock:
+            self._waits.append(wait)
+            self._counters['checkouts'] += 1
+            self._counters['checked_out'] += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._counters['checkout_failures'] += 1
+        logger.warning("MongoDB connection checkout failed", extra={'reason': str(event.reason)})
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._counters['checked_out'] -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self._counters['connections_created'] += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._counters['connections_closed'] += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._counters['pool_cleared'] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+pool_metrics = PoolMetrics()
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_client_options = None
+
+
+def init_database(uri=None, **options):
+    """
+    Configure the client (call once at startup; the connection itself is made lazily)
+
+    Args:
+        uri: Connection string (default: MONGO_URI)
+        **options: Extra MongoClient options, overriding the environment
+    """
+    global _client_options
+    uri = uri or os.getenv('MONGO_URI')
+    if not uri:
+        raise ValueError("MONGO_URI environment variable is not set")
+    _client_options = (uri, {**client_options_from_env(), **options})
+    return _client_options
+
+
+def get_client():
+    """The MongoClient for the current process, created on first use after fork"""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            if _client_options is None:
+                init_database()
+            uri, options = _client_options
+            if _client_pid is not None and _client_pid != pid:
+                # Inherited from the parent: drop it without touching its sockets
+                pool_metrics.reset()
+            _client = MongoClient(uri, event_listeners=[pool_metrics], connect=False, **options)
+            _client_pid = pid
+    return _client
+
+
+def close_client():
+    """Close this process's client (e.g. in a server's worker_exit hook)"""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+class LazyCollection:
+    """Collection handle that resolves against the current process's client"""
+
+    def __init__(self, database, name):
+        self._database = database
+        self._name = name
+        self._cached = (None, None)
+
+    @property
+    def name(self):
+        return self._name
+
+    def resolve(self):
+        client = get_client()
+        cached_client, collection = self._cached
+        if cached_client is not client:
+            collection = client[self._database.name][self._name]
+            self._cached = (client, collection)
+        return collection
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+    def __getitem__(self, name):
+        return self.resolve()[name]
+
+    def __repr__(self):
+        return f'LazyCollection({self._database.name!r}, {self._name!r})'
+
+
+class LazyDatabase:
+    """Database handle that resolves against the current process's client"""
+
+    def __init__(self, name):
+        self.name = name
+        self._collections = {}
+
+    def resolve(self):
+        return get_client()[self.name]
+
+    def __getitem__(self, name):
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections.setdefault(name, LazyCollection(self, name))
+        return collection
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self):
+        return f'LazyDatabase({self.name!r})'
+
+
+def get_database(name=None):
+    """Lazy handle for the application database"""
+    return LazyDatabase(name or os.getenv('MONGO_DB_NAME', 'CVACare'))
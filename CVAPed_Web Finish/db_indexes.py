@@ -0,0 +1,212 @@
+"""
+DB Indexes - Declarative index management for the CVACare database
+Declares the indexes every hot query relies on, creates missing ones and
+reports indexes that are missing or never used.
+
+Usage:
+    python db_indexes.py --report     # show missing, unused and undeclared indexes
+    python db_indexes.py --sync       # create missing indexes
+"""
+
+import logging
+import threading
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_INDEXES = {
+    'users': [
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True),
+        IndexModel(
+            [('providerId', ASCENDING)],
+            name='providerId_unique',
+            unique=True,
+            partialFilterExpression={'providerId': {'$type': 'string'}}
+        ),
+        IndexModel([('role', ASCENDING), ('therapyType', ASCENDING)], name='role_therapyType'),
+        # Admin user listing: filter by role or therapy type, sort by last_active or createdAt, page by _id
+        IndexModel([('last_active', DESCENDING), ('_id', DESCENDING)], name='last_active'),
+        IndexModel([('createdAt', DESCENDING), ('_id', DESCENDING)], name='createdAt'),
+        IndexModel([('role', ASCENDING), ('last_active', DESCENDING), ('_id', DESCENDING)], name='role_last_active'),
+        IndexModel(
+            [('therapyType', ASCENDING), ('last_active', DESCENDING), ('_id', DESCENDING)],
+            name='therapyType_last_active'
+        )
+    ],
+    'articulation_progress': [
+        IndexModel([('user_id', ASCENDING), ('sound_id', ASCENDING)], name='user_sound_unique', unique=True)
+    ],
+    'articulation_trials': [
+        IndexModel([('user_id', ASCENDING), ('timestamp', DESCENDING)], name='user_timestamp'),
+        IndexModel([('timestamp', DESCENDING)], name='timestamp')
+    ],
+    'language_progress': [
+        IndexModel([('user_id', ASCENDING), ('mode', ASCENDING)], name='user_mode_unique', unique=True)
+    ],
+    'language_trials': [
+        IndexModel([('user_id', ASCENDING), ('timestamp', DESCENDING)], name='user_timestamp'),
+        IndexModel([('mode', ASCENDING), ('timestamp', DESCENDING)], name='mode_timestamp')
+    ],
+    'fluency_progress': [
+        IndexModel([('user_id', ASCENDING)], name='user_unique', unique=True)
+    ],
+    'fluency_trials': [
+        IndexModel([('user_id', ASCENDING), ('timestamp', DESCENDING)], name='user_timestamp'),
+        IndexModel([('timestamp', DESCENDING)], name='timestamp')
+    ],
+    'physical_trials': [
+        IndexModel([('user_id', ASCENDING)], name='user_id'),
+        IndexModel([('created_at', DESCENDING)], name='created_at')
+    ],
+    'daily_session_rollups': [
+        IndexModel([('day', ASCENDING)], name='day')
+    ],
+    'deletion_jobs': [
+        IndexModel(
+            [('user_id', ASCENDING)],
+            name='user_active_unique',
+            unique=True,
+            partialFilterExpression={'active': True}
+        ),
+        # Flushed trials are checked against deleted users in one $in query per batch
+        IndexModel([('user_id', ASCENDING), ('status', ASCENDING)], name='user_status')
+    ]
+}
+
+
+def _key_of(index_model):
+    return tuple(index_model.document['key'].items())
+
+
+def _existing_keys(collection):
+    """Key patterns of the indexes that already exist on a collection"""
+    return {tuple(info['key']): name for name, info in collection.index_information().items()}
+
+
+def missing_indexes(db):
+    """
+    Compare declared indexes with the ones present (by key pattern, not name)
+
+    Returns:
+        Dictionary mapping collection name to the IndexModels that are missing
+    """
+    missing = {}
+    for collection_name, models in REQUIRED_INDEXES.items():
+        existing = _existing_keys(db[collection_name])
+        absent = [model for model in models if _key_of(model) not in existing]
+        if absent:
+            missing[collection_name] = absent
+    return missing
+
+
+def sync_indexes(db):
+    """
+    Create every declared index that does not exist yet
+
+    Indexes are built in the background so collections stay available. A
+    failure (e.g. duplicate emails blocking a unique index) is reported
+    without stopping the remaining builds.
+
+    Returns:
+        Dictionary with 'created' and 'failed' lists
+    """
+    created = []
+    failed = []
+
+    for collection_name, models in missing_indexes(db).items():
+        for model in models:
+            name = model.document['name']
+            options = {k: v for k, v in model.document.items() if k != 'key'}
+            try:
+                db[collection_name].create_index(list(model.document['key'].items()), background=True, **options)
+                created.append(f'{collection_name}.{name}')
+            except OperationFailure as e:
+                failed.append({'index': f'{collection_name}.{name}', 'error': str(e)})
+
+    for index in created:
+        logger.info("Created index %s", index)
+    for failure in failed:
+        logger.warning("Could not create index %s: %s", failure['index'], failure['error'])
+
+    return {'created': created, 'failed': failed}
+
+
+def unused_indexes(db):
+    """
+    Indexes with no recorded accesses since the server last restarted ($indexStats)
+
+    Returns:
+        Dictionary mapping collection name to a list of index names
+    """
+    unused = {}
+    for collection_name in db.list_collection_names():
+        try:
+            stats = db[collection_name].aggregate([{'$indexStats': {}}])
+            names = [s['name'] for s in stats if s['name'] != '_id_' and s['accesses']['ops'] == 0]
+        except OperationFailure:
+            continue
+        if names:
+            unused[collection_name] = names
+    return unused
+
+
+def index_report(db):
+    """Missing, unused and undeclared indexes across the database"""
+    undeclared = {}
+    for collection_name in db.list_collection_names():
+        declared = {_key_of(model) for model in REQUIRED_INDEXES.get(collection_name, [])}
+        extra = [
+            name for key, name in _existing_keys(db[collection_name]).items()
+            if name != '_id_' and key not in declared
+        ]
+        if extra:
+            undeclared[collection_name] = extra
+
+    return {
+        'missing': {
+            collection_name: [model.document['name'] for model in models]
+            for collection_name, models in missing_indexes(db).items()
+        },
+        'unused': unused_indexes(db),
+        'undeclared': undeclared
+    }
+
+
+def start_background_sync(db):
+    """Sync indexes on a daemon thread so startup is not blocked by index builds"""
+    def run():
+        try:
+            sync_indexes(db)
+        except Exception as e:
+            logger.exception("Index sync failed")
+
+    thread = threading.Thread(target=run, name='index-sync', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    import os
+    import json
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+    from structured_logging import configure_logging
+
+    parser = argparse.ArgumentParser(description='Manage CVACare MongoDB indexes')
+    parser.add_argument('--sync', action='store_true', help='Create missing indexes')
+    parser.add_argument('--report', action='store_true', help='Report missing, unused and undeclared indexes')
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_logging(fmt='text')
+    database = MongoClient(os.getenv('MONGO_URI'))[os.getenv('MONGO_DB_NAME', 'CVACare')]
+
+    if args.sync:
+        result = sync_indexes(database)
+        if result['failed']:
+            raise SystemExit(1)
+    if args.report or not args.sync:
+        print(json.dumps(index_report(database), indent=2))
@@ -0,0 +1,340 @@
+"""
+Deletion Jobs - Background cascade deletion of users and their therapy data
+Deleting a user is recorded as a job document and answered immediately; a
+background thread then removes the account and every collection that
+references it. On a replica set the whole cascade runs in one transaction.
+Otherwise (or when the transaction fails) it runs as idempotent steps that
+delete in batches and record their progress, so a job interrupted by a
+restart is picked up again and finishes the remaining steps. While a job
+runs its lease is renewed in the background, so a long transaction is never
+taken over (and run twice) by another worker.
+
+Environment variables:
+    DELETION_BATCH_SIZE        Documents removed per delete_many in step mode (default: 1000)
+    DELETION_USE_TRANSACTIONS  'false' always uses resumable steps (default: true)
+    DELETION_LEASE_SECONDS     A running job silent for this long is resumed by another worker (default: 120)
+"""
+
+import os
+import queue
+import logging
+import datetime
+import threading
+from contextlib import contextmanager
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = 'deletion_jobs'
+
+# A user with a job in one of these states is gone or about to be
+DELETING_STATUSES = ['queued', 'running', 'completed']
+
+# (collection, field, id type) removed for a user, in order. The account goes
+# first, so the user can no longer authenticate and write new data.
+CASCADE_STEPS = [
+    ('users', '_id', 'object_id'),
+    ('articulation_progress', 'user_id', 'str'),
+    ('articulation_trials', 'user_id', 'str'),
+    ('language_progress', 'user_id', 'str'),
+    ('language_trials', 'user_id', 'str'),
+    ('fluency_progress', 'user_id', 'str'),
+    ('fluency_trials', 'user_id', 'str'),
+    ('phoneme_stats', '_id', 'str')
+]
+
+
+def _utc_now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _step_filter(user_id, field, id_type):
+    return {field: ObjectId(user_id) if id_type == 'object_id' else user_id}
+
+
+def job_summary(job):
+    """Public view of a job document"""
+    steps = job.get('steps', [])
+    done = sum(1 for step in steps if step.get('done'))
+    return {
+        'job_id': str(job['_id']),
+        'user_id': job['user_id'],
+        'status': job['status'],
+        'mode': job.get('mode'),
+        'progress': round(done / float(len(steps)), 2) if steps else 0.0,
+        'deleted': {step['collection']: step.get('deleted', 0) for step in steps},
+        'error': job.get('error'),
+        'created_at': job.get('created_at'),
+        'started_at': job.get('started_at'),
+        'finished_at': job.get('finished_at')
+    }
+
+
+class DeletionJobs:
+    """
+    Queues user deletions and runs them on a background thread
+    """
+
+    def __init__(self, db, batch_size=1000, use_transactions=True, lease_seconds=120, before_delete=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.use_transactions = use_transactions
+        self.lease_seconds = lease_seconds
+        self.before_delete = before_delete
+        self._init_state()
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._init_state)
+
+    @classmethod
+    def from_env(cls, db, before_delete=None):
+        return cls(
+            db,
+            batch_size=int(os.getenv('DELETION_BATCH_SIZE', 1000)),
+            use_transactions=os.getenv('DELETION_USE_TRANSACTIONS', 'true').lower() != 'false',
+            lease_seconds=int(os.getenv('DELETION_LEASE_SECONDS', 120)),
+            before_delete=before_delete
+        )
+
+    def _init_state(self):
+        """(Re)create the queue and worker state; also runs in a freshly forked child"""
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def jobs(self):
+        return self.db[JOBS_COLLECTION]
+
+    def enqueue(self, user_id, requested_by=None):
+        """
+        Create (or return the already active) deletion job for a user
+
+        Raises:
+            ValueError: When user_id is not a valid ObjectId
+        """
+        try:
+            ObjectId(user_id)
+        except (InvalidId, TypeError):
+            raise ValueError('Invalid user id')
+
+        now = _utc_now()
+        new_job = {
+            'status': 'queued',
+            'mode': None,
+            'steps': [{'collection': name, 'deleted': 0, 'done': False} for name, _, _ in CASCADE_STEPS],
+            'requested_by': requested_by,
+            'created_at': now,
+            'updated_at': now
+        }
+        try:
+            # 'active' is only set while queued/running; a partial unique index keeps one active job per user
+            job = self.jobs.find_one_and_update(
+                {'user_id': user_id, 'active': True},
+                {'$setOnInsert': new_job},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            job = self.jobs.find_one({'user_id': user_id, 'active': True})
+
+        self._ensure_started()
+        if job['status'] == 'queued':
+            self._queue.put(job['_id'])
+        return job
+
+    def get(self, job_id):
+        """
+        Job document by id, or None
+
+        Raises:
+            ValueError: When job_id is not a valid ObjectId
+        """
+        try:
+            job_id = ObjectId(job_id)
+        except (InvalidId, TypeError):
+            raise ValueError('Invalid job id')
+        self._ensure_started()
+        return self.jobs.find_one({'_id': job_id})
+
+    def start(self):
+        """Start the worker thread and pick up queued or abandoned jobs"""
+        self._ensure_started()
+
+    def deleted_user_ids(self, user_ids):
+        """
+        The subset of user_ids that are deleted or being deleted
+
+        Trials buffered in another process can be written after a user's
+        cascade has run; flush hooks use this to drop them instead of
+        recreating data for the deleted user.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        return {
+            job['user_id']
+            for job in self.jobs.find(
+                {'user_id': {'$in': user_ids}, 'status': {'$in': DELETING_STATUSES}},
+                {'_id': 0, 'user_id': 1}
+            )
+        }
+
+    # ============ Helper Methods ============
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='deletion-jobs', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        self._resume_pending()
+        while True:
+            try:
+                job_id = self._queue.get(timeout=self.lease_seconds)
+            except queue.Empty:
+                # Periodically adopt jobs whose worker died mid-run
+                self._resume_pending()
+                continue
+            try:
+                self._process(job_id)
+            except Exception:
+                logger.exception("Deletion job %s crashed", job_id)
+
+    def _resume_pending(self):
+        try:
+            stale = _utc_now() - datetime.timedelta(seconds=self.lease_seconds)
+            for job in self.jobs.find(
+                {'active': True, '$or': [{'status': 'queued', 'created_at': {'$lt': stale}}, {'lease_until': {'$lt': _utc_now()}}]},
+                {'_id': 1}
+            ):
+                self._queue.put(job['_id'])
+        except PyMongoError as e:
+            logger.warning("Could not scan for pending deletion jobs: %s", e)
+
+    def _claim(self, job_id):
+        """Mark a job running under this worker's lease; None if another worker holds it"""
+        now = _utc_now()
+        return self.jobs.find_one_and_update(
+            {
+                '_id': job_id,
+                'active': True,
+                '$or': [{'status': 'queued'}, {'lease_until': {'$lt': now}}]
+            },
+            {'$set': {
+                'status': 'running',
+                'lease_until': now + datetime.timedelta(seconds=self.lease_seconds),
+                'updated_at': now
+            }, '$min': {'started_at': now}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _process(self, job_id):
+        job = self._claim(job_id)
+        if job is None:
+            return
+
+        user_id = job['user_id']
+        try:
+            with self._lease_renewed(job_id):
+                if self.before_delete:
+                    self.before_delete(user_id)
+                if not (self.use_transactions and self._run_in_transaction(job)):
+                    self._run_steps(job)
+        except Exception as e:
+            logger.exception("Deletion of user %s failed", user_id)
+            self._finish(job_id, 'failed', error=str(e))
+            return
+
+        self._finish(job_id, 'completed')
+        logger.info("Deleted user %s and their therapy data", user_id, extra={'job_id': str(job_id)})
+
+    @contextmanager
+    def _lease_renewed(self, job_id):
+        """Extend the job's lease every third of its length until the block exits"""
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(self.lease_seconds / 3.0):
+                now = _utc_now()
+                try:
+                    self.jobs.update_one({'_id': job_id, 'status': 'running'}, {'$set': {
+                        'lease_until': now + datetime.timedelta(seconds=self.lease_seconds),
+                        'updated_at': now
+                    }})
+                except PyMongoError as e:
+                    logger.warning("Could not renew the lease of deletion job %s: %s", job_id, e)
+
+        renewer = threading.Thread(target=renew, name='deletion-lease', daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            renewer.join()
+
+    def _run_in_transaction(self, job):
+        """Delete everything atomically; False when transactions are unavailable or the transaction failed"""
+        user_id = job['user_id']
+
+        def cascade(session):
+            return [
+                self.db[name].delete_many(_step_filter(user_id, field, id_type), session=session).deleted_count
+                for name, field, id_type in CASCADE_STEPS
+            ]
+
+        try:
+            with self.db.client.start_session() as session:
+                counts = session.with_transaction(cascade)
+        except PyMongoError as e:
+            # Standalone servers reject transactions; oversized or slow ones abort. Steps are idempotent.
+            logger.info("Deletion job %s falling back to steps: %s", job['_id'], e)
+            return False
+
+        self.jobs.update_one({'_id': job['_id']}, {'$set': {
+            'mode': 'transaction',
+            'steps': [
+                {'collection': name, 'deleted': count, 'done': True}
+                for (name, _, _), count in zip(CASCADE_STEPS, counts)
+            ],
+            'updated_at': _utc_now()
+        }})
+        return True
+
+    def _run_steps(self, job):
+        """Delete collection by collection in batches, recording progress after each batch"""
+        user_id = job['user_id']
+        self.jobs.update_one({'_id': job['_id']}, {'$set': {'mode': 'steps'}})
+
+        for index, (name, field, id_type) in enumerate(CASCADE_STEPS):
+            if job['steps'][index].get('done'):
+                continue
+            query = _step_filter(user_id, field, id_type)
+            collection = self.db[name]
+
+            while True:
+                ids = [doc['_id'] for doc in collection.find(query, {'_id': 1}).limit(self.batch_size)]
+                if not ids:
+                    break
+                deleted = collection.delete_many({'_id': {'$in': ids}}).deleted_count
+                now = _utc_now()
+                self.jobs.update_one({'_id': job['_id']}, {
+                    '$inc': {f'steps.{index}.deleted': deleted},
+                    '$set': {'lease_until': now + datetime.timedelta(seconds=self.lease_seconds), 'updated_at': now}
+                })
+
+            self.jobs.update_one({'_id': job['_id']}, {'$set': {f'steps.{index}.done': True, 'updated_at': _utc_now()}})
+
+    def _finish(self, job_id, status, error=None):
+        now = _utc_now()
+        self.jobs.update_one({'_id': job_id}, {
+            '$set': {'status': status, 'error': error, 'finished_at': now, 'updated_at': now},
+            '$unset': {'active': '', 'lease_until': ''}
+        })
@@ -0,0 +1,207 @@
+"""
+Exercise Catalog - In-process cache of articulation exercises served from MongoDB
+Exercises are loaded from the articulation_exercises collection once and kept
+in memory; the cache is refreshed when the catalog version is bumped (or, on
+replica sets, when a change stream reports a write).
+"""
+
+import os
+import json
+import math
+import time
+import hashlib
+import logging
+import threading
+
+from pymongo.errors import PyMongoError
+
+EXERCISES_COLLECTION = 'articulation_exercises'
+VERSIONS_COLLECTION = 'catalog_versions'
+
+logger = logging.getLogger(__name__)
+
+# Built-in exercises, used for every sound/level the collection has no entries for
+DEFAULT_EXERCISES = {
+    's': {
+        1: ['s', 'sss', 'hiss'],
+        2: ['sa', 'se', 'si'],
+        3: ['sun', 'sock', 'sip'],
+        4: ['See the sun.', 'Sit down.', 'Pass the salt.'],
+        5: ['Sam saw seven shiny shells.', 'The sun is very hot.', 'She sells sea shells.']
+    },
+    'r': {
+        1: ['r', 'rrr', 'ra'],
+        2: ['ra', 're', 'ri'],
+        3: ['rabbit', 'red', 'run'],
+        4: ['Run to the road.', 'Read the book.', 'Red balloon.'],
+        5: ['Rita rides the red rocket.', 'The rabbit raced around the yard.', 'Robert ran really fast.']
+    },
+    'l': {
+        1: ['l', 'la', 'lal'],
+        2: ['la', 'le', 'li'],
+        3: ['lion', 'leaf', 'lamp'],
+        4: ['Look at the lion.', 'Lift the box.', 'Light the lamp.'],
+        5: ['Lily loves lemons.', 'The little lamb likes leaves.', 'Lay the blanket down.']
+    },
+    'k': {
+        1: ['k', 'ka', 'ku'],
+        2: ['ka', 'ke', 'ki'],
+        3: ['kite', 'cat', 'car'],
+        4: ['Kick the ball.', 'Cook the rice.', 'Clean the cup.'],
+        5: ['Keep the kite flying high.', 'The cat climbed the kitchen counter.', 'Kara kept a key in her pocket.']
+    },
+    'th': {
+        1: ['th', 'thh', 'th-hold'],
+        2: ['tha', 'the', 'thi'],
+        3: ['think', 'this', 'thumb'],
+        4: ['Think about that.', 'This is the thumb.', 'They thank her.'],
+        5: ['Those three thieves thought they were free.', 'This is my thumb.', 'The therapist taught them slowly.']
+    }
+}
+
+
+def _etag_for(items):
+    return hashlib.sha1(json.dumps(items, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def bump_catalog_version(db):
+    """Mark the catalog as changed; call after any write to articulation_exercises"""
+    db[VERSIONS_COLLECTION].update_one(
+        {'_id': EXERCISES_COLLECTION},
+        {'$inc': {'version': 1}, '$currentDate': {'updated_at': True}},
+        upsert=True
+    )
+
+
+def _item_order(doc, fallback):
+    """Numeric sort key of a one-item document (order, then item_index), or None when it is not a number"""
+    value = doc.get('order', doc.get('item_index'))
+    if value is None:
+        return fallback
+    if isinstance(value, bool):
+        return None
+    try:
+        order = float(value)
+    except (TypeError, ValueError):
+        return None
+    return order if math.isfinite(order) else None
+
+
+class ExerciseCatalog:
+    """
+    Caches the articulation exercise catalog per process with a precomputed ETag per level
+    """
+
+    def __init__(self, db, check_interval=30.0):
+        self.db = db
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._levels = None       # {(sound_id, level): (items, etag)}
+        self._version = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._watcher_pid = None
+
+    def get_level(self, sound_id, level):
+        """
+        Items for one sound/level
+
+        Returns:
+            Tuple of (items, etag), or (None, None) if the sound/level does not exist
+        """
+        self._ensure_watcher()
+        if self._needs_refresh():
+            self.refresh()
+        return self._levels.get((sound_id, level), (None, None))
+
+    def refresh(self):
+        """Reload the whole catalog from MongoDB"""
+        with self._lock:
+            version = self._read_version()
+            levels = self._load()
+            self._levels = levels
+            self._version = version
+            self._stale = False
+            self._checked_at = time.monotonic()
+        logger.info("Exercise catalog loaded: %d levels (version %s)", len(levels), version)
+
+    def invalidate(self):
+        """Reload on the next request (other processes notice the version bump)"""
+        self._stale = True
+
+    # ============ Helper Methods ============
+
+    def _needs_refresh(self):
+        if self._levels is None or self._stale:
+            return True
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return False
+
+        # Cheap _id lookup to see whether the catalog version was bumped
+        self._checked_at = time.monotonic()
+        try:
+            return self._read_version() != self._version
+        except PyMongoError as e:
+            logger.warning("Could not check exercise catalog version: %s", e)
+            return False
+
+    def _read_version(self):
+        doc = self.db[VERSIONS_COLLECTION].find_one({'_id': EXERCISES_COLLECTION}, {'version': 1})
+        return doc.get('version', 0) if doc else 0
+
+    def _load(self):
+        grouped = {}
+        cursor = self.db[EXERCISES_COLLECTION].find(
+            {'is_active': {'$ne': False}},
+            {'_id': 0, 'sound_id': 1, 'level': 1, 'order': 1, 'item_index': 1, 'target': 1, 'text': 1, 'word': 1, 'items': 1}
+        )
+        for doc in cursor:
+            sound_id = doc.get('sound_id')
+            try:
+                level = int(doc.get('level'))
+            except (TypeError, ValueError):
+                continue
+            if not sound_id:
+                continue
+
+            entries = grouped.setdefault((sound_id, level), [])
+            if isinstance(doc.get('items'), list):
+                # One document per level holding all items
+                entries.extend((i, item) for i, item in enumerate(doc['items']))
+            else:
+                # One document per item
+                text = doc.get('target') or doc.get('text') or doc.get('word')
+                order = _item_order(doc, len(entries))
+                if order is None:
+                    logger.warning("Skipping %s exercise '%s' (level %s): order %r is not a number",
+                                   sound_id, text, level, doc.get('order', doc.get('item_index')))
+                elif text:
+                    entries.append((order, text))
+
+        # A partly seeded collection keeps the built-in items for the levels it lacks
+        for sound_id, sound_levels in DEFAULT_EXERCISES.items():
+            for level, items in sound_levels.items():
+                if not grouped.get((sound_id, level)):
+                    grouped[(sound_id, level)] = list(enumerate(items))
+
+        levels = {}
+        for key, entries in grouped.items():
+            items = [text for _, text in sorted(entries, key=lambda entry: entry[0])]
+            levels[key] = (items, _etag_for(items))
+        return levels
+
+    def _ensure_watcher(self):
+        """Start a change-stream watcher once per process (falls back to version polling)"""
+        if self._watcher_pid == os.getpid():
+            return
+        self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name='exercise-catalog-watch', daemon=True).start()
+
+    def _watch(self):
+        try:
+            with self.db[EXERCISES_COLLECTION].watch() as stream:
+                for _ in stream:
+                    self._stale = True
+        except PyMongoError:
+            # Change streams need a replica set; version polling covers standalone servers
+            pass
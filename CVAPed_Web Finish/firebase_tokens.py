@@ -0,0 +1,167 @@
+"""
+Firebase Tokens - Cached Firebase ID token verification
+Verified token claims are cached (keyed by the token's SHA-256) until the
+token expires, and Google's public signing certificates are fetched and
+refreshed on a background thread, so a sign-in never waits on the
+certificate endpoint. Tokens are verified locally with google.auth.jwt;
+firebase_admin's verify_id_token is used only until the first certificate
+fetch succeeds.
+
+Environment variables:
+    FIREBASE_TOKEN_CACHE_SIZE   Verified tokens kept in memory (default: 10000)
+"""
+
+import os
+import time
+import json
+import hashlib
+import logging
+import threading
+import urllib.request
+from collections import OrderedDict
+
+CERTS_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+ISSUER_PREFIX = 'https://securetoken.google.com/'
+DEFAULT_CERT_TTL = 3600
+MIN_REFRESH_INTERVAL = 60
+CLOCK_SKEW = 60
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidFirebaseToken(Exception):
+    pass
+
+
+class FirebaseTokenVerifier:
+    """
+    Verifies Firebase ID tokens against prefetched Google certificates, with a claims cache
+    """
+
+    def __init__(self, get_firebase_app, cache_size=10000):
+        self.get_firebase_app = get_firebase_app
+        self.cache_size = cache_size
+        self._init_state()
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._init_state)
+
+    @classmethod
+    def from_env(cls, get_firebase_app):
+        return cls(get_firebase_app, cache_size=int(os.getenv('FIREBASE_TOKEN_CACHE_SIZE', 10000)))
+
+    def _init_state(self):
+        """(Re)create cache and refresher state; also runs in a freshly forked child"""
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._certs = None
+        self._certs_expire_at = 0
+        self._refresher = None
+        self._counters = {'cache_hits': 0, 'cache_misses': 0, 'fallback_verifications': 0, 'cert_refreshes': 0}
+
+    def start(self):
+        """Start the background certificate refresher (once per process)"""
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name='firebase-certs', daemon=True)
+            self._refresher.start()
+
+    def verify(self, id_token):
+        """
+        Decoded claims of a valid Firebase ID token (with 'uid')
+
+        Raises:
+            InvalidFirebaseToken: When the token is malformed, expired or not signed by Firebase
+        """
+        self.start()
+        key = hashlib.sha256(id_token.encode('utf-8')).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[1] > now:
+                self._cache.move_to_end(key)
+                self._counters['cache_hits'] += 1
+                return dict(cached[0])
+            self._counters['cache_misses'] += 1
+
+        claims = self._verify_uncached(id_token, now)
+
+        with self._lock:
+            self._cache[key] = (claims, claims['exp'])
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(claims)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'cached_tokens': len(self._cache),
+                'certs_loaded': self._certs is not None,
+                'certs_expire_in': max(0, int(self._certs_expire_at - time.time())),
+                **self._counters
+            }
+
+    # ============ Helper Methods ============
+
+    def _verify_uncached(self, id_token, now):
+        certs = self._certs
+        if certs is None or self._certs_expire_at <= now:
+            # Certificates not available yet: let firebase_admin fetch them itself
+            return self._verify_with_firebase_admin(id_token)
+
+        try:
+            from google.auth import jwt as google_jwt
+            project_id = self.get_firebase_app().project_id
+            claims = google_jwt.decode(id_token, certs=certs, audience=project_id)
+        except ImportError:
+            return self._verify_with_firebase_admin(id_token)
+        except Exception as e:
+            raise InvalidFirebaseToken(str(e))
+
+        if claims.get('iss') != ISSUER_PREFIX + project_id:
+            raise InvalidFirebaseToken('Token has an incorrect issuer')
+        subject = claims.get('sub')
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise InvalidFirebaseToken('Token has an invalid subject')
+        if claims.get('auth_time', 0) > now + CLOCK_SKEW:
+            raise InvalidFirebaseToken('Token auth_time is in the future')
+
+        claims['uid'] = subject
+        return claims
+
+    def _verify_with_firebase_admin(self, id_token):
+        from firebase_admin import auth
+
+        with self._lock:
+            self._counters['fallback_verifications'] += 1
+        try:
+            return auth.verify_id_token(id_token, app=self.get_firebase_app())
+        except Exception as e:
+            raise InvalidFirebaseToken(str(e))
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                ttl = self._fetch_certs()
+                wait = max(MIN_REFRESH_INTERVAL, ttl - 300)  # refresh 5 minutes before expiry
+            except Exception as e:
+                logger.warning("Could not fetch Firebase signing certificates: %s", e)
+                wait = MIN_REFRESH_INTERVAL
+            time.sleep(wait)
+
+    def _fetch_certs(self):
+        with urllib.request.urlopen(CERTS_URL, timeout=10) as response:
+            certs = json.loads(response.read().decode('utf-8'))
+            ttl = DEFAULT_CERT_TTL
+            for directive in response.headers.get('Cache-Control', '').split(','):
+                name, _, value = directive.strip().partition('=')
+                if name == 'max-age' and value.isdigit():
+                    ttl = int(value)
+
+        with self._lock:
+            self._certs = certs
+            self._certs_expire_at = time.time() + ttl
+            self._counters['cert_refreshes'] += 1
+        return ttl
@@ -0,0 +1,140 @@
+"""
+Fluency Metrics - Incremental fluency scoring from recognized word timings
+Words are fed in as recognition segments arrive, so pauses, disfluencies and
+speaking rate are known at any point of a long recording, not only at the end.
+"""
+
+PAUSE_THRESHOLD = 0.3          # Silence (seconds) between words counted as a pause
+PROLONGATION_FACTOR = 1.5      # Word duration over expected that counts as a prolongation
+SECONDS_PER_LETTER = 0.1       # Rough expected word duration per letter
+
+
+class FluencyAccumulator:
+    """
+    Accumulates word timings and running fluency counts for one recording
+    """
+
+    def __init__(self):
+        self.texts = []
+        self.words = []
+        self.pauses = []
+        self.disfluencies = 0
+        self._prev_end_time = 0
+        self._prev_word = None
+
+    @property
+    def transcription(self):
+        return ' '.join(text for text in self.texts if text)
+
+    def add_segment(self, segment):
+        """Add one recognized segment ({'text', 'words'})"""
+        self.texts.append(segment.get('text', ''))
+        for word_info in segment.get('words', []):
+            self.add_word(word_info['word'], word_info['offset'], word_info['duration'])
+
+    def add_word(self, word, offset, duration):
+        position = len(self.words)
+        self.words.append({
+            'word': word,
+            'offset': offset,
+            'duration': duration
+        })
+
+        # Detect pauses (silence > 300ms between words)
+        if position > 0:
+            pause_duration = offset - self._prev_end_time
+            if pause_duration > PAUSE_THRESHOLD:
+                self.pauses.append({
+                    'position': position,
+                    'duration': pause_duration
+                })
+
+        # Detect repetitions (same word repeated consecutively)
+        if self._prev_word and word.lower() == self._prev_word.lower():
+            self.disfluencies += 1
+
+        # Detect prolongations (word duration > 1.5x expected)
+        expected_word_duration = len(word) * SECONDS_PER_LETTER
+        if duration > expected_word_duration * PROLONGATION_FACTOR:
+            self.disfluencies += 1
+
+        self._prev_end_time = offset + duration
+        self._prev_word = word
+
+    def partial(self):
+        """Running counts for a partial result"""
+        total_duration = self._spoken_duration()
+        return {
+            'transcription': self.transcription,
+            'word_count': len(self.words),
+            'duration': round(total_duration, 1),
+            'speaking_rate': self._speaking_rate(len(self.words), total_duration),
+            'pause_count': len(self.pauses),
+            'disfluencies': self.disfluencies
+        }
+
+    def result(self, expected_duration):
+        """
+        Final metrics, score and feedback
+
+        Args:
+            expected_duration: Duration used when no word timings were returned
+        """
+        transcription = self.transcription
+        total_words = len(self.words) if self.words else len(transcription.split())
+        total_duration = self._spoken_duration() if self.words else expected_duration
+
+        # Speaking rate (WPM)
+        speaking_rate = self._speaking_rate(total_words, total_duration)
+
+        # Pause count
+        pause_count = len(self.pauses)
+
+        # Calculate fluency score (0-100)
+        # Factors: speaking rate, pauses, disfluencies
+
+        # Ideal speaking rate: 120-150 WPM
+        rate_score = 100
+        if speaking_rate < 80 or speaking_rate > 180:
+            rate_score = max(0, 100 - abs(speaking_rate - 120))
+
+        # Pause penalty: -5 points per excessive pause
+        pause_penalty = min(30, pause_count * 5)
+
+        # Disfluency penalty: -10 points per disfluency
+        disfluency_penalty = min(40, self.disfluencies * 10)
+
+        fluency_score = max(0, min(100, rate_score - pause_penalty - disfluency_penalty))
+
+        # Generate feedback
+        if fluency_score >= 90:
+            feedback = "Excellent fluency! Your speech was smooth and natural."
+        elif fluency_score >= 75:
+            feedback = "Good fluency! Keep practicing to improve smoothness."
+        elif fluency_score >= 60:
+            feedback = "Fair fluency. Try to reduce pauses and speak more steadily."
+        else:
+            feedback = "Keep practicing. Focus on breathing and speaking slowly."
+
+        return {
+            'transcription': transcription,
+            'speaking_rate': speaking_rate,
+            'fluency_score': fluency_score,
+            'pause_count': pause_count,
+            'disfluencies': self.disfluencies,
+            'duration': round(total_duration, 1),
+            'word_count': total_words,
+            'feedback': feedback,
+            'pauses': self.pauses[:5],  # Return first 5 pauses for analysis
+            'words': self.words[:20]  # Return first 20 words for analysis
+        }
+
+    # ============ Helper Methods ============
+
+    def _spoken_duration(self):
+        if not self.words:
+            return 0
+        return self.words[-1]['offset'] + self.words[-1]['duration']
+
+    def _speaking_rate(self, total_words, total_duration):
+        return int((total_words / total_duration) * 60) if total_duration > 0 else 0
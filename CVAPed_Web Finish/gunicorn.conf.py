@@ -0,0 +1,53 @@
+"""
+Gunicorn configuration for the CVACare speech therapy API
+
+    gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (cheap: no Firebase or Mongo
+connections and no background threads at import). Each worker then starts
+its own background services (deletion jobs, Firebase certificate refresh,
+index sync) and warms up (audio/speech modules, numba kernels) before it
+accepts requests, so /api/ready only turns green on workers that can serve
+the first request at full speed.
+
+Set PROMETHEUS_MULTIPROC_DIR (an empty directory) so /metrics aggregates
+every worker.
+"""
+
+import os
+
+wsgi_app = 'app:app'
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# Continuous recognition of long recordings can take a while
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 180))
+graceful_timeout = 30
+
+preload_app = True
+
+
+def post_worker_init(worker):
+    from app import start_background_services
+    from startup import warm_up, startup_timer
+
+    start_background_services()
+    warm_up(startup_timer)
+    startup_timer.log_report(f'Worker {worker.pid} startup')
+
+
+def worker_exit(server, worker):
+    from app import trial_log
+    from database import close_client
+
+    trial_log.close()
+    close_client()
+
+
+def child_exit(server, worker):
+    from metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
@@ -0,0 +1,70 @@
+"""
+HTTP Cache - ETag / conditional GET helpers for JSON endpoints
+"""
+
+import hashlib
+
+from flask import request, jsonify
+
+
+def _cache_headers(response, etag, weak, max_age):
+    response.set_etag(etag, weak=weak)
+    response.headers['Cache-Control'] = f'private, max-age={max_age}, must-revalidate'
+    return response
+
+
+def etag_matches(etag, weak=False):
+    """True when the request's If-None-Match already holds this ETag"""
+    if weak:
+        return request.if_none_match.contains_weak(etag)
+    return request.if_none_match.contains(etag)
+
+
+def not_modified(etag, weak=False, max_age=0):
+    """Empty 304 response carrying the validator headers"""
+    response = jsonify()
+    response.status_code = 304
+    response.set_data(b'')
+    return _cache_headers(response, etag, weak, max_age)
+
+
+def cached_json(payload, etag, weak=False, max_age=0):
+    """
+    JSON response with an ETag; becomes a 304 when the client already has this version
+    """
+    if etag_matches(etag, weak):
+        return not_modified(etag, weak, max_age)
+    return _cache_headers(jsonify(payload), etag, weak, max_age)
+
+
+def _stamp(doc):
+    updated = doc.get('updated_at') or doc.get('created_at')
+    return updated.isoformat() if hasattr(updated, 'isoformat') else str(updated)
+
+
+def documents_etag(scope, docs):
+    """
+    Weak validator for a set of documents, derived from their _id and updated_at
+
+    Every progress write bumps updated_at, so the validator changes whenever
+    any document in the set is written, created or deleted.
+    """
+    parts = sorted(f"{doc['_id']}@{_stamp(doc)}" for doc in docs)
+    return hashlib.sha1('|'.join([scope] + parts).encode('utf-8')).hexdigest()
+
+
+def conditional_documents(collection, query, scope, max_age=0):
+    """
+    Answer a conditional GET from a projection-only query
+
+    Returns:
+        A 304 response when the client's If-None-Match still matches the
+        documents selected by `query`, otherwise None (serve the full response)
+    """
+    if not request.if_none_match:
+        return None
+    docs = collection.find(query, {'updated_at': 1, 'created_at': 1})
+    etag = documents_etag(scope, docs)
+    if etag_matches(etag, weak=True):
+        return not_modified(etag, weak=True, max_age=max_age)
+    return None
@@ -0,0 +1,84 @@
+"""
+JSON Provider - Fast JSON encoding for Flask responses
+Uses orjson when it is installed (falling back to the standard library
+encoder) and serializes ObjectId, datetime and NumPy values natively, so
+handlers can return MongoDB documents without per-document fix-ups.
+
+Datetimes are encoded as ISO 8601 strings (the same output as .isoformat()).
+"""
+
+import logging
+import datetime
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _default(value):
+    """Encode the types neither encoder handles on its own"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if np is not None:
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson (the standard library encoder with
+    the same type handling when orjson is missing)
+
+    Keys are not sorted (unlike Flask's default provider) since sorting costs
+    noticeably on large admin and progress payloads.
+    """
+
+    sort_keys = False
+    default = staticmethod(_default)
+
+    if orjson is not None:
+        _options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+        def dumps(self, obj, **kwargs):
+            option = self._options
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            if kwargs.get('sort_keys'):
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=_default, option=option).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            option = self._options
+            if self._app.debug:
+                option |= orjson.OPT_INDENT_2
+            return self._app.response_class(
+                orjson.dumps(obj, default=_default, option=option | orjson.OPT_APPEND_NEWLINE),
+                mimetype=self.mimetype
+            )
+
+
+def init_json_provider(app):
+    """Install the fast JSON provider on a Flask app"""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    logging.getLogger(__name__).info("JSON provider: %s", 'orjson' if orjson is not None else 'json (orjson not installed)')
@@ -0,0 +1,209 @@
+"""
+Keyword Matcher - Expected-keyword matching for expressive language scoring
+Keywords and transcripts are normalized into stemmed word tokens, and all
+keywords (including multi-word phrases) are found in one pass over the
+transcript with a token-level Aho-Corasick automaton. Keywords only match
+whole words, so 'cat' no longer matches inside 'education'.
+
+Matchers are compiled once per exercise and keyword list and then cached.
+"""
+
+import re
+import json
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Inflection-only subset of the Porter2 (Snowball English) stemmer: steps 0,
+# 1a, 1b, 1c and 5. Derivational suffixes (steps 2-4) are left alone.
+_VOWELS = frozenset('aeiouy')
+_DOUBLES = ('bb', 'dd', 'ff', 'gg', 'mm', 'nn', 'pp', 'rr', 'tt')
+_R1_PREFIXES = ('gener', 'commun', 'arsen')
+_EXCEPTIONS = {
+    'skis': 'ski', 'skies': 'sky', 'dying': 'die', 'lying': 'lie', 'tying': 'tie',
+    'news': 'news', 'atlas': 'atlas', 'cosmos': 'cosmos', 'bias': 'bias', 'andes': 'andes'
+}
+_INVARIANT_AFTER_1A = frozenset(('inning', 'outing', 'canning', 'herring', 'earring', 'proceed', 'exceed', 'succeed'))
+
+
+def _region_after(word, start):
+    """Index after the first non-vowel that follows a vowel, at or after start"""
+    for i in range(start + 1, len(word)):
+        if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _regions(word):
+    r1 = next((len(prefix) for prefix in _R1_PREFIXES if word.startswith(prefix)), None)
+    if r1 is None:
+        r1 = _region_after(word, 0)
+    return r1, _region_after(word, r1)
+
+
+def _ends_short_syllable(word):
+    if len(word) >= 3:
+        return word[-3] not in _VOWELS and word[-2] in _VOWELS and word[-1] not in _VOWELS and word[-1] not in 'wxY'
+    return len(word) == 2 and word[0] in _VOWELS and word[1] not in _VOWELS
+
+
+def _is_short(word):
+    return _ends_short_syllable(word) and _regions(word)[0] == len(word)
+
+
+@lru_cache(maxsize=8192)
+def stem(token):
+    """
+    Inflectional stem, identical for a word and its inflected forms
+    (e.g. 'cookie'/'cookies' -> 'cooki', 'use'/'used' -> 'use',
+    'running'/'runs' -> 'run', 'baked'/'bakes' -> 'bake')
+    """
+    if token.endswith("'s"):
+        token = token[:-2]
+    if len(token) <= 2:
+        return token
+    if token in _EXCEPTIONS:
+        return _EXCEPTIONS[token]
+
+    # 'y' at the start or after a vowel acts as a consonant
+    word = ''.join(
+        'Y' if ch == 'y' and (i == 0 or token[i - 1] in _VOWELS) else ch
+        for i, ch in enumerate(token)
+    )
+
+    # Step 1a: plurals ('ties' -> 'tie', 'cookies' -> 'cooki', 'gaps' -> 'gap'; 'gas', 'this' kept)
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith(('ied', 'ies')):
+        word = word[:-2] if len(word) > 4 else word[:-1]
+    elif word.endswith(('us', 'ss')):
+        pass
+    elif word.endswith('s') and any(ch in _VOWELS for ch in word[:-2]):
+        word = word[:-1]
+
+    if word in _INVARIANT_AFTER_1A:
+        return word
+
+    # Step 1b: -eed, -ed, -ing ('agreed' -> 'agree', 'used' -> 'use', 'running' -> 'run')
+    suffix = next((s for s in ('eedly', 'ingly', 'edly', 'eed', 'ing', 'ed') if word.endswith(s)), None)
+    if suffix in ('eedly', 'eed'):
+        if len(word) - len(suffix) >= _regions(word)[0]:
+            word = word[:-len(suffix)] + 'ee'
+    elif suffix:
+        base = word[:-len(suffix)]
+        if any(ch in _VOWELS for ch in base):
+            word = base
+            if word.endswith(('at', 'bl', 'iz')):
+                word += 'e'
+            elif word.endswith(_DOUBLES):
+                word = word[:-1]
+            elif _is_short(word):
+                word += 'e'
+
+    # Step 1c: 'cry' -> 'cri' so it agrees with 'cries'/'cried'
+    if len(word) > 2 and word[-1] in 'yY' and word[-2] not in _VOWELS:
+        word = word[:-1] + 'i'
+
+    # Step 5: silent final 'e' ('bake' keeps it, 'cookie' -> 'cooki'), 'll' -> 'l'
+    r1, r2 = _regions(word)
+    if word.endswith('e'):
+        if len(word) - 1 >= r2 or (len(word) - 1 >= r1 and not _ends_short_syllable(word[:-1])):
+            word = word[:-1]
+    elif word.endswith('ll') and len(word) - 1 >= r2:
+        word = word[:-1]
+
+    return word.replace('Y', 'y')
+
+
+def tokenize(text):
+    """Lowercase, strip accents and punctuation, and return stemmed word tokens"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower().replace('’', "'")
+    return [stem(token) for token in _TOKEN_RE.findall(text)]
+
+
+class KeywordMatcher:
+    """
+    Token-level Aho-Corasick automaton over a fixed keyword list
+    """
+
+    def __init__(self, keywords):
+        self.keywords = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for keyword in keywords:
+            if not isinstance(keyword, str):
+                continue
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            self._add(tokens, len(self.keywords))
+            self.keywords.append(keyword)
+
+        self._build_failure_links()
+
+    def find(self, transcript):
+        """
+        Keywords present in the transcript, in keyword-list order
+
+        Runs in O(transcript tokens + matches) regardless of how many keywords there are.
+        """
+        found = set()
+        state = 0
+        for token in tokenize(transcript):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            found.update(self._output[state])
+        return [self.keywords[i] for i in sorted(found)]
+
+    # ============ Helper Methods ============
+
+    def _add(self, tokens, keyword_index):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][token] = next_state
+            state = next_state
+        self._output[state].append(keyword_index)
+
+    def _build_failure_links(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for token, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+
+@lru_cache(maxsize=1024)
+def compile_keywords(exercise_id, expected_keywords):
+    """
+    Matcher for an exercise's keyword list (the raw JSON string sent by the client)
+
+    Cached by (exercise_id, keyword string), so each exercise's list is parsed
+    and compiled once per process and an edited list gets a new matcher.
+
+    Raises:
+        ValueError: When expected_keywords is not a JSON list
+    """
+    try:
+        keywords = json.loads(expected_keywords or '[]')
+    except ValueError:
+        raise ValueError('expected_keywords must be a JSON list')
+    if not isinstance(keywords, list):
+        raise ValueError('expected_keywords must be a JSON list')
+    return KeywordMatcher(keywords)
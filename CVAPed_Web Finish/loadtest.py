@@ -0,0 +1,255 @@
+"""
+Load Test - Replays recorded uploads against the speech assessment endpoints
+Reports latency percentiles (p50/p95/p99) and throughput per endpoint.
+
+Run the API with SPEECH_BACKEND=simulator to measure capacity without
+spending Azure quota, then:
+
+    python loadtest.py --base-url http://localhost:5000 --token <JWT> \\
+        --manifest recordings/manifest.jsonl --concurrency 16 --duration 60
+
+The manifest is JSON Lines, one recorded upload per line:
+
+    {"endpoint": "articulation", "audio": "s_level3.webm",
+     "form": {"target": "sun", "sound_id": "s", "level": 3}}
+    {"endpoint": "expressive", "audio": "describe_park.wav",
+     "form": {"exercise_id": "ex1", "expected_keywords": "[\\"park\\", \\"swing\\"]"}}
+    {"endpoint": "fluency", "audio": "passage1.wav",
+     "form": {"target_text": "The sun is very hot.", "expected_duration": 5}}
+
+Audio paths are relative to the manifest file.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import argparse
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = {
+    'articulation': '/api/articulation/record',
+    'expressive': '/api/language/assess-expressive',
+    'fluency': '/api/fluency/assess'
+}
+
+CONTENT_TYPES = {
+    '.wav': 'audio/wav',
+    '.webm': 'audio/webm',
+    '.m4a': 'audio/mp4',
+    '.mp3': 'audio/mpeg'
+}
+
+
+def load_manifest(path, endpoint_filter=None):
+    """Read the manifest and preload every recording into memory"""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    uploads = []
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            entry = json.loads(line)
+            endpoint = entry.get('endpoint')
+            if endpoint not in ENDPOINTS:
+                raise ValueError(f"Line {line_number}: unknown endpoint '{endpoint}'")
+            if endpoint_filter and endpoint not in endpoint_filter:
+                continue
+
+            audio_path = os.path.join(base_dir, entry['audio'])
+            with open(audio_path, 'rb') as audio:
+                audio_bytes = audio.read()
+
+            body, content_type = encode_multipart(
+                {k: str(v) for k, v in entry.get('form', {}).items()},
+                os.path.basename(audio_path),
+                audio_bytes
+            )
+            uploads.append({'endpoint': endpoint, 'body': body, 'content_type': content_type})
+
+    return uploads
+
+
+def encode_multipart(fields, filename, audio_bytes):
+    """Build a multipart/form-data body with the form fields and an 'audio' file part"""
+    boundary = uuid.uuid4().hex
+    extension = os.path.splitext(filename)[1].lower()
+    parts = []
+
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f'{value}\r\n'.encode('utf-8')
+        )
+
+    parts.append(
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="audio"; filename="{filename}"\r\n'
+        f'Content-Type: {CONTENT_TYPES.get(extension, "application/octet-stream")}\r\n\r\n'.encode('utf-8')
+    )
+    parts.append(audio_bytes)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode('utf-8'))
+
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LoadDriver:
+    """
+    Sends uploads round-robin from a fixed pool of worker threads
+    """
+
+    def __init__(self, base_url, token, uploads, concurrency, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.uploads = uploads
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.samples = []  # (endpoint, status, latency_seconds)
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def run(self, total_requests=None, duration=None):
+        """Run until total_requests have been sent or duration seconds have elapsed"""
+        deadline = time.perf_counter() + duration if duration else None
+        started = time.perf_counter()
+
+        def worker():
+            while True:
+                with self._lock:
+                    if total_requests is not None and self._next >= total_requests:
+                        return
+                    upload = self.uploads[self._next % len(self.uploads)]
+                    self._next += 1
+                if deadline and time.perf_counter() >= deadline:
+                    return
+                self._send(upload)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for _ in range(self.concurrency):
+                pool.submit(worker)
+
+        return time.perf_counter() - started
+
+    def _send(self, upload):
+        request = urllib.request.Request(
+            self.base_url + ENDPOINTS[upload['endpoint']],
+            data=upload['body'],
+            method='POST',
+            headers={
+                'Content-Type': upload['content_type'],
+                'Authorization': f'Bearer {self.token}'
+            }
+        )
+
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception:
+            status = 0  # connection error or client-side timeout
+        latency = time.perf_counter() - started
+
+        with self._lock:
+            self.samples.append((upload['endpoint'], status, latency))
+
+
+def summarize(samples, elapsed):
+    """Group samples per endpoint (plus an 'all' row) into a report"""
+    groups = {'all': samples}
+    for endpoint in ENDPOINTS:
+        endpoint_samples = [s for s in samples if s[0] == endpoint]
+        if endpoint_samples:
+            groups[endpoint] = endpoint_samples
+
+    report = {}
+    for name, group in groups.items():
+        latencies = sorted(s[2] for s in group)
+        statuses = {}
+        for _, status, _ in group:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        errors = sum(1 for _, status, _ in group if status == 0 or status >= 500)
+        report[name] = {
+            'requests': len(group),
+            'errors': errors,
+            'error_rate': round(errors / len(group), 4) if group else 0,
+            'throughput_rps': round(len(group) / elapsed, 2) if elapsed > 0 else 0,
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0,
+            'status_codes': statuses
+        }
+    return report
+
+
+def print_report(report, elapsed, concurrency):
+    print(f"\nLoad test finished in {elapsed:.1f}s at concurrency {concurrency}\n")
+    print(f"{'endpoint':<14}{'reqs':>7}{'err%':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, row in report.items():
+        print(
+            f"{name:<14}{row['requests']:>7}{row['error_rate'] * 100:>7.1f}%{row['throughput_rps']:>9.2f}"
+            f"{row['p50_ms']:>8.0f}ms{row['p95_ms']:>7.0f}ms{row['p99_ms']:>7.0f}ms{row['max_ms']:>7.0f}ms"
+        )
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded uploads against the speech endpoints')
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--token', default=os.getenv('CVACARE_TOKEN'), help='JWT for a test patient (or set CVACARE_TOKEN)')
+    parser.add_argument('--manifest', required=True, help='JSON Lines file describing recorded uploads')
+    parser.add_argument('--endpoint', action='append', choices=sorted(ENDPOINTS), help='Only replay these endpoints')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, help='Total number of requests to send')
+    parser.add_argument('--duration', type=float, help='Run for this many seconds')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+    parser.add_argument('--json', dest='json_output', help='Also write the report to this file')
+    args = parser.parse_args(argv)
+
+    if not args.token:
+        parser.error('--token is required (or set CVACARE_TOKEN)')
+    if not args.requests and not args.duration:
+        parser.error('one of --requests or --duration is required')
+
+    uploads = load_manifest(args.manifest, args.endpoint)
+    if not uploads:
+        parser.error('manifest contains no uploads for the selected endpoints')
+
+    print(f"Replaying {len(uploads)} recordings against {args.base_url} with {args.concurrency} workers...")
+    driver = LoadDriver(args.base_url, args.token, uploads, args.concurrency, args.timeout)
+    elapsed = driver.run(total_requests=args.requests, duration=args.duration)
+
+    report = summarize(driver.samples, elapsed)
+    print_report(report, elapsed, args.concurrency)
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed_seconds': round(elapsed, 2), 'concurrency': args.concurrency, 'results': report}, f, indent=2)
+
+    return 0 if report['all']['errors'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
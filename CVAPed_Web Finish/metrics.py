@@ -0,0 +1,159 @@
+"""
+Metrics - Prometheus metrics for the speech therapy API
+Per-route request latency, in-flight requests and status counts, plus the
+three things a therapy request spends its time on: Azure speech calls,
+audio decoding and MongoDB commands. Exposed on /metrics.
+
+prometheus_client is optional: without it every metric is a no-op and
+/metrics answers 503. Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an
+empty directory so /metrics aggregates all workers instead of reporting
+whichever worker served the scrape.
+"""
+
+import os
+import time
+import logging
+
+from flask import Response, g, request
+from pymongo import monitoring
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+AZURE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 60, 120)
+DECODE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+class _NoopMetric:
+    """Stand-in used when prometheus_client is not installed"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def time(self):
+        return _NoopTimer()
+
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+if prometheus_client is not None:
+    REQUEST_SECONDS = Histogram(
+        'cvacare_http_request_duration_seconds', 'Time to produce a response, by route',
+        ['method', 'route'], buckets=REQUEST_BUCKETS
+    )
+    REQUESTS_TOTAL = Counter(
+        'cvacare_http_requests_total', 'Responses sent, by route and status code',
+        ['method', 'route', 'status']
+    )
+    REQUESTS_IN_FLIGHT = Gauge(
+        'cvacare_http_requests_in_flight', 'Requests currently being handled, by route',
+        ['route'], multiprocess_mode='livesum'
+    )
+    AZURE_SECONDS = Histogram(
+        'cvacare_azure_speech_duration_seconds', 'Speech recognition call time (excludes queueing)',
+        ['operation', 'backend'], buckets=AZURE_BUCKETS
+    )
+    AUDIO_DECODE_SECONDS = Histogram(
+        'cvacare_audio_decode_duration_seconds', 'Time to decode/convert an uploaded recording',
+        ['therapy'], buckets=DECODE_BUCKETS
+    )
+    MONGO_SECONDS = Histogram(
+        'cvacare_mongo_command_duration_seconds', 'MongoDB command round-trip time',
+        ['command', 'outcome'], buckets=MONGO_BUCKETS
+    )
+else:
+    REQUEST_SECONDS = REQUESTS_TOTAL = REQUESTS_IN_FLIGHT = _NoopMetric()
+    AZURE_SECONDS = AUDIO_DECODE_SECONDS = MONGO_SECONDS = _NoopMetric()
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Records every MongoDB command's duration (as measured by the driver) by command name
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_SECONDS.labels(event.command_name, 'ok').observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_SECONDS.labels(event.command_name, 'error').observe(event.duration_micros / 1e6)
+
+
+def init_metrics(app):
+    """
+    Instrument every request of `app`, record MongoDB command times and add GET /metrics
+
+    Call before the first MongoDB client is created: the command listener is
+    registered globally and applies to clients created afterwards.
+    """
+    if prometheus_client is None:
+        logger.warning("prometheus_client not installed; /metrics is disabled")
+    else:
+        monitoring.register(MongoCommandMetrics())
+
+    @app.before_request
+    def start_request_timer():
+        g._metrics_route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        g._metrics_started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.labels(g._metrics_route).inc()
+
+    @app.after_request
+    def record_request_status(response):
+        route = g.get('_metrics_route')
+        if route is not None:
+            REQUESTS_TOTAL.labels(request.method, route, str(response.status_code)).inc()
+        return response
+
+    @app.teardown_request
+    def stop_request_timer(error=None):
+        # Streaming responses are measured up to the start of the stream
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return
+        route = g.pop('_metrics_route')
+        REQUESTS_IN_FLIGHT.labels(route).dec()
+        REQUEST_SECONDS.labels(request.method, route).observe(time.perf_counter() - started)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        if prometheus_client is None:
+            return Response('prometheus_client is not installed\n', status=503, mimetype='text/plain')
+
+        if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+            from prometheus_client import multiprocess
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return Response(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def mark_worker_dead(pid):
+    """Drop a dead gunicorn worker's live gauges (multiprocess mode only)"""
+    if prometheus_client is not None and os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,192 @@
+"""
+Password Hasher - Bounded bcrypt hashing off the request threads
+bcrypt is deliberately CPU-heavy. Hashes are computed on a small dedicated
+pool (bcrypt releases the GIL), so a burst of logins uses at most
+`max_workers` cores and queues behind them instead of competing with every
+therapy request. When the queue is full, callers are rejected (503).
+
+Environment variables:
+    BCRYPT_LOG_ROUNDS               bcrypt work factor for new hashes (default: 12)
+    PASSWORD_HASH_WORKERS           Concurrent hash computations per process (default: 2)
+    PASSWORD_HASH_MAX_PENDING       Hash requests allowed to wait for a worker (default: 64)
+    PASSWORD_HASH_TIMEOUT_SECONDS   Max time a request waits for its hash (default: 10)
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password hashes are already queued"""
+
+
+def hash_rounds(hashed):
+    """Work factor of a bcrypt hash ('$2b$12$...' -> 12), or None if it is not bcrypt"""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs Flask-Bcrypt hashing and verification on a bounded thread pool
+    """
+
+    def __init__(self, bcrypt, rounds=12, max_workers=2, max_pending=64, timeout=10.0):
+        self.bcrypt = bcrypt
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._init_state()
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._init_state)
+
+    @classmethod
+    def from_env(cls, bcrypt):
+        return cls(
+            bcrypt,
+            rounds=int(os.getenv('BCRYPT_LOG_ROUNDS', 12)),
+            max_workers=int(os.getenv('PASSWORD_HASH_WORKERS', 2)),
+            max_pending=int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64)),
+            timeout=float(os.getenv('PASSWORD_HASH_TIMEOUT_SECONDS', 10))
+        )
+
+    def _init_state(self):
+        """(Re)create the pool and metrics; also runs in a freshly forked child"""
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._queue_waits = deque(maxlen=500)
+        self._hash_times = deque(maxlen=500)
+        self._counters = {
+            'pending': 0,
+            'hashes': 0,
+            'verifications': 0,
+            'rehashes': 0,
+            'rejected': 0
+        }
+
+    def hash(self, password):
+        """bcrypt hash (str) of a password at the configured work factor"""
+        hashed = self._run(self.bcrypt.generate_password_hash, password, self.rounds)
+        self._count('hashes')
+        return hashed.decode('utf-8')
+
+    def verify(self, hashed, password):
+        """True when password matches the stored hash"""
+        if not hashed:
+            return False
+        matches = self._run(self.bcrypt.check_password_hash, hashed, password)
+        self._count('verifications')
+        return matches
+
+    def needs_rehash(self, hashed):
+        """True when a stored hash was made with a different work factor than configured"""
+        rounds = hash_rounds(hashed)
+        return rounds is not None and rounds != self.rounds
+
+    def rehash_in_background(self, password, on_rehashed):
+        """
+        Hash a password at the configured cost without making the caller wait
+
+        on_rehashed(new_hash) runs on the hashing thread; a full queue simply
+        skips the upgrade (it is retried on the next login).
+        """
+        try:
+            future = self._submit(self.bcrypt.generate_password_hash, password, self.rounds)
+        except PasswordHasherBusy:
+            return
+
+        def done(f):
+            try:
+                on_rehashed(f.result().decode('utf-8'))
+                self._count('rehashes')
+            except Exception as e:
+                logger.warning("Password rehash failed: %s", e)
+
+        future.add_done_callback(done)
+
+    def stats(self):
+        """Queue depth, counters and queue-wait / hash-time percentiles (ms)"""
+        with self._metrics_lock:
+            waits = sorted(self._queue_waits)
+            hash_times = sorted(self._hash_times)
+            counters = dict(self._counters)
+
+        def pct(values, p):
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(p / 100.0 * len(values)))] * 1000, 2)
+
+        return {
+            'rounds': self.rounds,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            **counters,
+            'queue_wait_ms': {'p50': pct(waits, 50), 'p95': pct(waits, 95), 'max': pct(waits, 100)},
+            'hash_ms': {'p50': pct(hash_times, 50), 'p95': pct(hash_times, 95), 'max': pct(hash_times, 100)}
+        }
+
+    # ============ Helper Methods ============
+
+    def _run(self, fn, *args):
+        future = self._submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PasswordHasherBusy('Password hashing timed out')
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise PasswordHasherBusy('Too many sign-in requests, please try again shortly')
+
+        with self._metrics_lock:
+            self._counters['pending'] += 1
+        queued = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._metrics_lock:
+                    self._queue_waits.append(started - queued)
+                    self._hash_times.append(finished - started)
+
+        def release(f):
+            with self._metrics_lock:
+                self._counters['pending'] -= 1
+            self._slots.release()
+
+        try:
+            future = self._get_executor().submit(task)
+        except Exception:
+            release(None)
+            raise
+        future.add_done_callback(release)
+        return future
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='password-hash'
+                    )
+        return self._executor
+
+    def _count(self, name):
+        with self._metrics_lock:
+            self._counters[name] += 1
@@ -0,0 +1,123 @@
+"""
+Phoneme Stats - Per-user phoneme accuracy index for articulation therapy
+Articulation trials store their phoneme scores compactly, and every flushed
+batch of trials updates one document per user holding, for each phoneme,
+the number of attempts, the running mean and an exponentially weighted
+recent score. Therapist and patient views read that single document by _id
+instead of scanning the trial history.
+
+Environment variables:
+    PHONEME_EWMA_ALPHA   Weight of the newest trial in the recent score (default: 0.3)
+"""
+
+import os
+import re
+import datetime
+
+from pymongo import UpdateOne
+
+PHONEME_STATS_COLLECTION = 'phoneme_stats'
+EWMA_ALPHA = float(os.getenv('PHONEME_EWMA_ALPHA', 0.3))
+
+_db = None
+
+
+def init_phoneme_stats(database):
+    """Initialize the module with the database connection"""
+    global _db
+    _db = database
+
+
+def _phoneme_key(phoneme):
+    """Phoneme label usable as a field name ('.' and '$' would be paths/operators)"""
+    return re.sub(r'[^a-z]', '', str(phoneme).lower())
+
+
+def compact_phonemes(phonemes):
+    """
+    Assessment phonemes ([{'phoneme', 'score' 0-1}]) as compact [phoneme, score 0-100] pairs
+    """
+    compact = []
+    for entry in phonemes or []:
+        key = _phoneme_key(entry.get('phoneme', ''))
+        score = entry.get('score')
+        if key and isinstance(score, (int, float)):
+            compact.append([key, int(round(score * 100))])
+    return compact
+
+
+def phoneme_stats_update(compact, now, alpha=EWMA_ALPHA):
+    """
+    Update pipeline that folds one trial's phoneme scores into a user's phoneme_stats document
+
+    Each phoneme's occurrences in the trial add to its count and sum; the
+    trial's mean score for the phoneme is one step of the EWMA.
+    """
+    per_phoneme = {}
+    for key, score in compact:
+        totals = per_phoneme.setdefault(key, [0, 0])
+        totals[0] += 1
+        totals[1] += score
+
+    accumulate = {'created_at': {'$ifNull': ['$created_at', now]}, 'updated_at': now}
+    derive = {}
+    for key, (count, total) in per_phoneme.items():
+        path = f'phonemes.{key}'
+        trial_mean = total / float(count)
+        accumulate[f'{path}.count'] = {'$add': [{'$ifNull': [f'${path}.count', 0]}, count]}
+        accumulate[f'{path}.sum'] = {'$add': [{'$ifNull': [f'${path}.sum', 0]}, total]}
+        # Arithmetic on a missing ewma yields null, so the first trial seeds it with its mean
+        accumulate[f'{path}.ewma'] = {'$round': [{'$ifNull': [
+            {'$add': [{'$multiply': [1 - alpha, f'${path}.ewma']}, alpha * trial_mean]},
+            trial_mean
+        ]}, 2]}
+        accumulate[f'{path}.last_at'] = now
+        derive[f'{path}.mean'] = {'$round': [{'$divide': [f'${path}.sum', f'${path}.count']}, 2]}
+
+    return [{'$set': accumulate}, {'$set': derive}]
+
+
+def record_phoneme_trials(trials):
+    """
+    Fold inserted articulation trials into their users' phoneme stats
+
+    Updates are applied in insertion order (ordered bulk write), so each
+    user's EWMA sees trials in the order they were recorded.
+    """
+    operations = []
+    for trial in trials:
+        compact = trial.get('phonemes')
+        if not compact or not trial.get('user_id'):
+            continue
+        now = trial.get('timestamp') or datetime.datetime.now(datetime.timezone.utc)
+        operations.append(UpdateOne(
+            {'_id': str(trial['user_id'])},
+            phoneme_stats_update(compact, now),
+            upsert=True
+        ))
+
+    if operations:
+        _db[PHONEME_STATS_COLLECTION].bulk_write(operations, ordered=True)
+
+
+def get_phoneme_stats(user_id, min_count=1, limit=None):
+    """
+    A user's phonemes, weakest recent score first
+
+    Returns:
+        List of {'phoneme', 'count', 'mean', 'ewma', 'last_at'}
+    """
+    doc = _db[PHONEME_STATS_COLLECTION].find_one({'_id': str(user_id)}, {'phonemes': 1})
+    phonemes = [
+        {
+            'phoneme': key,
+            'count': stats.get('count', 0),
+            'mean': stats.get('mean'),
+            'ewma': stats.get('ewma'),
+            'last_at': stats.get('last_at')
+        }
+        for key, stats in ((doc or {}).get('phonemes') or {}).items()
+        if stats.get('count', 0) >= min_count
+    ]
+    phonemes.sort(key=lambda p: (p['ewma'] if p['ewma'] is not None else 100, -p['count']))
+    return phonemes[:limit] if limit else phonemes
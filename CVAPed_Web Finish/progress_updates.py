@@ -0,0 +1,82 @@
+"""
+Progress Updates - Single-round-trip updates for therapy progress documents
+Each save touches only the level/item being recorded and recomputes the
+derived counters server-side in the same atomic update, so concurrent saves
+never overwrite each other and write size does not grow with history.
+"""
+
+
+def _count_where(items_expr, field):
+    """Number of entries in an array expression whose `field` is true"""
+    return {'$size': {'$filter': {'input': items_expr, 'cond': {'$eq': [f'$$this.{field}', True]}}}}
+
+
+def articulation_item_update(level, item_index, item, total_items, now):
+    """
+    Update pipeline that records one articulation item and refreshes its level's completion
+
+    Args:
+        level: Level number (int)
+        item_index: Item index within the level (int)
+        item: Item progress document to store
+        total_items: Items required to complete the level
+        now: Timestamp for created_at (on insert) and updated_at
+    """
+    level_path = f'levels.{level}'
+    items_path = f'{level_path}.items'
+
+    return [
+        {'$set': {
+            f'{items_path}.{item_index}': {'$literal': item},
+            'created_at': {'$ifNull': ['$created_at', now]},
+            'updated_at': now
+        }},
+        {'$set': {
+            f'{level_path}.completed_items': _count_where(
+                {'$map': {'input': {'$objectToArray': f'${items_path}'}, 'in': '$$this.v'}},
+                'completed'
+            ),
+            f'{level_path}.total_items': total_items
+        }},
+        {'$set': {
+            f'{level_path}.is_complete': {'$gte': [f'${level_path}.completed_items', total_items]}
+        }}
+    ]
+
+
+def language_exercise_update(exercise_index, exercise, now):
+    """
+    Update pipeline that records one language exercise and refreshes the mode's totals and accuracy
+    """
+    exercises = {'$map': {'input': {'$objectToArray': '$exercises'}, 'in': '$$this.v'}}
+
+    return [
+        {'$set': {
+            f'exercises.{exercise_index}': {'$literal': exercise},
+            'created_at': {'$ifNull': ['$created_at', now]},
+            'updated_at': now
+        }},
+        {'$set': {
+            'total_exercises': {'$size': exercises},
+            'completed_exercises': _count_where(exercises, 'completed'),
+            'correct_exercises': _count_where(exercises, 'is_correct')
+        }},
+        {'$set': {
+            'accuracy': {'$cond': [
+                {'$gt': ['$completed_exercises', 0]},
+                {'$divide': ['$correct_exercises', '$completed_exercises']},
+                0
+            ]}
+        }}
+    ]
+
+
+def fluency_exercise_update(level, exercise_index, exercise, now):
+    """Update document that records one fluency exercise (no derived counters to maintain)"""
+    return {
+        '$set': {
+            f'levels.{level}.exercises.{exercise_index}': exercise,
+            'updated_at': now
+        },
+        '$setOnInsert': {'created_at': now}
+    }
@@ -0,0 +1,137 @@
+"""
+Speech Limiter - Bounded concurrency, deadlines and cancellation for speech calls
+All recognition calls share one pool of slots. A request that cannot get a
+slot quickly is rejected (503), and a call that outlives its deadline is
+abandoned by the request (504) and asked to cancel. A slow Azure region
+therefore costs at most `max_concurrency` threads, never the whole worker pool.
+
+Environment variables:
+    SPEECH_MAX_CONCURRENCY            Concurrent recognition calls per process (default: 8)
+    SPEECH_QUEUE_TIMEOUT_MS           How long a request waits for a free slot (default: 2000)
+    SPEECH_DEADLINE_SECONDS           Deadline for single-shot calls (default: 30)
+    SPEECH_CONTINUOUS_DEADLINE_SECONDS Deadline for continuous recognition (default: 180)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class SpeechUnavailable(Exception):
+    """Recognition could not be completed; status_code is the HTTP status to return"""
+    status_code = 503
+
+
+class SpeechBusy(SpeechUnavailable):
+    """Every recognition slot stayed busy for the whole queue timeout"""
+    status_code = 503
+
+
+class SpeechTimeout(SpeechUnavailable):
+    """The recognition call did not finish before its deadline"""
+    status_code = 504
+
+
+class SpeechLimiter:
+    """
+    Runs speech calls on a bounded thread pool guarded by a semaphore
+    """
+
+    def __init__(self, max_concurrency=8, queue_timeout=2.0, deadline=30.0, continuous_deadline=180.0):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.deadline = deadline
+        self.continuous_deadline = continuous_deadline
+        self._init_state()
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._init_state)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_concurrency=int(os.getenv('SPEECH_MAX_CONCURRENCY', 8)),
+            queue_timeout=int(os.getenv('SPEECH_QUEUE_TIMEOUT_MS', 2000)) / 1000.0,
+            deadline=float(os.getenv('SPEECH_DEADLINE_SECONDS', 30)),
+            continuous_deadline=float(os.getenv('SPEECH_CONTINUOUS_DEADLINE_SECONDS', 180))
+        )
+
+    def _init_state(self):
+        """(Re)create the pool and slots; also runs in a freshly forked child"""
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._counters = {
+            'in_flight': 0,
+            'completed': 0,
+            'rejected': 0,
+            'timed_out': 0
+        }
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Start fn(*args, cancel_event=..., **kwargs) in a free slot
+
+        Returns:
+            Tuple of (future, cancel_event)
+
+        Raises:
+            SpeechBusy: When no slot frees up within queue_timeout
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count('rejected')
+            raise SpeechBusy('Speech recognition is busy, please try again shortly')
+
+        cancel_event = threading.Event()
+        try:
+            future = self._get_executor().submit(fn, *args, cancel_event=cancel_event, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        self._count('in_flight')
+        future.add_done_callback(self._release)
+        return future, cancel_event
+
+    def run(self, fn, *args, deadline=None, **kwargs):
+        """
+        Run a speech call and wait for it until the deadline
+
+        Raises:
+            SpeechBusy: When no slot frees up within queue_timeout
+            SpeechTimeout: When the call outlives its deadline (it is asked to
+                           cancel and keeps its slot until it actually stops)
+        """
+        future, cancel_event = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=deadline or self.deadline)
+        except FutureTimeout:
+            cancel_event.set()
+            self._count('timed_out')
+            raise SpeechTimeout('Speech recognition took too long, please try again')
+
+    def stats(self):
+        with self._metrics_lock:
+            return {'max_concurrency': self.max_concurrency, **self._counters}
+
+    # ============ Helper Methods ============
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency, thread_name_prefix='speech'
+                    )
+        return self._executor
+
+    def _release(self, future):
+        with self._metrics_lock:
+            self._counters['in_flight'] -= 1
+            self._counters['completed'] += 1
+        self._slots.release()
+
+    def _count(self, name):
+        with self._metrics_lock:
+            self._counters[name] += 1
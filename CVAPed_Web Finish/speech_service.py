@@ -0,0 +1,408 @@
+"""
+Speech Service - Speech recognition backends for the therapy endpoints
+Wraps Azure Speech Services (or the local simulator) behind one interface.
+Every call runs through a shared SpeechLimiter (bounded concurrency,
+per-call deadlines and cancellation).
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+
+from metrics import AZURE_SECONDS
+from speech_simulator import SimulatedSpeechBackend, wav_duration
+from speech_limiter import SpeechLimiter, SpeechUnavailable, SpeechBusy, SpeechTimeout
+
+TICKS_PER_SECOND = 10000000
+
+logger = logging.getLogger(__name__)
+
+
+class AzureSpeechBackend:
+    """
+    Azure Speech Services backend (pronunciation assessment and speech-to-text)
+    """
+
+    def __init__(self, speech_key, region):
+        self.speech_key = speech_key
+        self.region = region
+
+    def is_configured(self):
+        return bool(self.speech_key) and bool(self.region) and self.speech_key != 'YOUR_AZURE_SPEECH_KEY_HERE'
+
+    def assess_pronunciation(self, audio_path, reference_text, cancel_event=None):
+        """
+        Use Azure Speech Services Pronunciation Assessment API
+        This is specifically designed for speech therapy and language learning!
+
+        A single-shot SDK call cannot be interrupted; on cancellation the
+        caller stops waiting and the slot is freed when Azure answers.
+        """
+        try:
+            import azure.cognitiveservices.speech as speechsdk
+
+            # Create speech config
+            speech_config = speechsdk.SpeechConfig(
+                subscription=self.speech_key,
+                region=self.region
+            )
+
+            # Create audio config from file
+            audio_config = speechsdk.audio.AudioConfig(filename=audio_path)
+
+            # Configure pronunciation assessment
+            pronunciation_config = speechsdk.PronunciationAssessmentConfig(
+                reference_text=reference_text,
+                grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
+                granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
+                enable_miscue=True
+            )
+
+            # Create speech recognizer
+            speech_recognizer = speechsdk.SpeechRecognizer(
+                speech_config=speech_config,
+                audio_config=audio_config
+            )
+
+            # Apply pronunciation assessment config
+            pronunciation_config.apply_to(speech_recognizer)
+
+            # Recognize speech
+            result = speech_recognizer.recognize_once()
+
+            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                # Get pronunciation assessment results
+                pronunciation_result = speechsdk.PronunciationAssessmentResult(result)
+
+                return {
+                    'success': True,
+                    'transcription': result.text,
+                    'accuracy_score': pronunciation_result.accuracy_score / 100,  # 0-1 scale
+                    'pronunciation_score': pronunciation_result.pronunciation_score / 100,
+                    'completeness_score': pronunciation_result.completeness_score / 100,
+                    'fluency_score': pronunciation_result.fluency_score / 100,
+                    # Phoneme results are reported per word
+                    'phonemes': [
+                        {
+                            'phoneme': p.phoneme,
+                            'score': p.accuracy_score / 100
+                        }
+                        for word in (pronunciation_result.words or [])
+                        for p in (word.phonemes or [])
+                    ]
+                }
+            else:
+                return {
+                    'success': False,
+                    'error': f'Recognition failed: {result.reason}'
+                }
+
+        except Exception as e:
+            logger.exception("Azure assessment error")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def recognize(self, audio_path, word_timestamps=False, reference_text=None, cancel_event=None):
+        """
+        Transcribe a WAV file with Azure Speech-to-Text (single utterance)
+
+        Returns:
+            Dictionary with 'status' ('recognized', 'no_match' or 'failed'),
+            'text' and 'words' (word timings in seconds when requested)
+        """
+        import azure.cognitiveservices.speech as speechsdk
+
+        speech_config = self._recognition_config(speechsdk, word_timestamps)
+        audio_config = speechsdk.audio.AudioConfig(filename=audio_path)
+        speech_recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+
+        result = speech_recognizer.recognize_once_async().get()
+
+        # Close/release the recognizer to free the file
+        del speech_recognizer
+        del audio_config
+
+        if result.reason == speechsdk.ResultReason.NoMatch:
+            return {'status': 'no_match', 'text': '', 'words': []}
+        if result.reason != speechsdk.ResultReason.RecognizedSpeech:
+            return {'status': 'failed', 'text': '', 'words': [], 'error': str(result.reason)}
+
+        words = self._parse_words(result) if word_timestamps else []
+        return {'status': 'recognized', 'text': result.text, 'words': words}
+
+    def recognize_continuous(self, audio_path, word_timestamps=False, reference_text=None,
+                             on_segment=None, timeout=None, cancel_event=None):
+        """
+        Transcribe a whole recording with continuous recognition
+
+        recognize_once stops at the first pause in speech, so long reading
+        passages were truncated. Continuous recognition keeps going until the
+        audio ends and reports one segment per utterance as it is recognized.
+
+        Args:
+            on_segment: Optional callback receiving each segment
+                        ({'text', 'words'}) as soon as it is recognized
+            timeout: Seconds to wait for the session to end (default: twice
+                     the recording length plus 30 s)
+            cancel_event: Optional threading.Event; setting it stops recognition
+
+        Returns:
+            Same shape as recognize(), with the text and words of all segments
+            (word offsets are relative to the start of the recording)
+        """
+        import azure.cognitiveservices.speech as speechsdk
+
+        speech_config = self._recognition_config(speechsdk, word_timestamps)
+        audio_config = speechsdk.audio.AudioConfig(filename=audio_path)
+        speech_recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+
+        segments = []
+        errors = []
+        done = threading.Event()
+
+        def recognized(evt):
+            if evt.result.reason != speechsdk.ResultReason.RecognizedSpeech or not evt.result.text:
+                return
+            segment = {
+                'text': evt.result.text,
+                'words': self._parse_words(evt.result) if word_timestamps else []
+            }
+            segments.append(segment)
+            if on_segment:
+                on_segment(segment)
+
+        def canceled(evt):
+            details = evt.cancellation_details
+            if details.reason == speechsdk.CancellationReason.Error:
+                errors.append(details.error_details)
+            done.set()
+
+        speech_recognizer.recognized.connect(recognized)
+        speech_recognizer.canceled.connect(canceled)
+        speech_recognizer.session_stopped.connect(lambda evt: done.set())
+
+        if timeout is None:
+            duration = wav_duration(audio_path)
+            timeout = duration * 2 + 30 if duration else 300
+
+        speech_recognizer.start_continuous_recognition_async().get()
+        deadline = time.monotonic() + timeout
+        finished = False
+        while not finished:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (cancel_event is not None and cancel_event.is_set()):
+                break
+            finished = done.wait(min(remaining, 0.25))
+        speech_recognizer.stop_continuous_recognition_async().get()
+
+        if cancel_event is not None and cancel_event.is_set():
+            return {'status': 'failed', 'text': '', 'words': [], 'error': 'Recognition cancelled'}
+
+        # Close/release the recognizer to free the file
+        del speech_recognizer
+        del audio_config
+
+        if not segments:
+            if errors:
+                return {'status': 'failed', 'text': '', 'words': [], 'error': errors[0]}
+            if not finished:
+                return {'status': 'failed', 'text': '', 'words': [], 'error': 'Recognition timed out'}
+            return {'status': 'no_match', 'text': '', 'words': []}
+
+        if errors or not finished:
+            logger.warning("Continuous recognition ended early", extra={'reason': errors[0] if errors else 'timed out'})
+
+        return {
+            'status': 'recognized',
+            'text': ' '.join(segment['text'] for segment in segments),
+            'words': [word for segment in segments for word in segment['words']],
+            'segments': len(segments)
+        }
+
+    # ============ Helper Methods ============
+
+    def _recognition_config(self, speechsdk, word_timestamps):
+        speech_config = speechsdk.SpeechConfig(subscription=self.speech_key, region=self.region)
+        speech_config.speech_recognition_language = "en-US"
+        if word_timestamps:
+            speech_config.request_word_level_timestamps()  # Enable word timing
+        return speech_config
+
+    def _parse_words(self, result):
+        """Word timings (seconds) from a result's detailed JSON"""
+        try:
+            detailed_result = json.loads(result.json)
+            nbest = detailed_result.get('NBest') or [{}]
+            return [
+                {
+                    'word': w.get('Word', ''),
+                    'offset': w.get('Offset', 0) / TICKS_PER_SECOND,  # Convert ticks to seconds
+                    'duration': w.get('Duration', 0) / TICKS_PER_SECOND
+                }
+                for w in nbest[0].get('Words', [])
+            ]
+        except Exception as json_error:
+            logger.warning("Could not parse detailed results: %s", json_error)
+            return []
+
+
+_backend = None
+_limiter = None
+
+
+def init_speech_service(speech_key, region, backend='azure'):
+    """Select the recognition backend ('azure' or 'simulator')"""
+    global _backend
+
+    if backend == 'simulator':
+        logger.info("Speech backend: local simulator (no Azure calls will be made)")
+        _backend = SimulatedSpeechBackend.from_env()
+    else:
+        _backend = AzureSpeechBackend(speech_key, region)
+
+    return _backend
+
+
+def get_backend():
+    if _backend is None:
+        init_speech_service(
+            os.getenv('AZURE_SPEECH_KEY'),
+            os.getenv('AZURE_SPEECH_REGION', 'eastus'),
+            os.getenv('SPEECH_BACKEND', 'azure')
+        )
+    return _backend
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = SpeechLimiter.from_env()
+    return _limiter
+
+
+def _timed(operation):
+    """Backend method `operation`, timed into the speech-call histogram (queueing excluded)"""
+    backend = get_backend()
+    method = getattr(backend, operation)
+    histogram = AZURE_SECONDS.labels(operation, 'simulator' if isinstance(backend, SimulatedSpeechBackend) else 'azure')
+
+    def call(*args, **kwargs):
+        with histogram.time():
+            return method(*args, **kwargs)
+
+    return call
+
+
+def is_configured():
+    """True when recognition can be performed (Azure credentials set or simulator active)"""
+    return get_backend().is_configured()
+
+
+def limiter_stats():
+    return get_limiter().stats()
+
+
+def assess_pronunciation(audio_path, reference_text):
+    """
+    Raises:
+        SpeechBusy / SpeechTimeout (both SpeechUnavailable)
+    """
+    return get_limiter().run(_timed('assess_pronunciation'), audio_path, reference_text)
+
+
+def recognize(audio_path, word_timestamps=False, reference_text=None):
+    """
+    Raises:
+        SpeechBusy / SpeechTimeout (both SpeechUnavailable)
+    """
+    return get_limiter().run(
+        _timed('recognize'), audio_path, word_timestamps=word_timestamps, reference_text=reference_text
+    )
+
+
+def recognize_continuous(audio_path, word_timestamps=False, reference_text=None, on_segment=None):
+    """
+    Raises:
+        SpeechBusy / SpeechTimeout (both SpeechUnavailable)
+    """
+    limiter = get_limiter()
+    return limiter.run(
+        _timed('recognize_continuous'), audio_path,
+        deadline=limiter.continuous_deadline,
+        word_timestamps=word_timestamps, reference_text=reference_text, on_segment=on_segment
+    )
+
+
+class RecognitionStream:
+    """
+    Iterator over a running continuous recognition
+
+    close() cancels recognition even when iteration never started (a client
+    that disconnects before the first chunk), which a plain generator cannot do.
+    """
+
+    def __init__(self, events, cancel_event, deadline_seconds):
+        self.cancel_event = cancel_event
+        self._events = events
+        self._deadline = time.monotonic() + deadline_seconds
+        self._iterator = self._iterate()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def close(self):
+        self.cancel_event.set()
+        self._iterator.close()
+
+    def _iterate(self):
+        try:
+            while True:
+                try:
+                    kind, payload = self._events.get(timeout=max(0, self._deadline - time.monotonic()))
+                except queue.Empty:
+                    yield 'result', {'status': 'failed', 'text': '', 'words': [], 'error': 'Recognition timed out'}
+                    return
+                if kind == 'segment':
+                    yield kind, payload
+                    continue
+                try:
+                    result = payload.result()
+                except Exception as e:
+                    result = {'status': 'failed', 'text': '', 'words': [], 'error': str(e)}
+                yield 'result', result
+                return
+        finally:
+            self.cancel_event.set()
+
+
+def stream_recognition(audio_path, word_timestamps=False, reference_text=None):
+    """
+    Start continuous recognition and return a RecognitionStream over its progress
+
+    The slot is claimed immediately, so SpeechBusy is raised here (before any
+    response is streamed). The iterator yields ('segment', segment) for every
+    recognized utterance as it arrives, then ('result', result) with the same
+    dictionary recognize_continuous returns. Closing the iterator early (client
+    disconnected) or passing the deadline cancels recognition.
+
+    Raises:
+        SpeechBusy: When no recognition slot is free
+    """
+    limiter = get_limiter()
+    events = queue.Queue()
+    future, cancel_event = limiter.submit(
+        _timed('recognize_continuous'), audio_path,
+        word_timestamps=word_timestamps, reference_text=reference_text,
+        on_segment=lambda segment: events.put(('segment', segment))
+    )
+    future.add_done_callback(lambda f: events.put(('done', f)))
+
+    return RecognitionStream(events, cancel_event, limiter.continuous_deadline)
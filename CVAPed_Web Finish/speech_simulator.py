@@ -0,0 +1,229 @@
+"""
+Speech Simulator - Local stand-in for Azure Speech Services
+Returns canned or rule-generated recognition results with configurable
+latency and error rates, so the speech endpoints can be load-tested
+without spending Azure quota.
+
+Environment variables:
+    SPEECH_SIM_LATENCY       Latency distribution in milliseconds, one of
+                             constant:<ms> | uniform:<min>:<max> |
+                             normal:<mean>:<std> | lognormal:<median>:<sigma>
+                             (default: lognormal:450:0.35)
+    SPEECH_SIM_ERROR_RATE    Fraction of calls that fail (default: 0)
+    SPEECH_SIM_NO_MATCH_RATE Fraction of calls that recognize no speech (default: 0)
+    SPEECH_SIM_CANNED        Optional JSON file with canned results keyed by reference text
+    SPEECH_SIM_SEED          Optional random seed for reproducible runs
+"""
+
+import os
+import json
+import math
+import time
+import wave
+import random
+import threading
+
+DEFAULT_LATENCY = 'lognormal:450:0.35'
+FALLBACK_TRANSCRIPT = 'the quick brown fox jumps over the lazy dog'
+SEGMENT_WORDS = 12
+
+
+def wav_duration(audio_path):
+    """Length of a WAV file in seconds, or None if it cannot be read"""
+    try:
+        with wave.open(audio_path, 'rb') as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except Exception:
+        return None
+
+
+def parse_latency(spec):
+    """
+    Parse a latency spec such as 'uniform:200:800' into a sampler
+
+    Returns:
+        Function taking a random.Random and returning a delay in seconds
+    """
+    parts = spec.split(':')
+    kind = parts[0].strip().lower()
+    try:
+        args = [float(p) for p in parts[1:]]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    if kind == 'constant' and len(args) == 1:
+        return lambda rng: args[0] / 1000.0
+    if kind == 'uniform' and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1]) / 1000.0
+    if kind == 'normal' and len(args) == 2:
+        return lambda rng: max(0.0, rng.gauss(args[0], args[1])) / 1000.0
+    if kind == 'lognormal' and len(args) == 2:
+        mu = math.log(args[0])
+        return lambda rng: rng.lognormvariate(mu, args[1]) / 1000.0
+
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+class SimulatedSpeechBackend:
+    """
+    Drop-in replacement for AzureSpeechBackend that never leaves the process
+    """
+
+    def __init__(self, latency=DEFAULT_LATENCY, error_rate=0.0, no_match_rate=0.0,
+                 canned=None, seed=None):
+        self.latency_spec = latency
+        self._sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.no_match_rate = no_match_rate
+        self.canned = canned or {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        canned = {}
+        canned_path = os.getenv('SPEECH_SIM_CANNED')
+        if canned_path:
+            with open(canned_path, 'r', encoding='utf-8') as f:
+                canned = json.load(f)
+
+        seed = os.getenv('SPEECH_SIM_SEED')
+
+        return cls(
+            latency=os.getenv('SPEECH_SIM_LATENCY', DEFAULT_LATENCY),
+            error_rate=float(os.getenv('SPEECH_SIM_ERROR_RATE', 0)),
+            no_match_rate=float(os.getenv('SPEECH_SIM_NO_MATCH_RATE', 0)),
+            canned=canned,
+            seed=int(seed) if seed else None
+        )
+
+    def is_configured(self):
+        return True
+
+    def assess_pronunciation(self, audio_path, reference_text, cancel_event=None):
+        outcome = self._simulate_call(cancel_event)
+        if outcome != 'recognized':
+            return {
+                'success': False,
+                'error': f'Recognition failed: simulated {outcome}'
+            }
+
+        canned = self.canned.get('pronunciation', {}).get(reference_text)
+        if canned:
+            return dict(canned, success=True)
+
+        with self._lock:
+            accuracy = self._rng.uniform(0.6, 1.0)
+            fluency = self._rng.uniform(0.6, 1.0)
+            completeness = self._rng.uniform(0.8, 1.0)
+            phoneme_scores = [self._rng.uniform(0.5, 1.0) for _ in reference_text.replace(' ', '')]
+
+        return {
+            'success': True,
+            'transcription': reference_text,
+            'accuracy_score': accuracy,
+            'pronunciation_score': (accuracy + fluency + completeness) / 3,
+            'completeness_score': completeness,
+            'fluency_score': fluency,
+            'phonemes': [
+                {'phoneme': ch.lower(), 'score': score}
+                for ch, score in zip(reference_text.replace(' ', ''), phoneme_scores)
+            ]
+        }
+
+    def recognize(self, audio_path, word_timestamps=False, reference_text=None, cancel_event=None):
+        outcome = self._simulate_call(cancel_event)
+        if outcome == 'no_match':
+            return {'status': 'no_match', 'text': '', 'words': []}
+        if outcome == 'failed':
+            return {'status': 'failed', 'text': '', 'words': [], 'error': 'simulated failure'}
+
+        canned = self.canned.get('recognition', {}).get(reference_text or '')
+        if canned:
+            result = {'words': []}
+            result.update(canned)
+            result['status'] = 'recognized'
+            return result
+
+        text = reference_text or FALLBACK_TRANSCRIPT
+        words = self._generate_word_timings(text, wav_duration(audio_path)) if word_timestamps else []
+
+        return {'status': 'recognized', 'text': text, 'words': words}
+
+    def recognize_continuous(self, audio_path, word_timestamps=False, reference_text=None,
+                             on_segment=None, timeout=None, cancel_event=None):
+        """
+        Continuous recognition: the transcript is split into utterance-sized
+        segments that are reported through on_segment one at a time
+        """
+        result = self.recognize(audio_path, word_timestamps=True, reference_text=reference_text,
+                                cancel_event=cancel_event)
+        if result['status'] != 'recognized':
+            return result
+
+        tokens = result['text'].split()
+        words = result['words']
+        segments = []
+        for start in range(0, len(tokens), SEGMENT_WORDS):
+            segments.append({
+                'text': ' '.join(tokens[start:start + SEGMENT_WORDS]),
+                'words': words[start:start + SEGMENT_WORDS] if word_timestamps else []
+            })
+
+        for i, segment in enumerate(segments):
+            if i > 0:
+                # Later utterances arrive as the service works through the audio
+                with self._lock:
+                    delay = self._sample_latency(self._rng) / 4
+                if cancel_event is not None and cancel_event.wait(delay):
+                    return {'status': 'failed', 'text': '', 'words': [], 'error': 'simulated cancellation'}
+            if on_segment:
+                on_segment(segment)
+
+        return {
+            'status': 'recognized',
+            'text': result['text'],
+            'words': words if word_timestamps else [],
+            'segments': len(segments)
+        }
+
+    # ============ Helper Methods ============
+
+    def _simulate_call(self, cancel_event=None):
+        """Sleep for a sampled latency (cut short by cancel_event) and pick an outcome"""
+        with self._lock:
+            delay = self._sample_latency(self._rng)
+            roll = self._rng.random()
+
+        if cancel_event is not None:
+            if cancel_event.wait(delay):
+                return 'failed'
+        else:
+            time.sleep(delay)
+
+        if roll < self.error_rate:
+            return 'failed'
+        if roll < self.error_rate + self.no_match_rate:
+            return 'no_match'
+        return 'recognized'
+
+    def _generate_word_timings(self, text, audio_duration):
+        """Spread words evenly over the recording with small jittered gaps"""
+        tokens = text.split()
+        if not tokens:
+            return []
+
+        # ~2.5 words per second when the recording length is unknown
+        total = audio_duration if audio_duration else len(tokens) / 2.5
+        slot = total / len(tokens)
+
+        words = []
+        with self._lock:
+            for i, token in enumerate(tokens):
+                gap = self._rng.uniform(0.02, 0.2) * slot
+                words.append({
+                    'word': token.strip('.,!?'),
+                    'offset': round(i * slot + gap, 3),
+                    'duration': round(max(slot - gap * 2, 0.05), 3)
+                })
+        return words
@@ -0,0 +1,130 @@
+"""
+Startup - Startup timing report and warm-up for the speech therapy app
+Heavy audio/speech modules are imported (and librosa's numba kernels
+compiled) once per worker before it reports ready, instead of inside the
+first request that needs them.
+
+Environment variables:
+    WARM_UP_ON_START  'false' skips warm-up; the worker reports ready at once (default: true)
+    NUMBA_CACHE_DIR   Where numba keeps compiled kernels between restarts
+                      (default: <tempdir>/cvacare-numba-cache)
+"""
+
+import os
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Persist numba's compiled kernels so restarts do not recompile them
+os.environ.setdefault('NUMBA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'cvacare-numba-cache'))
+
+
+class StartupTimer:
+    """
+    Records how long each startup phase took and logs a report
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            with self._lock:
+                self.phases.append({
+                    'phase': name,
+                    'ms': round((time.perf_counter() - started) * 1000, 1),
+                    'error': error
+                })
+
+    def report(self):
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            'pid': os.getpid(),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'phases': phases
+        }
+
+    def log_report(self, title='Startup'):
+        report = self.report()
+        logger.info("%s finished in %s ms", title, report['total_ms'], extra={'phases': report['phases']})
+
+
+startup_timer = StartupTimer()
+_ready = threading.Event()
+_warm_lock = threading.Lock()
+_warm_pid = None
+
+
+def is_ready():
+    return _ready.is_set() and _warm_pid == os.getpid()
+
+
+def mark_ready():
+    global _warm_pid
+    _warm_pid = os.getpid()
+    _ready.set()
+
+
+def _prime_audio_pipeline():
+    """Run the articulation decode path once on a synthetic clip so numba/soxr are compiled"""
+    import numpy as np
+    import soundfile as sf
+    import librosa
+
+    sample_rate = 44100
+    t = np.linspace(0, 0.5, int(sample_rate * 0.5), endpoint=False)
+    tone = (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    path = os.path.join(tempfile.gettempdir(), f'warmup_{os.getpid()}.wav')
+    try:
+        sf.write(path, tone, sample_rate, subtype='PCM_16')
+        audio, sr = librosa.load(path, sr=16000)
+        librosa.feature.zero_crossing_rate(audio)
+        librosa.feature.rms(y=audio)
+        librosa.effects.trim(audio)
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def warm_up(timer=None):
+    """
+    Preload heavy modules and prime caches for this process, then mark it ready
+
+    Each step is optional: a missing module is reported in the startup
+    report but does not stop the worker from serving.
+    """
+    timer = timer or startup_timer
+    with _warm_lock:
+        if is_ready():
+            return
+
+        steps = [
+            ('import soundfile', lambda: __import__('soundfile')),
+            ('import librosa', lambda: __import__('librosa')),
+            ('import speechsdk', lambda: __import__('azure.cognitiveservices.speech')),
+            ('prime audio pipeline', _prime_audio_pipeline)
+        ]
+        for name, step in steps:
+            try:
+                with timer.phase(name):
+                    step()
+            except Exception as e:
+                logger.warning("Warm-up step '%s' failed: %s", name, e)
+
+        mark_ready()
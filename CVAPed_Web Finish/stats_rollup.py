@@ -0,0 +1,302 @@
+"""
+Stats Rollup - Daily session rollups for the admin dashboard
+Keeps one document per (day, therapy) with session counts and score sums,
+updated with $inc whenever trials are inserted, so dashboard statistics are
+served by a single aggregation instead of scanning the trial collections.
+
+Backfill or repair the rollups from existing trials with:
+    python stats_rollup.py --rebuild
+"""
+
+import datetime
+
+from pymongo import UpdateOne
+
+ROLLUP_COLLECTION = 'daily_session_rollups'
+
+TRIAL_COLLECTIONS = {
+    'articulation': 'articulation_trials',
+    'language': 'language_trials',
+    'fluency': 'fluency_trials'
+}
+
+# Score field per therapy and the factor that puts it on a 0-100 scale
+SCORE_FIELDS = {
+    'articulation': ('scores.accuracy_score', 100),
+    'language': ('score', 100),
+    'fluency': ('fluency_score', 1)
+}
+
+_db = None
+
+
+def init_stats_rollup(database):
+    """Initialize the rollup module with the database connection"""
+    global _db
+    _db = database
+
+
+def _day_key(timestamp):
+    return timestamp.strftime('%Y-%m-%d')
+
+
+def _trial_score(trial, therapy):
+    """Read the therapy's score field from a trial document (dotted path), scaled to 0-100"""
+    field, scale = SCORE_FIELDS[therapy]
+    value = trial
+    for part in field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value * scale
+
+
+def record_trials(therapy, trials):
+    """
+    Add inserted trials to their daily rollups (one upsert per day touched)
+
+    Args:
+        therapy: 'articulation', 'language' or 'fluency'
+        trials: Trial documents as inserted (must carry a 'timestamp')
+    """
+    per_day = {}
+    for trial in trials:
+        timestamp = trial.get('timestamp') or datetime.datetime.now(datetime.timezone.utc)
+        day = _day_key(timestamp)
+        totals = per_day.setdefault(day, {'sessions': 0, 'score_sum': 0.0, 'score_count': 0})
+        totals['sessions'] += 1
+
+        score = _trial_score(trial, therapy)
+        if score is not None:
+            totals['score_sum'] += score
+            totals['score_count'] += 1
+
+    if not per_day:
+        return
+
+    operations = [
+        UpdateOne(
+            {'_id': f'{day}:{therapy}'},
+            {
+                '$inc': totals,
+                '$setOnInsert': {
+                    'day': day,
+                    'date': datetime.datetime.strptime(day, '%Y-%m-%d'),
+                    'therapy': therapy
+                }
+            },
+            upsert=True
+        )
+        for day, totals in per_day.items()
+    ]
+    _db[ROLLUP_COLLECTION].bulk_write(operations, ordered=False)
+
+
+def rebuild_daily_rollups():
+    """
+    Recompute every rollup from the trial collections
+
+    Meant for the initial backfill or repairs; trials inserted while a
+    therapy is being rebuilt may be counted twice, so run it off-peak.
+    """
+    rollups = _db[ROLLUP_COLLECTION]
+
+    for therapy, collection_name in TRIAL_COLLECTIONS.items():
+        field, scale = SCORE_FIELDS[therapy]
+        rollups.delete_many({'therapy': therapy})
+
+        _db[collection_name].aggregate([
+            {'$match': {'timestamp': {'$type': 'date'}}},
+            {'$group': {
+                '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$timestamp'}},
+                'sessions': {'$sum': 1},
+                'score_sum': {'$sum': {
+                    '$cond': [{'$isNumber': f'${field}'}, {'$multiply': [f'${field}', scale]}, 0]
+                }},
+                'score_count': {'$sum': {'$cond': [{'$isNumber': f'${field}'}, 1, 0]}}
+            }},
+            {'$project': {
+                '_id': {'$concat': ['$_id', f':{therapy}']},
+                'day': '$_id',
+                'date': {'$dateFromString': {'dateString': '$_id', 'format': '%Y-%m-%d'}},
+                'therapy': {'$literal': therapy},
+                'sessions': 1,
+                'score_sum': 1,
+                'score_count': 1
+            }},
+            {'$merge': {'into': ROLLUP_COLLECTION, 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ])
+        print(f"Rebuilt {therapy} rollups from {collection_name}")
+
+
+def _progress_projection(completed_field):
+    return [{'$project': {
+        '_id': 0,
+        'user_id': 1,
+        'completed': {'$cond': [{'$eq': [f'${completed_field}', True]}, 1, 0]}
+    }}]
+
+
+def admin_stats_pipeline(trend_days, recent_limit=10):
+    """
+    Build the single aggregation (run against the users collection) behind the admin dashboard
+
+    Every branch reduces its collection to a handful of summary documents
+    before it is unioned in (user totals, one progress summary, one row per
+    therapy and per trend day, and the recent trials), so the result stays
+    a few dozen small documents however large the collections grow.
+    """
+    return [
+        {'$group': {
+            '_id': None,
+            'total': {'$sum': 1},
+            'speech': {'$sum': {'$cond': [{'$eq': ['$therapyType', 'speech']}, 1, 0]}},
+            'physical': {'$sum': {'$cond': [{'$eq': ['$therapyType', 'physical']}, 1, 0]}}
+        }},
+        {'$project': {'_id': 0, 'src': {'$literal': 'user'}, 'total': 1, 'speech': 1, 'physical': 1}},
+        {'$unionWith': {'coll': 'articulation_progress', 'pipeline': _progress_projection('completed') + [
+            {'$unionWith': {'coll': 'language_progress', 'pipeline': _progress_projection('all_levels_completed')}},
+            {'$unionWith': {'coll': 'fluency_progress', 'pipeline': _progress_projection('levels.5.completed')}},
+            {'$group': {'_id': '$user_id', 'completions': {'$sum': '$completed'}}},
+            {'$group': {'_id': None, 'active_users': {'$sum': 1}, 'completions': {'$sum': '$completions'}}},
+            {'$project': {'_id': 0, 'src': {'$literal': 'progress'}, 'active_users': 1, 'completions': 1}}
+        ]}},
+        {'$unionWith': {'coll': ROLLUP_COLLECTION, 'pipeline': [
+            {'$group': {
+                '_id': '$therapy',
+                'sessions': {'$sum': '$sessions'},
+                'score_sum': {'$sum': '$score_sum'},
+                'score_count': {'$sum': '$score_count'}
+            }},
+            {'$project': {
+                '_id': 0,
+                'src': {'$literal': 'therapy'},
+                'therapy': '$_id',
+                'sessions': 1,
+                'score_sum': 1,
+                'score_count': 1
+            }}
+        ]}},
+        {'$unionWith': {'coll': ROLLUP_COLLECTION, 'pipeline': [
+            {'$match': {'day': {'$in': trend_days}}},
+            {'$group': {'_id': '$day', 'sessions': {'$sum': '$sessions'}}},
+            {'$project': {'_id': 0, 'src': {'$literal': 'trend'}, 'day': '$_id', 'sessions': 1}}
+        ]}},
+        {'$unionWith': {'coll': 'fluency_trials', 'pipeline': [
+            {'$sort': {'timestamp': -1}},
+            {'$limit': recent_limit},
+            {'$lookup': {
+                'from': 'users',
+                'let': {'uid': {'$convert': {'input': '$user_id', 'to': 'objectId', 'onError': None, 'onNull': None}}},
+                'pipeline': [
+                    {'$match': {'$expr': {'$eq': ['$_id', '$$uid']}}},
+                    {'$project': {'firstName': 1, 'lastName': 1}}
+                ],
+                'as': 'user'
+            }},
+            {'$unwind': '$user'},
+            {'$project': {
+                '_id': 0,
+                'src': {'$literal': 'recent'},
+                'timestamp': 1,
+                'fluency_score': 1,
+                'firstName': '$user.firstName',
+                'lastName': '$user.lastName'
+            }}
+        ]}}
+    ]
+
+
+def get_admin_stats(now=None, days=7):
+    """
+    Compute the admin dashboard payload with one round trip to MongoDB
+
+    Returns:
+        Dictionary with 'stats', 'therapy_distribution', 'recent_activity'
+        and 'session_trends' keys
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    start = now - datetime.timedelta(days=days)
+    trend_days = [_day_key(start + datetime.timedelta(days=i)) for i in range(days)]
+
+    rows = {}
+    for row in _db['users'].aggregate(admin_stats_pipeline(trend_days)):
+        rows.setdefault(row['src'], []).append(row)
+
+    users = (rows.get('user') or [{}])[0]
+    progress = (rows.get('progress') or [{}])[0]
+    active_users = progress.get('active_users', 0)
+    total_completions = progress.get('completions', 0)
+
+    therapies = {row['therapy']: row for row in rows.get('therapy', [])}
+    sessions = {t: therapies.get(t, {}).get('sessions', 0) for t in TRIAL_COLLECTIONS}
+    averages = {}
+    for therapy in TRIAL_COLLECTIONS:
+        row = therapies.get(therapy, {})
+        if row.get('score_count'):
+            averages[therapy] = row['score_sum'] / row['score_count']
+
+    average_score = round(sum(averages.values()) / len(averages), 1) if averages else 0
+
+    trend_counts = {row['day']: row['sessions'] for row in rows.get('trend', [])}
+    session_trends = {day: trend_counts.get(day, 0) for day in trend_days}
+
+    recent_activity = []
+    for trial in rows.get('recent', []):
+        timestamp = trial.get('timestamp', now)
+        score = trial.get('fluency_score', 0)
+        recent_activity.append({
+            'user_name': f"{trial.get('firstName', 'Unknown')} {trial.get('lastName', 'User')}",
+            'therapy_type': 'Fluency Therapy',
+            'score': score,
+            'timestamp': timestamp,
+            'status': 'completed' if score >= 70 else 'practicing'
+        })
+
+    speech_users = users.get('speech', 0)
+    physical_users = users.get('physical', 0)
+
+    return {
+        'stats': {
+            'total_users': users.get('total', 0),
+            'active_users': active_users,
+            'total_sessions': sum(sessions.values()),
+            'total_completions': total_completions,
+            'average_score': average_score,
+            'speech_users': speech_users,
+            'physical_users': physical_users,
+            'articulation_sessions': sessions['articulation'],
+            'language_sessions': sessions['language'],
+            'fluency_sessions': sessions['fluency'],
+            'articulation_avg': round(averages.get('articulation', 0), 1),
+            'language_avg': round(averages.get('language', 0), 1),
+            'fluency_avg': round(averages.get('fluency', 0), 1)
+        },
+        'therapy_distribution': {
+            'speech': speech_users,
+            'physical': physical_users
+        },
+        'recent_activity': recent_activity,
+        'session_trends': session_trends
+    }
+
+
+if __name__ == '__main__':
+    import os
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description='Maintain the admin dashboard daily rollups')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute all rollups from the trial collections')
+    args = parser.parse_args()
+
+    load_dotenv()
+    init_stats_rollup(MongoClient(os.getenv('MONGO_URI'))[os.getenv('MONGO_DB_NAME', 'CVACare')])
+
+    if args.rebuild:
+        rebuild_daily_rollups()
+    else:
+        parser.print_help()
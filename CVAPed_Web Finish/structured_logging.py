@@ -0,0 +1,80 @@
+"""
+Structured Logging - Leveled, one-line-per-event logging for the API
+Every module logs through `logging.getLogger(__name__)`; this configures the
+root logger once. In JSON mode each record is a single JSON object with the
+timestamp, level, logger, message, any `extra={...}` fields and the
+traceback, so log aggregators can filter on fields instead of parsing text.
+
+Environment variables:
+    LOG_LEVEL    Minimum level (default: INFO)
+    LOG_FORMAT   'json' (default) or 'text'
+"""
+
+import os
+import sys
+import json
+import logging
+import datetime
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record (and its extra fields) as one JSON object"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable format for local development; extra fields are appended as key=value"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        extras = [
+            f'{key}={value}' for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS and not key.startswith('_')
+        ]
+        if extras:
+            line = line.split('\n', 1)
+            line[0] = f"{line[0]} | {' '.join(extras)}"
+            line = '\n'.join(line)
+        return line
+
+
+_configured = False
+
+
+def configure_logging(level=None, fmt=None):
+    """Install the structured handler on the root logger (idempotent)"""
+    global _configured
+    if _configured:
+        return
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'json')).lower()
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    _configured = True
@@ -0,0 +1,119 @@
+"""
+Tests for audio_io - upload size/duration limits
+"""
+
+import io
+import os
+import wave
+
+import pytest
+from flask import Flask, request, jsonify
+
+from audio_io import (
+    AudioUploadLimits, AudioRejected, UploadLimit, UploadTooLarge, AudioTooLong, UnsupportedAudio,
+    FORM_OVERHEAD_BYTES, parse_upload, save_upload, check_wav_duration
+)
+
+
+class FakeUpload:
+    """Stand-in for werkzeug's FileStorage: only .stream is used"""
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+
+def write_wav(path, seconds, rate=16000):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b'\x00\x00' * int(seconds * rate))
+
+
+def test_limits_from_env_defaults_and_overrides(monkeypatch):
+    monkeypatch.setenv('AUDIO_MAX_MB_LANGUAGE', '2.5')
+    monkeypatch.setenv('AUDIO_MAX_SECONDS_FLUENCY', '60')
+    limits = AudioUploadLimits.from_env()
+
+    assert limits.for_route('articulation') == UploadLimit(5 * 1024 * 1024, 15.0)
+    assert limits.for_route('language').max_bytes == int(2.5 * 1024 * 1024)
+    assert limits.for_route('fluency').max_seconds == 60.0
+    assert limits.max_content_length == 25 * 1024 * 1024 + FORM_OVERHEAD_BYTES
+
+
+def test_check_content_length():
+    limits = AudioUploadLimits({'articulation': UploadLimit(1000, 15)})
+    limits.check_content_length('articulation', None)
+    limits.check_content_length('articulation', 1000 + FORM_OVERHEAD_BYTES)
+    with pytest.raises(UploadTooLarge) as error:
+        limits.check_content_length('articulation', 1001 + FORM_OVERHEAD_BYTES)
+    assert error.value.status_code == 413
+
+
+def post_chunked_upload(payload_bytes, max_content_length=4096):
+    """POST a multipart upload with Transfer-Encoding: chunked (no Content-Length) through parse_upload"""
+    app = Flask(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = max_content_length
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        try:
+            files, form = parse_upload(request)
+            return jsonify({'files': list(files), 'content_length': request.content_length}), 200
+        except AudioRejected as e:
+            return jsonify({'message': str(e)}), e.status_code
+
+    body = (
+        b'--boundary\r\nContent-Disposition: form-data; name="audio"; filename="clip.webm"\r\n'
+        b'Content-Type: application/octet-stream\r\n\r\n' + payload_bytes + b'\r\n--boundary--\r\n'
+    )
+    return app.test_client().post(
+        '/upload',
+        input_stream=io.BytesIO(body),
+        headers={'Transfer-Encoding': 'chunked', 'Content-Type': 'multipart/form-data; boundary=boundary'},
+        environ_overrides={'wsgi.input_terminated': True}
+    )
+
+
+def test_parse_upload_accepts_chunked_upload_within_limit():
+    response = post_chunked_upload(b'x' * 1000)
+    assert response.status_code == 200
+    assert response.get_json() == {'files': ['audio'], 'content_length': None}
+
+
+def test_parse_upload_rejects_oversized_chunked_upload():
+    response = post_chunked_upload(b'x' * 10000)
+    assert response.status_code == 413
+    assert response.get_json()['message'] == 'Request body is too large'
+
+
+def test_save_upload_copies_in_chunks(tmp_path):
+    dest = tmp_path / 'upload.webm'
+    data = os.urandom(10000)
+    assert save_upload(FakeUpload(data), str(dest), UploadLimit(10000, 15), chunk_size=1024) == 10000
+    assert dest.read_bytes() == data
+
+
+def test_save_upload_rejects_oversized_and_removes_file(tmp_path):
+    dest = tmp_path / 'upload.webm'
+    with pytest.raises(UploadTooLarge):
+        save_upload(FakeUpload(b'x' * 10001), str(dest), UploadLimit(10000, 15), chunk_size=1024)
+    assert not dest.exists()
+
+
+def test_check_wav_duration(tmp_path):
+    path = tmp_path / 'ok.wav'
+    write_wav(path, 2.0)
+    assert check_wav_duration(str(path), UploadLimit(10 ** 6, 15)) == pytest.approx(2.0)
+
+    with pytest.raises(AudioTooLong):
+        check_wav_duration(str(path), UploadLimit(10 ** 6, 1.5))
+
+
+@pytest.mark.parametrize('content', [b'', b'not a wav file at all', b'RIFF\x10\x00\x00\x00WAVE'])
+def test_check_wav_duration_rejects_unreadable_files(tmp_path, content):
+    path = tmp_path / 'bad.wav'
+    path.write_bytes(content)
+    with pytest.raises(UnsupportedAudio) as error:
+        check_wav_duration(str(path), UploadLimit(10 ** 6, 15))
+    assert error.value.status_code == 415
@@ -0,0 +1,118 @@
+"""
+Tests for audio_vad - speech detection and in-place trimming
+"""
+
+import wave
+
+import numpy as np
+import pytest
+
+from audio_io import UnsupportedAudio
+from audio_vad import SilentRecording, VoiceActivityDetector, find_speech, pcm_to_mono
+
+RATE = 16000
+rng = np.random.default_rng(7)
+
+
+def hiss(seconds, level_db):
+    """White noise with the given RMS level (dBFS)"""
+    return rng.normal(0.0, 10 ** (level_db / 20.0), int(seconds * RATE)).astype(np.float32)
+
+
+def voiced(seconds, level_db, freq=220.0):
+    """Harmonic 'speech' burst with the given RMS level (dBFS)"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    wave_ = np.sin(2 * np.pi * freq * t) + 0.5 * np.sin(2 * np.pi * 2 * freq * t)
+    return (wave_ / np.sqrt(np.mean(wave_ ** 2)) * 10 ** (level_db / 20.0)).astype(np.float32)
+
+
+def with_burst(background, burst, at_seconds):
+    samples = background.copy()
+    start = int(at_seconds * RATE)
+    samples[start:start + len(burst)] += burst
+    return samples
+
+
+def test_noise_only_clip_has_no_speech():
+    assert find_speech(hiss(3.0, -45.0), RATE) is None
+
+
+def test_silence_has_no_speech():
+    assert find_speech(np.zeros(RATE * 2, dtype=np.float32), RATE) is None
+
+
+def test_clean_speech_is_trimmed_to_the_burst():
+    samples = with_burst(hiss(4.0, -75.0), voiced(1.0, -12.0), 1.5)
+    start, end = find_speech(samples, RATE, pad_ms=0)
+    assert abs(start / RATE - 1.5) < 0.03
+    assert abs(end / RATE - 2.5) < 0.03
+
+
+def test_noisy_speech_below_30db_snr_is_still_trimmed():
+    samples = with_burst(hiss(4.0, -38.0), voiced(1.0, -10.0), 1.5)
+    start, end = find_speech(samples, RATE, pad_ms=0)
+    assert abs(start / RATE - 1.5) < 0.03
+    assert abs(end / RATE - 2.5) < 0.03
+
+
+def test_quiet_fricative_is_kept():
+    samples = with_burst(hiss(3.0, -75.0), hiss(0.3, -42.0), 1.0)
+    samples = with_burst(samples, voiced(0.5, -12.0), 1.3)
+    start, end = find_speech(samples, RATE, pad_ms=0)
+    assert start / RATE < 1.05
+    assert end / RATE > 1.75
+
+
+def test_isolated_plosive_burst_is_speech():
+    samples = with_burst(hiss(2.0, -75.0), hiss(0.05, -20.0), 1.0)
+    start, end = find_speech(samples, RATE, pad_ms=0)
+    assert abs(start / RATE - 1.0) < 0.03
+    assert abs(end / RATE - 1.05) < 0.03
+
+
+def test_single_click_is_not_speech():
+    assert find_speech(with_burst(hiss(2.0, -75.0), hiss(0.01, -20.0), 1.0), RATE) is None
+
+
+def test_sustained_sound_filling_the_clip_is_speech():
+    assert find_speech(voiced(2.0, -20.0), RATE) == (0, 2 * RATE)
+
+
+def test_pcm_to_mono_sample_widths():
+    assert np.allclose(pcm_to_mono(bytes([0, 128, 255]), 1, 1), [-1.0, 0.0, 127 / 128.0])
+    assert np.allclose(pcm_to_mono(np.array([-32768, 16384], '<i2').tobytes(), 2, 1), [-1.0, 0.5])
+    assert np.allclose(pcm_to_mono(bytes([0, 0, 0x80, 0, 0, 0x40]), 3, 1), [-1.0, 0.5])
+    assert np.allclose(pcm_to_mono(np.array([1000, -1000], '<i2').tobytes(), 2, 2), [0.0])
+    with pytest.raises(UnsupportedAudio):
+        pcm_to_mono(b'\x00' * 5, 5, 1)
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+
+
+def test_trim_wav_rewrites_the_file(tmp_path):
+    path = tmp_path / 'take.wav'
+    write_wav(path, with_burst(hiss(4.0, -75.0), voiced(1.0, -12.0), 1.5))
+
+    result = VoiceActivityDetector(pad_ms=100).trim_wav(str(path))
+    assert result.trimmed_seconds == pytest.approx(2.8, abs=0.05)
+    with wave.open(str(path), 'rb') as wav:
+        assert wav.getnframes() / RATE == pytest.approx(1.2, abs=0.05)
+
+
+def test_trim_wav_rejects_silent_and_unreadable_files(tmp_path):
+    silent = tmp_path / 'silent.wav'
+    write_wav(silent, hiss(2.0, -45.0))
+    with pytest.raises(SilentRecording):
+        VoiceActivityDetector().trim_wav(str(silent))
+    assert VoiceActivityDetector(reject_silence=False).trim_wav(str(silent)).trimmed_seconds == 0.0
+
+    broken = tmp_path / 'broken.wav'
+    broken.write_bytes(b'not a wav')
+    with pytest.raises(UnsupportedAudio):
+        VoiceActivityDetector().trim_wav(str(broken))
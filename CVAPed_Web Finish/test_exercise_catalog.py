@@ -0,0 +1,68 @@
+"""
+Tests for exercise_catalog - loading and ordering the cached articulation catalog
+"""
+
+from pymongo.errors import PyMongoError
+
+from exercise_catalog import DEFAULT_EXERCISES, ExerciseCatalog
+
+
+class FakeCollection:
+    """The slice of a pymongo collection the catalog uses, on a standalone server"""
+
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+
+    def find(self, query=None, projection=None):
+        return [dict(doc) for doc in self.documents if doc.get('is_active') is not False]
+
+    def find_one(self, query=None, projection=None):
+        return self.documents[0] if self.documents else None
+
+    def watch(self):
+        raise PyMongoError('change streams need a replica set')
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        return self.setdefault(name, FakeCollection())
+
+
+def catalog_with(documents):
+    db = FakeDatabase()
+    db['articulation_exercises'] = FakeCollection(documents)
+    return ExerciseCatalog(db)
+
+
+def test_mixed_order_keys_load_and_sort_numerically():
+    catalog = catalog_with([
+        {'sound_id': 's', 'level': 3, 'order': None, 'target': 'sun'},
+        {'sound_id': 's', 'level': 3, 'order': '2', 'target': 'sip'},
+        {'sound_id': 's', 'level': 3, 'order': 10, 'target': 'sand'},
+        {'sound_id': 's', 'level': 3, 'order': 'first', 'target': 'sock'},
+        {'sound_id': 's', 'level': 3, 'item_index': 1.5, 'target': 'seal'},
+        {'sound_id': 's', 'level': 3, 'order': True, 'target': 'sea'},
+    ])
+
+    items, etag = catalog.get_level('s', 3)
+    assert items == ['sun', 'seal', 'sip', 'sand']
+    assert etag
+
+
+def test_documents_without_order_keep_collection_order():
+    catalog = catalog_with([
+        {'sound_id': 'r', 'level': 2, 'target': 'ra'},
+        {'sound_id': 'r', 'level': 2, 'target': 're'},
+        {'sound_id': 'r', 'level': 2, 'target': 'ri'},
+    ])
+    assert catalog.get_level('r', 2)[0] == ['ra', 're', 'ri']
+
+
+def test_level_documents_and_defaults_for_missing_levels():
+    catalog = catalog_with([
+        {'sound_id': 'k', 'level': '1', 'items': ['k', 'kk']},
+        {'sound_id': 'k', 'level': 'two', 'target': 'ignored'},
+    ])
+    assert catalog.get_level('k', 1)[0] == ['k', 'kk']
+    assert catalog.get_level('k', 2)[0] == DEFAULT_EXERCISES['k'][2]
+    assert catalog.get_level('z', 1) == (None, None)
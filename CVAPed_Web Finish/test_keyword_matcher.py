@@ -0,0 +1,69 @@
+"""
+Tests for keyword_matcher - stemming and whole-word keyword matching
+"""
+
+import pytest
+
+from keyword_matcher import KeywordMatcher, compile_keywords, stem, tokenize
+
+
+@pytest.mark.parametrize('base, inflected', [
+    ('cookie', 'cookies'),
+    ('use', 'used'),
+    ('use', 'uses'),
+    ('use', 'using'),
+    ('tie', 'tied'),
+    ('tie', 'ties'),
+    ('pie', 'pies'),
+    ('baby', 'babies'),
+    ('try', 'tried'),
+    ('try', 'tries'),
+    ('run', 'running'),
+    ('run', 'runs'),
+    ('stop', 'stopped'),
+    ('bake', 'baked'),
+    ('bake', 'baking'),
+    ('bake', 'bakes'),
+    ('agree', 'agreed'),
+    ('need', 'needs'),
+    ('shoe', 'shoes'),
+    ('box', 'boxes'),
+    ('play', 'played'),
+    ('dog', "dog's"),
+])
+def test_inflected_forms_share_a_stem(base, inflected):
+    assert stem(base) == stem(inflected)
+
+
+@pytest.mark.parametrize('word', ['glass', 'bus', 'this', 'gas', 'news', 'sing'])
+def test_non_inflected_words_are_kept(word):
+    assert stem(word) == word
+
+
+@pytest.mark.parametrize('first, second', [('one', 'on'), ('cat', 'catch'), ('bed', 'bee')])
+def test_distinct_words_stay_distinct(first, second):
+    assert stem(first) != stem(second)
+
+
+def test_tokenize_normalizes_case_accents_and_punctuation():
+    assert tokenize('The Café’s COOKIES!') == [stem('the'), stem('cafe'), stem('cookie')]
+
+
+def test_matcher_accepts_inflected_answers():
+    matcher = KeywordMatcher(['cookie', 'pie', 'use'])
+    assert matcher.find('I ate cookies and pies, I used it') == ['cookie', 'pie', 'use']
+
+
+def test_matcher_matches_whole_words_only():
+    assert KeywordMatcher(['cat']).find('Education matters') == []
+
+
+def test_matcher_finds_phrases_and_overlapping_keywords():
+    matcher = KeywordMatcher(['ice cream', 'cream', 'chocolate ice cream'])
+    assert matcher.find('I want chocolate ice creams') == ['ice cream', 'cream', 'chocolate ice cream']
+
+
+def test_compile_keywords_rejects_non_lists():
+    with pytest.raises(ValueError):
+        compile_keywords('ex-1', '{"a": 1}')
+    assert compile_keywords('ex-2', '["apple"]').find('two apples') == ['apple']
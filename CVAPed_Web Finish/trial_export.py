@@ -0,0 +1,239 @@
+"""
+Trial Export - Streaming NDJSON/CSV export of therapy trials
+Rows are produced straight from a MongoDB cursor: documents are read in
+batches of `batch_size`, the users referenced by each batch are joined with
+one $in query, and rows are serialized into ~64 KB chunks that are handed
+to the response as they fill. Memory use depends on the batch size, never
+on the size of the collection.
+
+Query arguments (all optional):
+    format       'ndjson' (default) or 'csv'
+    fields       Comma-separated field paths (default: the therapy's standard columns)
+    from, to     ISO 8601 bounds on the trial timestamp ([from, to))
+    user_id      Only this user's trials
+    mode         Language therapy mode ('receptive' / 'expressive')
+    batch_size   Documents per cursor batch (default: 500, max: 5000)
+    users        'false' skips the user name/email join
+"""
+
+import io
+import csv
+import json
+import re
+import datetime
+
+from bson import ObjectId
+
+from admin_queries import hydrate_users
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+CHUNK_BYTES = 64 * 1024
+FIELD_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$')
+
+# therapy -> (collection, timestamp field, default fields)
+EXPORTS = {
+    'articulation': ('articulation_trials', 'timestamp', [
+        'user_id', 'sound_id', 'level', 'item_index', 'target', 'trial',
+        'scores.accuracy_score', 'scores.pronunciation_score', 'scores.completeness_score',
+        'scores.fluency_score', 'scores.computed_score', 'transcription', 'timestamp'
+    ]),
+    'language': ('language_trials', 'timestamp', [
+        'user_id', 'mode', 'exercise_id', 'exercise_index', 'score', 'is_correct',
+        'user_answer', 'transcription', 'timestamp'
+    ]),
+    'fluency': ('fluency_trials', 'timestamp', [
+        'user_id', 'exercise_type', 'exercise_id', 'fluency_score', 'speaking_rate', 'word_count',
+        'pause_count', 'disfluencies', 'transcription', 'timestamp'
+    ]),
+    'physical': ('physical_trials', 'created_at', [
+        'user_id', 'exercise_type', 'score', 'duration', 'created_at'
+    ])
+}
+
+USER_COLUMNS = ['user_name', 'user_email']
+
+
+class ExportSpec:
+    """A validated export request"""
+
+    def __init__(self, therapy, collection_name, timestamp_field, query, fields, fmt, batch_size, join_users):
+        self.therapy = therapy
+        self.collection_name = collection_name
+        self.timestamp_field = timestamp_field
+        self.query = query
+        self.fields = fields
+        self.format = fmt
+        self.batch_size = batch_size
+        self.join_users = join_users
+
+    @property
+    def columns(self):
+        return ['id'] + self.fields + (USER_COLUMNS if self.join_users else [])
+
+    @property
+    def mimetype(self):
+        return 'text/csv' if self.format == 'csv' else 'application/x-ndjson'
+
+    @property
+    def filename(self):
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d-%H%M%S')
+        return f"{self.therapy}-trials-{stamp}.{'csv' if self.format == 'csv' else 'ndjson'}"
+
+
+_db = None
+
+
+def init_trial_export(database):
+    """Initialize the export module with the database connection"""
+    global _db
+    _db = database
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 date')
+
+
+def parse_export_args(therapy, args):
+    """
+    Build an ExportSpec from query arguments
+
+    Raises:
+        ValueError: When the therapy or an argument is invalid
+    """
+    if therapy not in EXPORTS:
+        raise ValueError(f"therapy must be one of: {', '.join(EXPORTS)}")
+    collection_name, timestamp_field, default_fields = EXPORTS[therapy]
+
+    fmt = args.get('format', 'ndjson').lower()
+    if fmt not in ('ndjson', 'csv'):
+        raise ValueError("format must be 'ndjson' or 'csv'")
+
+    if args.get('fields'):
+        fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+        invalid = [field for field in fields if not FIELD_PATTERN.match(field) or field == '_id']
+        if invalid:
+            raise ValueError(f"Invalid field(s): {', '.join(invalid)}")
+    else:
+        fields = list(default_fields)
+
+    try:
+        batch_size = int(args.get('batch_size', DEFAULT_BATCH_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('batch_size must be an integer')
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+
+    query = {}
+    time_range = {}
+    if args.get('from'):
+        time_range['$gte'] = _parse_date(args['from'], 'from')
+    if args.get('to'):
+        time_range['$lt'] = _parse_date(args['to'], 'to')
+    if time_range:
+        query[timestamp_field] = time_range
+    if args.get('user_id'):
+        query['user_id'] = args['user_id']
+    if args.get('mode'):
+        if therapy != 'language':
+            raise ValueError('mode only applies to language exports')
+        query['mode'] = args['mode']
+
+    join_users = args.get('users', 'true').lower() != 'false'
+    return ExportSpec(therapy, collection_name, timestamp_field, query, fields, fmt, batch_size, join_users)
+
+
+def _get_path(document, path):
+    value = document
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _batches(cursor, size):
+    batch = []
+    for document in cursor:
+        batch.append(document)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_rows(spec):
+    """
+    Yield one flat dict per trial (keys = spec.columns)
+
+    The cursor is read `batch_size` documents at a time; users are joined per
+    batch. No sort is applied: sorting on a field the chosen index does not
+    provide would make MongoDB buffer the whole result before the first row.
+    """
+    projection = {field: 1 for field in spec.fields}
+    if spec.join_users:
+        projection['user_id'] = 1
+
+    cursor = (
+        _db[spec.collection_name]
+        .find(spec.query, projection)
+        .batch_size(spec.batch_size)
+    )
+
+    try:
+        for batch in _batches(cursor, spec.batch_size):
+            users = hydrate_users(batch) if spec.join_users else {}
+            for document in batch:
+                row = {'id': document['_id']}
+                for field in spec.fields:
+                    row[field] = _get_path(document, field)
+                if spec.join_users:
+                    user = users.get(str(document.get('user_id')), {})
+                    row['user_name'] = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip() or None
+                    row['user_email'] = user.get('email')
+                yield row
+    finally:
+        cursor.close()
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def stream_export(spec, dumps):
+    """
+    Serialized export body in chunks of about CHUNK_BYTES
+
+    Args:
+        spec: ExportSpec
+        dumps: JSON encoder for NDJSON rows (the app's JSON provider)
+    """
+    buffer = io.StringIO()
+    columns = spec.columns
+
+    if spec.format == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        write_row = lambda row: writer.writerow([_csv_value(row.get(column)) for column in columns])
+    else:
+        write_row = lambda row: buffer.write(dumps(row) + '\n')
+
+    for row in export_rows(spec):
+        write_row(row)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
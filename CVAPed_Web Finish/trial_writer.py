@@ -0,0 +1,321 @@
+"""
+Trial Writer - Buffered bulk writer for therapy trial logs
+Trial documents are queued in-process and written with insert_many(ordered=False)
+once a batch fills up or the flush interval passes, so requests never wait on
+an acknowledged trial write. Documents that cannot be written because MongoDB
+is unreachable are kept (up to TRIAL_LOG_MAX_BUFFER of them) and retried
+until it comes back; while they wait, a request that finds the queue full is
+refused with TrialLogUnavailable instead of blocking on a doomed write.
+
+Environment variables:
+    TRIAL_LOG_BUFFERED           'false' writes synchronously (default: true)
+    TRIAL_LOG_BATCH_SIZE         Documents per insert_many (default: 100)
+    TRIAL_LOG_FLUSH_INTERVAL_MS  Max time a document waits in the buffer (default: 500)
+    TRIAL_LOG_MAX_BUFFER         Queue capacity before producers block, and the most
+                                 documents kept for retry (default: 5000)
+    TRIAL_LOG_ENQUEUE_TIMEOUT_MS How long a request may block on a full queue before
+                                 writing its trial synchronously (default: 2000)
+"""
+
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import deque
+
+from pymongo.errors import AutoReconnect, BulkWriteError, DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY_SECONDS = 1.0
+
+
+class TrialLogUnavailable(Exception):
+    """The buffer is full and MongoDB is unreachable, so the trial cannot be accepted"""
+
+
+class TrialLogWriter:
+    """
+    Buffers trial documents per collection and flushes them in bulk from a background thread
+    """
+
+    def __init__(self, db, batch_size=100, flush_interval=0.5, max_buffer=5000,
+                 enqueue_timeout=2.0, buffered=True, on_flush=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.enqueue_timeout = enqueue_timeout
+        self.buffered = buffered
+        self.on_flush = on_flush
+        self._init_state()
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._init_state)
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls, db, on_flush=None):
+        return cls(
+            db,
+            batch_size=int(os.getenv('TRIAL_LOG_BATCH_SIZE', 100)),
+            flush_interval=int(os.getenv('TRIAL_LOG_FLUSH_INTERVAL_MS', 500)) / 1000.0,
+            max_buffer=int(os.getenv('TRIAL_LOG_MAX_BUFFER', 5000)),
+            enqueue_timeout=int(os.getenv('TRIAL_LOG_ENQUEUE_TIMEOUT_MS', 2000)) / 1000.0,
+            buffered=os.getenv('TRIAL_LOG_BUFFERED', 'true').lower() == 'true',
+            on_flush=on_flush
+        )
+
+    def _init_state(self):
+        """(Re)create the queue and worker state; also runs in a freshly forked child"""
+        self._queue = queue.Queue(maxsize=self.max_buffer)
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._latencies = deque(maxlen=500)
+        # (collection, document) pairs whose write failed on a connection error, at most max_buffer
+        self._retry = deque()
+        self._counters = {
+            'flushes': 0,
+            'documents_written': 0,
+            'documents_failed': 0,
+            'documents_requeued': 0,
+            'sync_fallbacks': 0,
+            'enqueue_waits': 0,
+            'rejections': 0
+        }
+
+    def submit(self, collection_name, document):
+        """
+        Queue a trial document for writing
+
+        Blocks for up to enqueue_timeout when the buffer is full (Mongo is
+        falling behind); if it is still full, the document is written
+        synchronously so it is never dropped.
+
+        Raises:
+            TrialLogUnavailable: The buffer is full while earlier documents
+                wait for MongoDB to come back (a synchronous write would only
+                wait out server selection and fail)
+        """
+        if not self.buffered or self._stop.is_set():
+            self._write({collection_name: [document]})
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((collection_name, document))
+            return
+        except queue.Full:
+            self._reject_if_unreachable()
+            self._count('enqueue_waits')
+
+        try:
+            self._queue.put((collection_name, document), timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._reject_if_unreachable()
+            self._count('sync_fallbacks')
+            self._write({collection_name: [document]})
+
+    def flush(self):
+        """
+        Write everything currently buffered
+
+        Returns:
+            False when MongoDB is unreachable and documents are still waiting to be retried
+        """
+        with self._flush_lock:
+            while True:
+                batches = self._drain(block=False)
+                if not batches:
+                    return True
+                if not self._write(batches):
+                    return False
+
+    def close(self):
+        """Stop the background thread and flush what is left (registered with atexit)"""
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=max(self.flush_interval * 4, 5))
+        if not self.flush():
+            logger.error("%d trial(s) could not be written before shutdown", len(self._retry))
+
+    def stats(self):
+        """Buffer depth, write counters and flush latency percentiles (ms)"""
+        with self._metrics_lock:
+            last = self._latencies[-1] if self._latencies else 0.0
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))] * 1000, 2)
+
+        return {
+            'buffered': self.buffered,
+            'queue_depth': self._queue.qsize(),
+            'retry_depth': len(self._retry),
+            'queue_capacity': self.max_buffer,
+            **counters,
+            'flush_latency_ms': {
+                'last': round(last * 1000, 2),
+                'p50': pct(50),
+                'p95': pct(95),
+                'max': round(latencies[-1] * 1000, 2) if latencies else 0.0
+            }
+        }
+
+    # ============ Helper Methods ============
+
+    def _reject_if_unreachable(self):
+        if self._retry:
+            self._count('rejections')
+            raise TrialLogUnavailable('Trial log is unavailable, retry shortly')
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='trial-log-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batches = self._drain(block=True)
+                if batches:
+                    with self._flush_lock:
+                        self._write(batches)
+                if self._retry:
+                    # MongoDB is unreachable; back off before retrying the requeued documents
+                    self._stop.wait(RETRY_DELAY_SECONDS)
+            except Exception:
+                logger.exception("Trial log writer iteration failed")
+                self._stop.wait(self.flush_interval)
+
+    def _drain(self, block):
+        """
+        Collect up to batch_size documents, waiting at most flush_interval for the batch to fill
+
+        Requeued documents go first; while any are waiting, new documents stay
+        in the bounded queue so producers feel the backpressure.
+        """
+        batches = {}
+        count = 0
+        if self._retry:
+            while count < self.batch_size:
+                try:
+                    collection_name, document = self._retry.popleft()
+                except IndexError:
+                    break
+                batches.setdefault(collection_name, []).append(document)
+                count += 1
+            return batches
+
+        deadline = time.monotonic() + self.flush_interval
+
+        while count < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    collection_name, document = self._queue.get(timeout=timeout)
+                else:
+                    collection_name, document = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batches.setdefault(collection_name, []).append(document)
+            count += 1
+
+        return batches
+
+    def _write(self, batches):
+        """Insert the batches; returns False when some documents had to be requeued"""
+        complete = True
+        for collection_name, documents in batches.items():
+            started = time.perf_counter()
+            written, pending = self._insert(collection_name, documents)
+            elapsed = time.perf_counter() - started
+
+            with self._metrics_lock:
+                # The retry buffer is bounded like the queue; what does not fit is lost
+                kept = pending[:max(0, self.max_buffer - len(self._retry))]
+                self._retry.extend((collection_name, document) for document in kept)
+                self._latencies.append(elapsed)
+                self._counters['flushes'] += 1
+                self._counters['documents_written'] += len(written)
+                self._counters['documents_failed'] += len(documents) - len(written) - len(kept)
+                self._counters['documents_requeued'] += len(kept)
+
+            if len(kept) < len(pending):
+                logger.error("Retry buffer is full, dropping %d trial(s) for %s",
+                             len(pending) - len(kept), collection_name)
+            if pending:
+                complete = False
+                if not self._stop.is_set():
+                    self._ensure_started()
+
+            # Hooks (rollups, phoneme stats) only see documents that were actually stored
+            if self.on_flush and written:
+                try:
+                    self.on_flush(collection_name, written)
+                except Exception:
+                    logger.exception("Trial flush hook failed for %s", collection_name)
+        return complete
+
+    def _insert(self, collection_name, documents, attempts=3):
+        """
+        insert_many(ordered=False) with retries on connection errors
+
+        Returns:
+            (written, pending): documents now stored, and documents to retry
+            later because MongoDB could not be reached
+        """
+        for attempt in range(attempts):
+            try:
+                self.db[collection_name].insert_many(documents, ordered=False)
+                return documents, []
+            except BulkWriteError as e:
+                # Unordered: everything except the reported errors was written. Duplicate
+                # _ids mean a previous attempt already wrote the document before reconnecting.
+                failed = {
+                    err['index'] for err in e.details.get('writeErrors', [])
+                    if err.get('code') != 11000
+                }
+                if failed:
+                    logger.warning("%d trial(s) failed to write to %s", len(failed), collection_name)
+                return [document for i, document in enumerate(documents) if i not in failed], []
+            except AutoReconnect as e:
+                if attempt == attempts - 1:
+                    logger.error("Could not reach MongoDB to write %d trial(s) to %s, will retry: %s",
+                                 len(documents), collection_name, e)
+                    return [], documents
+                time.sleep(0.2 * (2 ** attempt))
+            except Exception:
+                # e.g. a document that cannot be encoded; isolate it instead of losing the batch
+                logger.exception("Bulk trial write to %s failed, writing documents one by one", collection_name)
+                return self._insert_one_by_one(collection_name, documents)
+        return [], documents
+
+    def _insert_one_by_one(self, collection_name, documents):
+        written, pending = [], []
+        for document in documents:
+            try:
+                self.db[collection_name].insert_one(document)
+                written.append(document)
+            except DuplicateKeyError:
+                written.append(document)
+            except AutoReconnect:
+                pending.append(document)
+            except Exception:
+                logger.exception("Dropping a trial that could not be written to %s", collection_name)
+        return written, pending
+
+    def _count(self, name):
+        with self._metrics_lock:
+            self._counters[name] += 1
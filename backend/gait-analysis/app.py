@@ -11,18 +11,24 @@ import os
 from dotenv import load_dotenv
 
 from gait_processor import GaitProcessor
+from gait_trends import GaitTrends, normalize_granularity
 from data_validator import validate_sensor_data
+from json_provider import init_json_provider
 
 # Load environment variables
 load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
+init_json_provider(app)
 CORS(app)  # Enable CORS for React Native
 
 # Initialize gait processor
 gait_processor = GaitProcessor()
 
+# Per-patient day/week/month metric buckets
+gait_trends = GaitTrends()
+
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
 
@@ -32,7 +38,7 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': datetime.now(),
         'service': 'Gait Analysis API'
     }), 200
 
@@ -103,12 +109,18 @@ def analyze_gait():
         
         print(f"\nAnalysis complete!")
         print(f"Results: {analysis_result}")
+        
+        # Fold the session into the patient's trend buckets; a failure here must not lose the result
+        try:
+            gait_trends.record(analysis_result)
+        except Exception as e:
+            app.logger.warning(f"Could not update gait trends for {user_id}: {str(e)}")
         print("="*50 + "\n")
         
         return jsonify({
             'success': True,
             'data': analysis_result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         }), 200
         
     except Exception as e:
@@ -177,6 +189,45 @@ def get_user_history(user_id):
         }), 500
 
 
+@app.route('/api/gait/trends/<user_id>', methods=['GET'])
+def get_user_trends(user_id):
+    """
+    Longitudinal gait metrics for a user, one point per day/week/month bucket
+    
+    Query parameters:
+        granularity: 'day', 'week' (default) or 'month'
+        from, to: ISO 8601 bounds ([from, to), UTC unless an offset is given); default is a recent window per granularity
+        metrics: Comma-separated subset of the tracked metrics
+    """
+    try:
+        granularity = normalize_granularity(request.args.get('granularity', 'week'))
+        metrics = [m.strip() for m in request.args.get('metrics', '').split(',') if m.strip()] or None
+        start = datetime.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = datetime.fromisoformat(request.args['to']) if request.args.get('to') else None
+        
+        trends = gait_trends.query(user_id, granularity=granularity, start=start, end=end, metrics=metrics)
+        
+        return jsonify({
+            'success': True,
+            'user_id': user_id,
+            'granularity': granularity,
+            'trends': trends
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid query',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        app.logger.error(f"Error fetching trends: {str(e)}")
+        return jsonify({
+            'error': 'Failed to fetch trends',
+            'message': str(e)
+        }), 500
+
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
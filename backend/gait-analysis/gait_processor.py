@@ -7,9 +7,11 @@ import numpy as np
 from scipy import signal
 from scipy.fft import fft, fftfreq
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Any
 
+from sensor_alignment import align_streams
+
 
 class GaitProcessor:
     """
@@ -18,6 +20,7 @@ class GaitProcessor:
     
     def __init__(self):
         self.sampling_rate = 50  # Hz, typical for mobile sensors
+        self.alignment_tolerance_ms = None  # default: 1.5 gyroscope sample intervals
         self.history = []
         
     def analyze(self, accelerometer: List[Dict], gyroscope: List[Dict], 
@@ -40,12 +43,18 @@ class GaitProcessor:
         print(f"  Accelerometer samples: {len(accelerometer)}")
         print(f"  Gyroscope samples: {len(gyroscope)}")
         
-        # Convert to numpy arrays
-        accel_data = self._convert_to_arrays(accelerometer)
-        gyro_data = self._convert_to_arrays(gyroscope)
+        # Align both streams onto one timeline (row i of each = same instant)
+        accel_stream, gyro_stream, alignment = align_streams(
+            accelerometer, gyroscope, tolerance_ms=self.alignment_tolerance_ms
+        )
+        accel_data = self._convert_to_arrays(accel_stream)
+        gyro_data = self._convert_to_arrays(gyro_stream)
+        print(f"  Aligned samples: {alignment['aligned_samples']} "
+              f"(dropped accel: {alignment['dropped_accelerometer']}, gyro: {alignment['dropped_gyroscope']}, "
+              f"skew: {alignment['skew_ms']})")
         
         # Calculate actual sampling rate from timestamps
-        actual_sampling_rate = self._calculate_sampling_rate(accelerometer)
+        actual_sampling_rate = self._calculate_sampling_rate(accel_data['time'])
         if actual_sampling_rate > 0:
             print(f"  Calculated sampling rate: {actual_sampling_rate:.2f} Hz")
             self.sampling_rate = actual_sampling_rate
@@ -61,7 +70,7 @@ class GaitProcessor:
         step_count = len(steps)
         
         # Calculate cadence (steps per minute)
-        duration = self._calculate_duration(accelerometer)
+        duration = self._calculate_duration(accel_data['time'])
         cadence = (step_count / duration) * 60 if duration > 0 else 0
         
         # Estimate stride length and velocity
@@ -85,7 +94,7 @@ class GaitProcessor:
         result = {
             'session_id': session_id,
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.now(timezone.utc),
             'metrics': {
                 'step_count': int(step_count),
                 'cadence': round(cadence, 2),
@@ -98,7 +107,8 @@ class GaitProcessor:
             },
             'gait_phases': gait_phases,
             'analysis_duration': round(duration, 2),
-            'data_quality': self._assess_data_quality(accelerometer, gyroscope)
+            'data_quality': self._assess_data_quality(alignment),
+            'alignment': alignment
         }
         
         # Store in history
@@ -129,7 +139,7 @@ class GaitProcessor:
             'accelerometer_magnitude': round(accel_magnitude, 3),
             'gyroscope_magnitude': round(gyro_magnitude, 3),
             'step_detected': step_detected,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         }
     
     def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict]:
@@ -139,16 +149,13 @@ class GaitProcessor:
     
     # ============ Helper Methods ============
     
-    def _convert_to_arrays(self, sensor_data: List[Dict]) -> Dict[str, np.ndarray]:
-        """Convert sensor data list to numpy arrays"""
-        if not sensor_data:
-            return {'x': np.array([]), 'y': np.array([]), 'z': np.array([]), 'time': np.array([])}
-        
+    def _convert_to_arrays(self, stream: np.ndarray) -> Dict[str, np.ndarray]:
+        """Split an aligned (n, 4) time/x/y/z stream into per-axis arrays"""
         return {
-            'x': np.array([d.get('x', 0) for d in sensor_data]),
-            'y': np.array([d.get('y', 0) for d in sensor_data]),
-            'z': np.array([d.get('z', 0) for d in sensor_data]),
-            'time': np.array([d.get('timestamp', i) for i, d in enumerate(sensor_data)])
+            'x': stream[:, 1],
+            'y': stream[:, 2],
+            'z': stream[:, 3],
+            'time': stream[:, 0]
         }
     
     def _calculate_magnitude(self, data: Dict[str, np.ndarray]) -> np.ndarray:
@@ -210,24 +217,20 @@ class GaitProcessor:
             print(f"  ❌ Filter failed: {e}, returning raw data")
             return data
     
-    def _calculate_duration(self, sensor_data: List[Dict]) -> float:
+    def _calculate_duration(self, timestamps: np.ndarray) -> float:
         """Calculate duration of recording in seconds"""
-        if len(sensor_data) < 2:
+        if len(timestamps) < 2:
             return 0.0
         
-        start_time = sensor_data[0].get('timestamp', 0)
-        end_time = sensor_data[-1].get('timestamp', 0)
-        
-        return (end_time - start_time) / 1000.0  # Convert ms to seconds
+        return float(timestamps[-1] - timestamps[0]) / 1000.0  # Convert ms to seconds
     
-    def _calculate_sampling_rate(self, sensor_data: List[Dict]) -> float:
+    def _calculate_sampling_rate(self, timestamps: np.ndarray) -> float:
         """Calculate actual sampling rate from timestamps"""
-        if len(sensor_data) < 10:
+        if len(timestamps) < 10:
             return 0.0
         
         # Use first 10 samples to calculate average sampling rate
-        timestamps = [sensor_data[i].get('timestamp', 0) for i in range(min(10, len(sensor_data)))]
-        intervals = np.diff(timestamps)  # Time between samples in ms
+        intervals = np.diff(timestamps[:10])  # Time between samples in ms
         
         if len(intervals) == 0 or np.mean(intervals) == 0:
             return 0.0
@@ -340,18 +343,27 @@ class GaitProcessor:
         
         return oscillation
     
-    def _assess_data_quality(self, accel: List[Dict], gyro: List[Dict]) -> str:
-        """Assess quality of sensor data"""
-        min_samples = 50
-        
-        if len(accel) < min_samples or len(gyro) < min_samples:
-            return 'poor'
-        elif len(accel) < 100 or len(gyro) < 100:
-            return 'fair'
-        elif len(accel) < 200 or len(gyro) < 200:
-            return 'good'
+    def _assess_data_quality(self, alignment: Dict[str, Any]) -> str:
+        """Assess quality of sensor data from the aligned sample count and drop rate"""
+        levels = ['poor', 'fair', 'good', 'excellent']
+        aligned = alignment['aligned_samples']
+        
+        if aligned < 50:
+            level = 0
+        elif aligned < 100:
+            level = 1
+        elif aligned < 200:
+            level = 2
         else:
-            return 'excellent'
+            level = 3
+        
+        # Losing a quarter of the timeline (gyroscope gaps, bad timestamps) costs a grade;
+        # unused gyroscope samples from a faster gyroscope do not
+        total = alignment['accelerometer_samples']
+        if total and (total - aligned) / total > 0.25:
+            level = max(0, level - 1)
+        
+        return levels[level]
     
     def _add_to_history(self, result: Dict) -> None:
         """Add analysis result to history"""
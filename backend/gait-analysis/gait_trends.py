@@ -0,0 +1,224 @@
+"""
+Gait Trends - Time-bucketed longitudinal gait metrics per patient
+Every finished analysis is folded into the patient's daily, weekly and
+monthly buckets (session count plus sum, sum of squares, min and max of each
+tracked metric), so a trend chart reads one bucket per point instead of
+every session in the range.
+
+Buckets live in MongoDB when GAIT_MONGO_URI is set and pymongo is installed,
+otherwise in process memory (lost on restart).
+
+Environment variables:
+    GAIT_MONGO_URI        MongoDB connection string for persistent buckets (optional)
+    GAIT_MONGO_DB         Database name (default: CVACare)
+"""
+
+import os
+import math
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+TREND_METRICS = ('cadence', 'velocity', 'gait_symmetry', 'stability_score', 'stride_length', 'step_regularity')
+GRANULARITIES = ('day', 'week', 'month')
+GRANULARITY_ALIASES = {'daily': 'day', 'weekly': 'week', 'monthly': 'month'}
+TRENDS_COLLECTION = 'gait_trend_buckets'
+
+# Range used when the request gives no 'from'
+DEFAULT_SPANS = {'day': timedelta(days=30), 'week': timedelta(weeks=12), 'month': timedelta(days=365)}
+
+
+def to_utc(timestamp: datetime) -> datetime:
+    """Naive UTC datetime; naive inputs are taken to be UTC already"""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def normalize_granularity(granularity: str) -> str:
+    """'day' / 'week' / 'month' for a granularity or its alias ('daily', 'weekly', 'monthly')
+
+    Raises:
+        ValueError: On an unknown granularity
+    """
+    granularity = GRANULARITY_ALIASES.get(granularity, granularity)
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    return granularity
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the UTC day / ISO week (Monday) / month containing timestamp (naive UTC)"""
+    day = to_utc(timestamp).replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+
+def _session_values(result: Dict[str, Any]) -> Dict[str, float]:
+    metrics = result.get('metrics', {})
+    values = {}
+    for name in TREND_METRICS:
+        value = metrics.get(name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            values[name] = float(value)
+    return values
+
+
+def summarize_bucket(bucket: Dict[str, Any], metrics: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Chart point for a bucket: mean / std / min / max per metric"""
+    point = {'start': bucket['start'], 'sessions': bucket['sessions'], 'metrics': {}}
+    for name, stats in bucket.get('metrics', {}).items():
+        if metrics and name not in metrics:
+            continue
+        count = stats['count']
+        mean = stats['sum'] / count
+        variance = max(0.0, stats['sum_sq'] / count - mean * mean)
+        point['metrics'][name] = {
+            'mean': round(mean, 3),
+            'std': round(math.sqrt(variance), 3),
+            'min': stats['min'],
+            'max': stats['max'],
+            'count': count
+        }
+    return point
+
+
+class InMemoryTrendStore:
+    """
+    Buckets kept in process memory, indexed by (user, granularity) then bucket start
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def add_session(self, user_id: str, timestamp: datetime, values: Dict[str, float]) -> None:
+        with self._lock:
+            for granularity in GRANULARITIES:
+                start = bucket_start(timestamp, granularity)
+                series = self._buckets.setdefault((user_id, granularity), {})
+                bucket = series.setdefault(start, {'start': start, 'sessions': 0, 'metrics': {}})
+                bucket['sessions'] += 1
+                for name, value in values.items():
+                    stats = bucket['metrics'].setdefault(
+                        name, {'count': 0, 'sum': 0.0, 'sum_sq': 0.0, 'min': value, 'max': value}
+                    )
+                    stats['count'] += 1
+                    stats['sum'] += value
+                    stats['sum_sq'] += value * value
+                    stats['min'] = min(stats['min'], value)
+                    stats['max'] = max(stats['max'], value)
+
+    def buckets(self, user_id: str, granularity: str, start: datetime, end: datetime) -> List[Dict]:
+        with self._lock:
+            series = self._buckets.get((user_id, granularity), {})
+            selected = [
+                {**bucket, 'metrics': {name: dict(stats) for name, stats in bucket['metrics'].items()}}
+                for bucket_start_at, bucket in series.items()
+                if start <= bucket_start_at < end
+            ]
+        return sorted(selected, key=lambda bucket: bucket['start'])
+
+
+class MongoTrendStore:
+    """
+    Buckets stored in MongoDB, one document per (user, granularity, start), updated with $inc/$min/$max
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._indexed = False
+
+    def _ensure_index(self):
+        if not self._indexed:
+            self.collection.create_index(
+                [('user_id', 1), ('granularity', 1), ('start', 1)], name='user_granularity_start', unique=True
+            )
+            self._indexed = True
+
+    def add_session(self, user_id: str, timestamp: datetime, values: Dict[str, float]) -> None:
+        from pymongo import UpdateOne
+
+        self._ensure_index()
+        operations = []
+        for granularity in GRANULARITIES:
+            start = bucket_start(timestamp, granularity)
+            update = {'$inc': {'sessions': 1}, '$min': {}, '$max': {}}
+            for name, value in values.items():
+                update['$inc'][f'metrics.{name}.count'] = 1
+                update['$inc'][f'metrics.{name}.sum'] = value
+                update['$inc'][f'metrics.{name}.sum_sq'] = value * value
+                update['$min'][f'metrics.{name}.min'] = value
+                update['$max'][f'metrics.{name}.max'] = value
+            if not values:
+                del update['$min'], update['$max']
+            operations.append(UpdateOne(
+                {'user_id': user_id, 'granularity': granularity, 'start': start}, update, upsert=True
+            ))
+        self.collection.bulk_write(operations, ordered=False)
+
+    def buckets(self, user_id: str, granularity: str, start: datetime, end: datetime) -> List[Dict]:
+        self._ensure_index()
+        return list(
+            self.collection.find(
+                {'user_id': user_id, 'granularity': granularity, 'start': {'$gte': start, '$lt': end}},
+                {'_id': 0, 'start': 1, 'sessions': 1, 'metrics': 1}
+            ).sort('start', 1)
+        )
+
+
+def create_trend_store():
+    """MongoTrendStore when GAIT_MONGO_URI is set and pymongo is installed, else InMemoryTrendStore"""
+    uri = os.getenv('GAIT_MONGO_URI')
+    if uri:
+        try:
+            from pymongo import MongoClient
+        except ImportError:
+            print("Warning: GAIT_MONGO_URI is set but pymongo is not installed; keeping gait trends in memory")
+        else:
+            client = MongoClient(uri, connect=False)
+            return MongoTrendStore(client[os.getenv('GAIT_MONGO_DB', 'CVACare')][TRENDS_COLLECTION])
+    else:
+        print("Warning: GAIT_MONGO_URI is not set; gait trends are kept in memory, separately in each "
+              "worker process, and lost on restart")
+    return InMemoryTrendStore()
+
+
+class GaitTrends:
+    """
+    Records analyses into trend buckets and answers range queries from them
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else create_trend_store()
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """Fold one finished analysis into its user's day/week/month buckets"""
+        user_id = result.get('user_id')
+        if not user_id or user_id == 'anonymous':
+            return
+        timestamp = result.get('timestamp') or datetime.now(timezone.utc)
+        self.store.add_session(str(user_id), timestamp, _session_values(result))
+
+    def query(self, user_id: str, granularity: str = 'week', start: Optional[datetime] = None,
+              end: Optional[datetime] = None, metrics: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Trend points for [start, end), oldest first; naive bounds are UTC
+
+        Raises:
+            ValueError: On an unknown granularity or metric
+        """
+        granularity = normalize_granularity(granularity)
+        unknown = [name for name in metrics or [] if name not in TREND_METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metric(s): {', '.join(unknown)}")
+
+        end = to_utc(end or datetime.now(timezone.utc) + timedelta(days=1))
+        start = bucket_start(start or end - DEFAULT_SPANS[granularity], granularity)
+
+        return [summarize_bucket(bucket, metrics) for bucket in self.store.buckets(user_id, granularity, start, end)]
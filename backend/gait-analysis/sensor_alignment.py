@@ -0,0 +1,117 @@
+"""
+Sensor Alignment - As-of merge of accelerometer and gyroscope streams
+The two sensors are sampled independently, so their timestamps and lengths
+differ. Each accelerometer sample is paired with the gyroscope sample nearest
+in time (np.searchsorted over the sorted gyroscope timestamps); samples with
+no partner within the tolerance are dropped, giving both streams one shared
+timeline. Skew and dropped-sample counts are reported with the result.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Partner must be within this many median gyroscope intervals
+TOLERANCE_INTERVALS = 1.5
+
+EMPTY_STREAM = np.empty((0, 4))
+
+
+def to_array(sensor_data: List[Dict]) -> np.ndarray:
+    """
+    Sensor readings as an (n, 4) float array with columns time, x, y, z
+
+    Readings without a timestamp use their index, as before alignment existed.
+    """
+    if not sensor_data:
+        return EMPTY_STREAM
+    return np.array(
+        [(d.get('timestamp', i), d.get('x', 0), d.get('y', 0), d.get('z', 0)) for i, d in enumerate(sensor_data)],
+        dtype=float
+    )
+
+
+def _clean(stream: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Sort by time and drop non-finite or duplicate timestamps; returns (stream, rows removed)"""
+    finite = stream[np.isfinite(stream).all(axis=1)]
+    order = np.argsort(finite[:, 0], kind='stable')
+    ordered = finite[order]
+    if len(ordered) > 1:
+        keep = np.concatenate(([True], np.diff(ordered[:, 0]) > 0))
+        ordered = ordered[keep]
+    return ordered, len(stream) - len(ordered)
+
+
+def _median_interval(times: np.ndarray) -> float:
+    return float(np.median(np.diff(times))) if len(times) > 1 else 0.0
+
+
+def align_streams(accelerometer: List[Dict], gyroscope: List[Dict],
+                  tolerance_ms: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, Dict]:
+    """
+    Align both streams onto the accelerometer timeline
+
+    Args:
+        tolerance_ms: Largest accepted |gyro time - accel time|; by default
+            TOLERANCE_INTERVALS median gyroscope sample intervals
+
+    Returns:
+        (accel, gyro, stats): (n, 4) arrays with row i of each describing the
+        same instant (gyro keeps its own timestamps), and alignment statistics.
+        When one stream is empty or nothing can be paired, gyro is empty and
+        accel holds the cleaned accelerometer stream.
+    """
+    accel, accel_removed = _clean(to_array(accelerometer))
+    gyro, gyro_removed = _clean(to_array(gyroscope))
+
+    stats = {
+        'accelerometer_samples': len(accelerometer or []),
+        'gyroscope_samples': len(gyroscope or []),
+        'aligned_samples': 0,
+        'invalid_samples': accel_removed + gyro_removed,
+        'dropped_accelerometer': 0,
+        'dropped_gyroscope': 0,
+        'tolerance_ms': None,
+        'skew_ms': None
+    }
+
+    if len(accel) == 0 or len(gyro) == 0:
+        stats['dropped_gyroscope'] = len(gyro)
+        return accel, EMPTY_STREAM, stats
+
+    if tolerance_ms is None:
+        tolerance_ms = TOLERANCE_INTERVALS * (_median_interval(gyro[:, 0]) or _median_interval(accel[:, 0]))
+    stats['tolerance_ms'] = round(float(tolerance_ms), 3)
+
+    # Nearest gyro sample: the insertion point or the one before it
+    accel_times = accel[:, 0]
+    gyro_times = gyro[:, 0]
+    right = np.clip(np.searchsorted(gyro_times, accel_times), 0, len(gyro) - 1)
+    left = np.clip(right - 1, 0, len(gyro) - 1)
+    use_left = np.abs(accel_times - gyro_times[left]) <= np.abs(gyro_times[right] - accel_times)
+    nearest = np.where(use_left, left, right)
+
+    skew = gyro_times[nearest] - accel_times
+    matched = np.abs(skew) <= tolerance_ms
+    aligned_count = int(np.count_nonzero(matched))
+
+    if aligned_count == 0:
+        stats['dropped_accelerometer'] = len(accel)
+        stats['dropped_gyroscope'] = len(gyro)
+        return accel, EMPTY_STREAM, stats
+
+    used = np.zeros(len(gyro), dtype=bool)
+    used[nearest[matched]] = True
+    abs_skew = np.abs(skew[matched])
+
+    stats.update({
+        'aligned_samples': aligned_count,
+        'dropped_accelerometer': len(accel) - aligned_count,
+        'dropped_gyroscope': int(len(gyro) - np.count_nonzero(used)),
+        'skew_ms': {
+            'mean': round(float(skew[matched].mean()), 3),
+            'median_abs': round(float(np.median(abs_skew)), 3),
+            'p95_abs': round(float(np.percentile(abs_skew, 95)), 3),
+            'max_abs': round(float(abs_skew.max()), 3)
+        }
+    })
+    return accel[matched], gyro[nearest[matched]], stats
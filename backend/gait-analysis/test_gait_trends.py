@@ -0,0 +1,136 @@
+"""
+Tests for gait_trends - time bucketing and trend queries
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from gait_trends import (
+    GaitTrends, InMemoryTrendStore, bucket_start, create_trend_store, normalize_granularity
+)
+
+
+def analysis(user_id, timestamp, **metrics):
+    return {'user_id': user_id, 'timestamp': timestamp, 'metrics': metrics}
+
+
+def trends_with(*results):
+    trends = GaitTrends(store=InMemoryTrendStore())
+    for result in results:
+        trends.record(result)
+    return trends
+
+
+@pytest.mark.parametrize('timestamp, granularity, expected', [
+    (datetime(2026, 3, 4, 15, 30), 'day', datetime(2026, 3, 4)),
+    (datetime(2026, 3, 1, 23, 59, 59), 'week', datetime(2026, 2, 23)),   # Sunday closes the ISO week
+    (datetime(2026, 3, 2, 0, 0), 'week', datetime(2026, 3, 2)),          # Monday opens the next one
+    (datetime(2026, 1, 1, 8, 0), 'week', datetime(2025, 12, 29)),        # weeks span the new year
+    (datetime(2026, 2, 28, 23, 59), 'month', datetime(2026, 2, 1)),
+    (datetime(2026, 3, 1, 0, 0), 'month', datetime(2026, 3, 1)),
+])
+def test_bucket_start_boundaries(timestamp, granularity, expected):
+    assert bucket_start(timestamp, granularity) == expected
+
+
+def test_bucket_start_converts_aware_timestamps_to_utc():
+    # 01:30 on Monday 2 March in UTC+5 is still Sunday 1 March in UTC
+    local = datetime(2026, 3, 2, 1, 30, tzinfo=timezone(timedelta(hours=5)))
+    assert bucket_start(local, 'day') == datetime(2026, 3, 1)
+    assert bucket_start(local, 'week') == datetime(2026, 2, 23)
+    assert bucket_start(local, 'month') == datetime(2026, 3, 1)
+
+
+def test_unknown_granularity_is_rejected():
+    assert normalize_granularity('weekly') == 'week'
+    assert normalize_granularity('month') == 'month'
+    with pytest.raises(ValueError):
+        normalize_granularity('hourly')
+    with pytest.raises(ValueError):
+        bucket_start(datetime(2026, 3, 1), 'year')
+
+
+def test_store_folds_sessions_and_selects_half_open_range():
+    store = InMemoryTrendStore()
+    store.add_session('u1', datetime(2026, 3, 2, 9), {'cadence': 100.0})
+    store.add_session('u1', datetime(2026, 3, 2, 18), {'cadence': 110.0, 'velocity': 1.2})
+    store.add_session('u1', datetime(2026, 3, 3, 9), {'cadence': 90.0})
+    store.add_session('u2', datetime(2026, 3, 2, 9), {'cadence': 50.0})
+
+    days = store.buckets('u1', 'day', datetime(2026, 3, 2), datetime(2026, 3, 3))
+    assert [bucket['start'] for bucket in days] == [datetime(2026, 3, 2)]
+    assert days[0]['sessions'] == 2
+    assert days[0]['metrics']['cadence'] == {'count': 2, 'sum': 210.0, 'sum_sq': 22100.0, 'min': 100.0, 'max': 110.0}
+    assert days[0]['metrics']['velocity']['count'] == 1
+
+    weeks = store.buckets('u1', 'week', datetime(2026, 3, 2), datetime(2026, 3, 9))
+    assert len(weeks) == 1 and weeks[0]['sessions'] == 3
+    assert store.buckets('u1', 'week', datetime(2026, 3, 3), datetime(2026, 3, 9)) == []
+
+
+def test_query_summarizes_mean_std_min_max():
+    trends = trends_with(
+        analysis('u1', datetime(2026, 3, 2, 9), cadence=100.0, velocity=1.0),
+        analysis('u1', datetime(2026, 3, 4, 9), cadence=110.0, velocity=float('nan')),
+        analysis('u1', datetime(2026, 3, 6, 9), cadence=120.0, velocity=True),
+    )
+    points = trends.query('u1', 'weekly', start=datetime(2026, 3, 1), end=datetime(2026, 3, 10))
+
+    assert len(points) == 1
+    point = points[0]
+    assert point['start'] == datetime(2026, 3, 2)
+    assert point['sessions'] == 3
+    assert point['metrics']['cadence'] == {
+        'mean': 110.0, 'std': round(math.sqrt(200 / 3), 3), 'min': 100.0, 'max': 120.0, 'count': 3
+    }
+    # Non-finite and boolean values are not folded in
+    assert point['metrics']['velocity'] == {'mean': 1.0, 'std': 0.0, 'min': 1.0, 'max': 1.0, 'count': 1}
+
+
+def test_query_bounds_are_half_open_and_aware_bounds_are_utc():
+    trends = trends_with(
+        analysis('u1', datetime(2026, 3, 1, 12), cadence=100.0),
+        analysis('u1', datetime(2026, 3, 2, 12), cadence=110.0),
+        analysis('u1', datetime(2026, 3, 3, 12), cadence=120.0),
+    )
+    naive = trends.query('u1', 'day', start=datetime(2026, 3, 2), end=datetime(2026, 3, 3))
+    assert [point['start'] for point in naive] == [datetime(2026, 3, 2)]
+
+    # The same instants written with a +02:00 offset select the same buckets
+    plus_two = timezone(timedelta(hours=2))
+    aware = trends.query('u1', 'day', start=datetime(2026, 3, 2, 2, tzinfo=plus_two),
+                         end=datetime(2026, 3, 3, 2, tzinfo=plus_two))
+    assert aware == naive
+
+    # A start inside a bucket still returns that whole bucket
+    partial = trends.query('u1', 'day', start=datetime(2026, 3, 2, 18), end=datetime(2026, 3, 4))
+    assert [point['start'] for point in partial] == [datetime(2026, 3, 2), datetime(2026, 3, 3)]
+
+
+def test_query_defaults_to_a_recent_window_and_filters_metrics():
+    now = datetime.now(timezone.utc)
+    trends = trends_with(
+        analysis('u1', now - timedelta(days=400), cadence=80.0),
+        analysis('u1', now - timedelta(days=2), cadence=100.0, velocity=1.1),
+        analysis('u1', now, cadence=105.0),
+    )
+    points = trends.query('u1', 'month', metrics=['cadence'])
+    assert sum(point['sessions'] for point in points) == 2
+    assert all(set(point['metrics']) == {'cadence'} for point in points)
+
+    with pytest.raises(ValueError):
+        trends.query('u1', 'day', metrics=['cadence', 'speed'])
+
+
+def test_anonymous_sessions_are_not_recorded():
+    trends = trends_with(analysis('anonymous', datetime(2026, 3, 2), cadence=100.0),
+                         analysis(None, datetime(2026, 3, 2), cadence=100.0))
+    assert trends.query('anonymous', 'day', start=datetime(2026, 3, 1), end=datetime(2026, 3, 3)) == []
+
+
+def test_in_memory_fallback_warns_when_no_uri_is_set(monkeypatch, capsys):
+    monkeypatch.delenv('GAIT_MONGO_URI', raising=False)
+    assert isinstance(create_trend_store(), InMemoryTrendStore)
+    assert 'GAIT_MONGO_URI is not set' in capsys.readouterr().out
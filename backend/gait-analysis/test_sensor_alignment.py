@@ -0,0 +1,84 @@
+"""
+Tests for sensor_alignment - as-of merge of accelerometer and gyroscope streams
+"""
+
+import numpy as np
+import pytest
+
+from sensor_alignment import align_streams, to_array
+
+
+def readings(times, value=1.0):
+    return [{'x': value, 'y': value * 2, 'z': value * 3, 'timestamp': t} for t in times]
+
+
+def test_to_array_uses_index_for_missing_timestamps():
+    stream = to_array([{'x': 1, 'y': 2, 'z': 3}, {'x': 4, 'y': 5, 'z': 6, 'timestamp': 7}])
+    assert stream.tolist() == [[0, 1, 2, 3], [7, 4, 5, 6]]
+    assert to_array([]).shape == (0, 4)
+
+
+def test_equal_rate_streams_pair_one_to_one_with_skew():
+    accel = readings(np.arange(0, 1000, 20.0))
+    gyro = readings(np.arange(3, 1003, 20.0))
+    a, g, stats = align_streams(accel, gyro)
+
+    assert len(a) == len(g) == 50
+    assert np.allclose(g[:, 0] - a[:, 0], 3.0)
+    assert stats['aligned_samples'] == 50
+    assert stats['dropped_accelerometer'] == stats['dropped_gyroscope'] == 0
+    assert stats['skew_ms']['mean'] == 3.0
+    assert stats['tolerance_ms'] == 30.0
+
+
+def test_faster_gyroscope_leaves_unused_samples_but_keeps_the_timeline():
+    accel = readings(np.arange(0, 1000, 20.0))
+    gyro = readings(np.arange(0, 1000, 10.0))
+    a, g, stats = align_streams(accel, gyro)
+
+    assert len(a) == 50
+    assert np.array_equal(a[:, 0], g[:, 0])
+    assert stats['dropped_accelerometer'] == 0
+    assert stats['dropped_gyroscope'] == 50
+
+
+def test_gyroscope_gap_drops_accelerometer_samples():
+    accel = readings(np.arange(0, 1000, 20.0))
+    gyro = readings([t for t in np.arange(0, 1000, 20.0) if not 400 <= t < 600])
+    a, g, stats = align_streams(accel, gyro)
+
+    # 400 and 580 still have a partner within the 30 ms tolerance (380 and 600)
+    assert stats['aligned_samples'] == 42
+    assert stats['dropped_accelerometer'] == 8
+    assert not np.any((a[:, 0] > 400) & (a[:, 0] < 580))
+    assert np.all(np.abs(g[:, 0] - a[:, 0]) <= stats['tolerance_ms'])
+
+
+def test_duplicate_unordered_and_non_finite_timestamps_are_cleaned():
+    accel = readings([0, 20, 20, 60, 40, None, 80])
+    gyro = readings([81, 1, 41, 21, 61, float('nan')])
+    a, g, stats = align_streams(accel, gyro)
+
+    assert a[:, 0].tolist() == [0, 20, 40, 60, 80]
+    assert g[:, 0].tolist() == [1, 21, 41, 61, 81]
+    assert stats['invalid_samples'] == 3
+    assert stats['accelerometer_samples'] == 7
+
+
+@pytest.mark.parametrize('gyro', [[], None])
+def test_missing_gyroscope_keeps_accelerometer_only(gyro):
+    accel = readings([20, 0, 40])
+    a, g, stats = align_streams(accel, gyro)
+
+    assert a[:, 0].tolist() == [0, 20, 40]
+    assert g.shape == (0, 4)
+    assert stats['aligned_samples'] == 0
+    assert stats['skew_ms'] is None
+
+
+def test_streams_without_overlap_fall_back_to_accelerometer():
+    a, g, stats = align_streams(readings(np.arange(0, 200, 20.0)), readings(np.arange(10000, 10200, 20.0)))
+
+    assert len(a) == 10 and len(g) == 0
+    assert stats['dropped_accelerometer'] == 10
+    assert stats['dropped_gyroscope'] == 10